@@ -5,10 +5,15 @@ Permite exportar y re-exportar múltiples días
 """
 
 import os
-import json
 from datetime import datetime, timedelta
 from propreports_exporter import PropReportsExporter
 from daily_exporter import obfuscate_account
+from yearly_rollups import invalidate_rollup
+from trading_data import clear_cache, file_signature
+from market_calendar import is_trading_day, trading_days, shift_trading_days
+from trade_dedupe import update_fingerprint_index
+from json_codec import write_json
+from pipeline_metrics import start_run, stage, count
 
 def export_date_range(start_date, end_date, force_update=False):
     """
@@ -18,6 +23,9 @@ def export_date_range(start_date, end_date, force_update=False):
         start_date: Fecha inicial (datetime o string YYYY-MM-DD)
         end_date: Fecha final (datetime o string YYYY-MM-DD)
         force_update: Si True, sobrescribe archivos existentes
+    
+    Los días sin sesión del NYSE (fines de semana y feriados) no se piden
+    a PropReports ni generan archivo.
     """
     # Configuración
     DOMAIN = os.getenv('PROPREPORTS_DOMAIN', 'zim.propreports.com')
@@ -30,6 +38,10 @@ def export_date_range(start_date, end_date, force_update=False):
     if isinstance(end_date, str):
         end_date = datetime.strptime(end_date, '%Y-%m-%d')
     
+    if not trading_days(start_date, end_date):
+        print("📆 El rango no tiene sesiones del NYSE, no hay nada que exportar")
+        return []
+    
     # Crear exportador
     exporter = PropReportsExporter(DOMAIN, USERNAME, PASSWORD)
     
@@ -38,12 +50,31 @@ def export_date_range(start_date, end_date, force_update=False):
         print("❌ Error en login")
         return []
     
+    # Huellas de los trades ya guardados, para no escribir un trade en dos días
+    with stage('dedupe'):
+        fingerprints = update_fingerprint_index()
+    
+    # Días que esta corrida va a reescribir: un trade que se mueve entre ellos
+    # no es duplicado (su día anterior se reescribe sin él)
+    daily_dir = os.path.join(os.getenv('EXPORT_OUTPUT_DIR', 'exports'), "daily")
+    replacing = {
+        day.strftime('%Y-%m-%d') for day in trading_days(start_date, end_date)
+        if force_update or not os.path.exists(os.path.join(daily_dir, f"{day.strftime('%Y-%m-%d')}.json"))
+    }
+    
     exported_files = []
+    skipped_days = 0
+    duplicate_trades = 0
     current_date = start_date
     
     while current_date <= end_date:
         date_str = current_date.strftime('%Y-%m-%d')
         
+        if not is_trading_day(current_date):
+            skipped_days += 1
+            current_date += timedelta(days=1)
+            continue
+        
         # Nueva estructura simplificada
         base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
         daily_dir = os.path.join(base_dir, "daily")
@@ -68,6 +99,12 @@ def export_date_range(start_date, end_date, force_update=False):
             # Filtrar solo trades de ese día
             day_trades = [t for t in trades if t.get('date') == date_str]
             
+            # Descartar trades que ya están guardados en otro día
+            day_trades, duplicates = fingerprints.dedupe(date_str, day_trades, replacing)
+            for trade, owner in duplicates:
+                print(f"  🧬 Trade duplicado omitido: {trade.get('symbol', '')} {trade.get('opened', '')} (ya está en {owner})")
+            duplicate_trades += len(duplicates)
+            
             # Preparar datos
             daily_data = {
                 'exportDate': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
@@ -89,9 +126,19 @@ def export_date_range(start_date, end_date, force_update=False):
                 }
             }
             
+            if duplicates:
+                daily_data['metadata']['duplicatesSkipped'] = len(duplicates)
+            
             # Guardar
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(daily_data, f, indent=2, ensure_ascii=False)
+            with stage('write'):
+                write_json(filename, daily_data, ensure_ascii=False)
+                clear_cache(date_str)
+                fingerprints.record(date_str, day_trades, file_signature(filename))
+            count('tradesExported', len(day_trades))
+            
+            # Un año cerrado cambió: su rollup cacheado ya no es válido
+            if current_date.year < datetime.now().year:
+                invalidate_rollup(current_date.year)
             
             action = "♻️  Actualizado" if daily_data['metadata']['reprocessed'] else "✅ Creado"
             print(f"  {action}: {len(day_trades)} trades, P&L: ${daily_data['summary']['netPnL']}")
@@ -123,13 +170,21 @@ def export_date_range(start_date, end_date, force_update=False):
                     }
                 }
                 
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(empty_data, f, indent=2, ensure_ascii=False)
+                write_json(filename, empty_data, ensure_ascii=False)
+                clear_cache(date_str)
+                fingerprints.record(date_str, [], file_signature(filename))
                 
                 exported_files.append(filename)
         
         current_date += timedelta(days=1)
     
+    if skipped_days:
+        print(f"📆 {skipped_days} días sin sesión omitidos (fines de semana y feriados)")
+    if duplicate_trades:
+        print(f"🧬 {duplicate_trades} trades duplicados omitidos (ya estaban en otro día)")
+    if exported_files:
+        fingerprints.save()
+    
     return exported_files
 
 def reprocess_recent_days(days_back=3, force=True):
@@ -137,11 +192,12 @@ def reprocess_recent_days(days_back=3, force=True):
     Reprocesa los últimos N días (útil para trades que aparecen con delay)
     
     Args:
-        days_back: Número de días hacia atrás para reprocesar
+        days_back: Número de sesiones hacia atrás para reprocesar (un lunes
+            con days_back=2 vuelve hasta el jueves)
         force: Si True, sobrescribe archivos existentes
     """
     end_date = datetime.now()
-    start_date = end_date - timedelta(days=days_back)
+    start_date = datetime.combine(shift_trading_days(end_date, -days_back), datetime.min.time())
     
     print(f"🔄 Reprocesando últimos {days_back} días...")
     print(f"📅 Desde {start_date.strftime('%Y-%m-%d')} hasta {end_date.strftime('%Y-%m-%d')}")
@@ -151,6 +207,8 @@ def reprocess_recent_days(days_back=3, force=True):
 if __name__ == "__main__":
     import sys
     
+    start_run('advanced_exporter')
+    
     if len(sys.argv) > 1:
         if sys.argv[1] == "reprocess":
             # Reprocesar últimos días
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark del codec JSON contra la librería estándar
+Mide lectura de los exports diarios y escritura en formato versionado y compacto
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import json_codec
+
+def best_of(func, repeat=5):
+    """Mejor tiempo de varias ejecuciones (segundos)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmark(repeat=5):
+    base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
+    files = sorted(glob.glob(os.path.join(base_dir, "daily", "*.json")))
+    if not files:
+        print("❌ No hay archivos diarios para medir")
+        return None
+
+    raw = []
+    for file_path in files:
+        with open(file_path, 'rb') as f:
+            raw.append(f.read())
+    objects = [json.loads(data) for data in raw]
+
+    # Payload grande: todos los días en un solo objeto, como dashboard-data.json
+    payload = {'days': objects}
+
+    cases = [
+        ('lectura diarios', lambda: [json.loads(d) for d in raw], lambda: [json_codec.loads(d) for d in raw]),
+        ('escritura indent=2', lambda: [json.dumps(o, indent=2, ensure_ascii=False) for o in objects],
+                               lambda: [json_codec.dumps(o, ensure_ascii=False) for o in objects]),
+        ('payload indent=2', lambda: json.dumps(payload, indent=2), lambda: json_codec.dumps(payload)),
+        ('payload compacto', lambda: json.dumps(payload, separators=(',', ':')),
+                             lambda: json_codec.dumps(payload, compact=True)),
+    ]
+
+    print(f"📦 {len(files)} archivos diarios ({sum(len(d) for d in raw) / 1024:,.0f} KB), backend: {json_codec.BACKEND}")
+    print(f"{'caso':<22}{'json':>10}{'codec':>10}{'mejora':>9}")
+
+    results = []
+    for name, stdlib_func, codec_func in cases:
+        stdlib_time = best_of(stdlib_func, repeat)
+        codec_time = best_of(codec_func, repeat)
+        speedup = stdlib_time / codec_time if codec_time > 0 else 0
+        results.append((name, stdlib_time, codec_time, speedup))
+        print(f"{name:<22}{stdlib_time*1000:>8.1f}ms{codec_time*1000:>8.1f}ms{speedup:>8.1f}x")
+
+    # La salida versionada tiene que ser idéntica byte a byte
+    identical = all(
+        json_codec.dumps(o, ensure_ascii=False) == json.dumps(o, indent=2, ensure_ascii=False)
+        for o in objects
+    )
+    print(f"{'✅' if identical else '❌'} Salida indent=2 idéntica a json.dump")
+    return results
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    run_benchmark(repeat)
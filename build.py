@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Build completo de estadísticas, calendario y datos del dashboard en un solo proceso
+Todas las etapas comparten el caché de datos en memoria y se mide el tiempo de cada una
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+from trading_data import update_day_summaries, cache_info
+from pipeline_metrics import start_run, stage as metrics_stage
+
+def stage_load():
+    """
+    Actualiza el índice de resúmenes diarios
+
+    Los trades no se precargan: las etapas que los necesitan los leen
+    bajo demanda y el resto trabaja con las cabeceras y totales del índice.
+    """
+    days = update_day_summaries()
+    print(f"📂 {len(days)} resúmenes diarios disponibles")
+
+def stage_stats():
+    """Tabla de estadísticas del README"""
+    from generate_stats import generate_stats_table, update_readme
+
+    stats_table = generate_stats_table()
+    print(stats_table)
+    update_readme(stats_table)
+
+def stage_calendar():
+    """Calendario SVG y breakdown mensual del README"""
+    from generate_calendar import generate_markdown_calendar, generate_monthly_breakdown, update_readme_with_calendar
+
+    year = datetime.now().year
+    calendar_md, _ = generate_markdown_calendar(year)
+    update_readme_with_calendar(calendar_md + generate_monthly_breakdown(year))
+
+def stage_dashboard():
+    """dashboard-data.json y payloads derivados"""
+    from generate_dashboard_data import generate_dashboard_data
+    generate_dashboard_data()
+
+def stage_monthly():
+    """Datos por mes para docs/data/monthly"""
+    from generate_monthly_data import generate_all_monthly_data
+    generate_all_monthly_data()
+
+# Etapas en orden de ejecución: (nombre, función, descripción)
+STAGES = (
+    ('load', stage_load, 'Indexando exports'),
+    ('stats', stage_stats, 'Actualizando estadísticas'),
+    ('calendar', stage_calendar, 'Generando calendario'),
+    ('dashboard', stage_dashboard, 'Generando datos del dashboard'),
+    ('monthly', stage_monthly, 'Generando datos mensuales'),
+)
+
+def run_build(selected=None):
+    """
+    Ejecuta las etapas del build en un solo proceso
+
+    Args:
+        selected: Nombres de etapas a ejecutar (por defecto todas, en orden)
+
+    Returns:
+        Lista de (etapa, segundos, error) con error None si la etapa terminó bien
+    """
+    results = []
+
+    for name, stage, description in STAGES:
+        if selected and name not in selected:
+            continue
+
+        print(f"\n▶️  {description}...")
+        start = time.perf_counter()
+        try:
+            with metrics_stage(name):
+                stage()
+            error = None
+        except Exception as e:
+            error = str(e)
+            print(f"❌ Error en la etapa {name}: {e}")
+        results.append((name, time.perf_counter() - start, error))
+
+    return results
+
+def print_timings(results):
+    """Resumen de tiempos por etapa"""
+    print("\n⏱️  Tiempos por etapa:")
+    for name, elapsed, error in results:
+        status = "❌" if error else "✅"
+        print(f"  {status} {name:<10} {elapsed:7.2f}s")
+    print(f"  {'total':<13} {sum(r[1] for r in results):7.2f}s")
+
+    info = cache_info()
+    print(f"🗄️  Caché JSON: {info['hits']} aciertos, {info['misses']} lecturas de disco")
+
+if __name__ == "__main__":
+    start_run('build')
+    if not os.path.exists("exports"):
+        print("❌ No se encontró el directorio exports")
+        sys.exit(1)
+
+    stage_names = [name for name, _, _ in STAGES]
+    selected = sys.argv[1:]
+    unknown = [name for name in selected if name not in stage_names]
+    if unknown:
+        print(f"❌ Etapas desconocidas: {', '.join(unknown)} (disponibles: {', '.join(stage_names)})")
+        sys.exit(1)
+
+    results = run_build(selected)
+    print_timings(results)
+
+    if any(error for _, _, error in results):
+        sys.exit(1)
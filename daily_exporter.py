@@ -5,9 +5,13 @@ Exporta solo los trades del día actual
 """
 
 import os
-import json
 from datetime import datetime, timedelta
 from propreports_exporter import PropReportsExporter
+from json_codec import write_json
+from market_calendar import is_trading_day, holiday_name
+from trading_data import file_signature
+from trade_dedupe import update_fingerprint_index
+from pipeline_metrics import start_run, stage, count
 
 def obfuscate_account(account_name):
     """Ofusca el nombre de cuenta para mayor seguridad"""
@@ -41,7 +45,13 @@ def ensure_directory_structure():
     return base_dir
 
 def export_daily_trades():
-    """Exporta trades del día actual"""
+    """Exporta trades del día actual (nada en días sin sesión del NYSE)"""
+    today = datetime.now().strftime('%Y-%m-%d')
+    if not is_trading_day(today):
+        reason = holiday_name(today) or "fin de semana"
+        print(f"📆 {today} sin sesión ({reason}), no se exporta")
+        return None
+    
     # Configuración
     DOMAIN = os.getenv('PROPREPORTS_DOMAIN', 'zim.propreports.com')
     USERNAME = os.getenv('PROPREPORTS_USER', 'ZIMDASE9C64')
@@ -56,7 +66,6 @@ def export_daily_trades():
         return None
     
     # Obtener trades de hoy
-    today = datetime.now().strftime('%Y-%m-%d')
     yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
     
     print(f"📅 Exportando trades del día: {today}")
@@ -73,6 +82,13 @@ def export_daily_trades():
     # Filtrar solo trades de hoy (por si acaso)
     todays_trades = [t for t in trades if t.get('date') == today]
     
+    # Descartar trades que ya están guardados en otro día
+    with stage('dedupe'):
+        fingerprints = update_fingerprint_index()
+    todays_trades, duplicates = fingerprints.dedupe(today, todays_trades)
+    if duplicates:
+        print(f"🧬 {len(duplicates)} trades duplicados omitidos (ya estaban en otro día)")
+    
     if not todays_trades:
         print(f"⚠️  No hay trades para el día {today}")
         # Aún así guardar archivo vacío para mantener registro
@@ -96,6 +112,9 @@ def export_daily_trades():
         }
     }
     
+    if duplicates:
+        daily_data['metadata'] = {'duplicatesSkipped': len(duplicates)}
+    
     # Guardar en estructura de carpetas
     base_dir = ensure_directory_structure()
     daily_dir = os.path.join(base_dir, "daily")
@@ -104,8 +123,11 @@ def export_daily_trades():
     filename = os.path.join(daily_dir, f"{today}.json")
     
     # Guardar JSON
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(daily_data, f, indent=2, ensure_ascii=False)
+    with stage('write'):
+        write_json(filename, daily_data, ensure_ascii=False)
+        fingerprints.record(today, todays_trades, file_signature(filename))
+        fingerprints.save()
+    count('tradesExported', len(todays_trades))
     
     print(f"✅ Exportación diaria completada: {filename}")
     print(f"📊 Resumen: {daily_data['summary']['totalTrades']} trades, "
@@ -114,4 +136,5 @@ def export_daily_trades():
     return filename
 
 if __name__ == "__main__":
+    start_run('daily_exporter')
     export_daily_trades()
\ No newline at end of file
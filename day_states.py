@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Estado de frontera por día para rachas y extremos de trades
+Cada día guarda sus rachas inicial y final, su racha máxima, el mejor y
+peor trade y sus totales en centavos; los estados se componen en orden de
+fecha para obtener rachas anuales o históricas sin ordenar todos los trades
+y sus totales sirven de rollup diario para comparar períodos
+"""
+
+import os
+from trading_data import (get_daily_dir, list_daily_dates, load_day, file_signature, trade_net_cents, from_cents,
+                          summarize_trades, compute_metrics, data_generation)
+from json_codec import read_json, write_json
+from pipeline_metrics import count_cache
+
+STATES_VERSION = 2
+
+# Campos de racha; el resto del estado son sumas o extremos
+STREAK_KEYS = ('decided', 'leadType', 'lead', 'trailType', 'trail', 'maxWin', 'maxLoss')
+
+# Totales del día (los de trading_data.summarize_trades, en centavos)
+SUM_KEYS = ('trades', 'wins', 'losses', 'net', 'gross', 'commissions', 'grossProfit', 'grossLoss')
+
+# Estados ya actualizados en este proceso: ruta -> (generación de trading_data, estados)
+_STATES = {}
+
+def get_states_file():
+    """Ruta del archivo de estados diarios"""
+    base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
+    return os.path.join(base_dir, "index", "day-states.json")
+
+def empty_state():
+    """Estado neutro: componerlo con otro estado no lo cambia"""
+    state = {
+        'decided': 0,
+        'leadType': None,
+        'lead': 0,
+        'trailType': None,
+        'trail': 0,
+        'maxWin': 0,
+        'maxLoss': 0,
+        'bestTrade': None,
+        'worstTrade': None
+    }
+    state.update({key: 0 for key in SUM_KEYS})
+    return state
+
+def build_day_state(trades):
+    """
+    Estado de un día a partir de sus trades, en orden de apertura
+
+    Los trades en breakeven no cortan ni extienden rachas ('decided' cuenta
+    solo ganadores y perdedores). Montos en centavos enteros.
+    """
+    state = empty_state()
+    totals = summarize_trades(trades)
+    state.update({key: totals[key] for key in SUM_KEYS})
+    state['bestTrade'] = totals['maxNet']
+    state['worstTrade'] = totals['minNet']
+    current_type = None
+    current = 0
+
+    for trade in sorted(trades, key=lambda t: t.get('opened', '')):
+        net = trade_net_cents(trade)
+        if net > 0:
+            trade_type = 'win'
+        elif net < 0:
+            trade_type = 'loss'
+        else:
+            continue
+
+        state['decided'] += 1
+        current = current + 1 if trade_type == current_type else 1
+        current_type = trade_type
+
+        if state['leadType'] is None or (state['lead'] == state['decided'] - 1 and trade_type == state['leadType']):
+            state['leadType'] = trade_type
+            state['lead'] = current
+        if trade_type == 'win':
+            state['maxWin'] = max(state['maxWin'], current)
+        else:
+            state['maxLoss'] = max(state['maxLoss'], current)
+
+    state['trailType'] = current_type
+    state['trail'] = current
+    return state
+
+def _extreme(a, b, pick):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return pick(a, b)
+
+def merge_states(first, second):
+    """
+    Compone dos estados consecutivos (first antes que second)
+
+    La racha final de first se une a la inicial de second cuando son del
+    mismo tipo; si un lado es una sola racha, esa unión también se propaga
+    a la racha inicial o final del resultado.
+    """
+    if first['decided'] == 0:
+        merged = {key: second[key] for key in STREAK_KEYS}
+    elif second['decided'] == 0:
+        merged = {key: first[key] for key in STREAK_KEYS}
+    else:
+        joined = first['trailType'] == second['leadType']
+        bridge = first['trail'] + second['lead'] if joined else 0
+
+        merged = {
+            'decided': first['decided'] + second['decided'],
+            'leadType': first['leadType'],
+            'lead': first['lead'] + second['lead'] if joined and first['lead'] == first['decided'] else first['lead'],
+            'trailType': second['trailType'],
+            'trail': second['trail'] + first['trail'] if joined and second['trail'] == second['decided'] else second['trail'],
+            'maxWin': max(first['maxWin'], second['maxWin'], bridge if first['trailType'] == 'win' else 0),
+            'maxLoss': max(first['maxLoss'], second['maxLoss'], bridge if first['trailType'] == 'loss' else 0)
+        }
+
+    merged['bestTrade'] = _extreme(first['bestTrade'], second['bestTrade'], max)
+    merged['worstTrade'] = _extreme(first['worstTrade'], second['worstTrade'], min)
+    for key in SUM_KEYS:
+        merged[key] = first[key] + second[key]
+    return merged
+
+def compose_states(states):
+    """Compone una secuencia de estados en orden de fecha en O(días)"""
+    result = empty_state()
+    for state in states:
+        result = merge_states(result, state)
+    return result
+
+def update_day_states(states_file=None):
+    """
+    Actualiza los estados recalculando solo los días cuyo archivo cambió
+
+    Se revisa una vez por proceso (el build la pide desde las estadísticas
+    y desde el dashboard) hasta el siguiente trading_data.clear_cache().
+
+    Returns:
+        Dict fecha -> estado, en orden de fecha
+    """
+    if states_file is None:
+        states_file = get_states_file()
+    memo = _STATES.get(states_file)
+    if memo is not None and memo[0] == data_generation():
+        return memo[1]
+    daily_dir = get_daily_dir()
+
+    stored = {'version': STATES_VERSION, 'days': {}}
+    if os.path.exists(states_file):
+        try:
+            loaded = read_json(states_file)
+            if loaded.get('version') == STATES_VERSION:
+                stored = loaded
+        except Exception:
+            pass
+
+    days = {}
+    rebuilt = 0
+
+    for date_str in list_daily_dates():
+        signature = file_signature(os.path.join(daily_dir, f"{date_str}.json"))
+
+        previous = stored['days'].get(date_str)
+        if previous and previous['signature'] == signature:
+            days[date_str] = previous
+            continue
+
+        data = load_day(date_str)
+        if data is None:
+            continue
+
+        days[date_str] = {'signature': signature, 'state': build_day_state(data.get('trades', []))}
+        rebuilt += 1
+
+    count_cache('dayStates', len(days) - rebuilt, rebuilt)
+    removed = len(set(stored['days']) - set(days))
+    if rebuilt or removed or not os.path.exists(states_file):
+        os.makedirs(os.path.dirname(states_file), exist_ok=True)
+        write_json(states_file, {'version': STATES_VERSION, 'days': days}, compact=True)
+        print(f"🔗 Estados diarios actualizados: {rebuilt} días recalculados de {len(days)}")
+
+    states = {date_str: day['state'] for date_str, day in days.items()}
+    _STATES[states_file] = (data_generation(), states)
+    return states
+
+def streak_metrics(state):
+    """Métricas de rachas y extremos de un estado compuesto, en dólares"""
+    return {
+        'profit_factor': compute_metrics(state, ('profitFactor',))['profitFactor'],
+        'biggest_win': from_cents(max(state['bestTrade'] or 0, 0)),
+        'biggest_loss': from_cents(min(state['worstTrade'] or 0, 0)),
+        'total_fees': from_cents(state['commissions']),
+        'max_win_streak': state['maxWin'],
+        'max_loss_streak': state['maxLoss'],
+        'current_streak': state['trail'],
+        'current_streak_type': state['trailType'] or 'none'
+    }
+
+if __name__ == "__main__":
+    states = update_day_states()
+    total = compose_states(states.values())
+    metrics = streak_metrics(total)
+    print(f"📊 {len(states)} días, {total['trades']} trades, "
+          f"racha máxima: {metrics['max_win_streak']} ganadores / {metrics['max_loss_streak']} perdedores, "
+          f"racha actual: {metrics['current_streak']} ({metrics['current_streak_type']})")
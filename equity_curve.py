@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Curva de equity a nivel de trade y drawdown intradía
+Ordena los trades por hora de cierre y mide drawdown, tiempo bajo el agua
+y tiempo de recuperación por día y por mes sobre todo el historial
+"""
+
+import os
+import calendar
+from datetime import datetime
+import numpy as np
+from trading_data import iter_days, trade_net
+from json_codec import write_json
+
+def trade_close_timestamp(trade):
+    """
+    Timestamp de cierre del trade en segundos epoch
+
+    PropReports agrupa los trades bajo la fecha de cierre, así que la fecha
+    del trade más la hora de 'closed' identifican el cierre exacto.
+    """
+    closed = trade.get('closed', '') or '00:00:00'
+    time_part = closed.split(' ')[-1]
+    return calendar.timegm(datetime.strptime(f"{trade['date']} {time_part}", '%Y-%m-%d %H:%M:%S').timetuple())
+
+def load_trade_arrays():
+    """Carga todos los trades como arrays columnares (fecha, cierre, neto)"""
+    dates = []
+    close_ts = []
+    net = []
+
+    for data in iter_days():
+        for trade in data.get('trades', []):
+            try:
+                close_ts.append(trade_close_timestamp(trade))
+            except (KeyError, ValueError):
+                continue
+            dates.append(trade['date'])
+            net.append(trade_net(trade))
+
+    return trades_to_arrays(dates, close_ts, net)
+
+def trades_to_arrays(dates, close_ts, net):
+    """
+    Empaqueta columnas de trades en arrays NumPy ordenados por hora de cierre
+
+    El neto se guarda en centavos enteros para que los acumulados sean exactos.
+    """
+    order = np.argsort(np.asarray(close_ts, dtype=np.int64), kind='stable')
+    return {
+        'dates': np.asarray(dates, dtype='U10')[order],
+        'close_ts': np.asarray(close_ts, dtype=np.int64)[order],
+        'net_cents': np.rint(np.asarray(net, dtype=np.float64) * 100).astype(np.int64)[order]
+    }
+
+def grouped_drawdowns(close_ts, net_cents, group_ids):
+    """
+    Drawdown trade a trade dentro de cada grupo (día, mes...)
+
+    El equity de cada grupo parte de cero y su pico inicial también es cero,
+    así que un primer trade perdedor ya cuenta como drawdown. Los arrays deben
+    venir ordenados por hora de cierre con los grupos contiguos.
+
+    Returns:
+        Diccionario con el equity del grupo por trade y, por grupo, el máximo
+        drawdown (ambos en centavos), el tiempo bajo el agua y el tiempo de
+        recuperación (-1 si no se recuperó).
+    """
+    n = len(net_cents)
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return {'equity': empty, 'starts': np.zeros(0, dtype=np.int64), 'max_drawdown': empty,
+                'time_under_water': empty, 'recovery': empty}
+
+    starts = np.flatnonzero(np.r_[True, group_ids[1:] != group_ids[:-1]])
+    group_index = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+
+    # Equity relativo al inicio de cada grupo
+    cumulative = np.cumsum(net_cents)
+    base = (cumulative - net_cents)[starts]
+    equity = cumulative - base[group_index]
+
+    # Máximo acumulado por grupo: un offset creciente por grupo evita que
+    # el pico de un grupo se arrastre al siguiente
+    offset = group_index * (2 * np.abs(equity).max() + 1)
+    peaks = np.maximum(np.maximum.accumulate(equity + offset) - offset, 0)
+    drawdown = peaks - equity
+
+    max_drawdown = np.maximum.reduceat(drawdown, starts)
+
+    # Tiempo bajo el agua: intervalos entre cierres consecutivos del mismo grupo
+    # en los que el equity está por debajo de su pico
+    gaps = np.r_[np.diff(close_ts), 0]
+    same_group = np.r_[group_index[1:] == group_index[:-1], False]
+    under_water = np.where(same_group & (drawdown > 0), gaps, 0)
+    time_under_water = np.add.reduceat(under_water, starts)
+
+    # Recuperación: desde el valle del máximo drawdown hasta volver al pico previo
+    positions = np.arange(n)
+    is_trough = drawdown == max_drawdown[group_index]
+    trough = np.minimum.reduceat(np.where(is_trough, positions, n), starts)
+    trough_peak = peaks[trough]
+    recovered = (positions > trough[group_index]) & (equity >= trough_peak[group_index])
+    recovery_index = np.minimum.reduceat(np.where(recovered, positions, n), starts)
+
+    has_recovery = (recovery_index < n) & (max_drawdown > 0)
+    recovery = np.where(
+        has_recovery,
+        close_ts[np.minimum(recovery_index, n - 1)] - close_ts[trough],
+        np.where(max_drawdown > 0, -1, 0)
+    )
+
+    return {
+        'equity': equity,
+        'starts': starts,
+        'max_drawdown': max_drawdown,
+        'time_under_water': time_under_water,
+        'recovery': recovery
+    }
+
+def calculate_intraday_drawdowns(trades):
+    """
+    Drawdown a nivel de trade para una lista de trades de un período
+
+    Returns:
+        Diccionario con el drawdown trade a trade del período completo y el
+        peor drawdown intradía (equity reiniciado cada día).
+    """
+    rows = []
+    for trade in trades:
+        try:
+            rows.append((trade['date'], trade_close_timestamp(trade), trade_net(trade)))
+        except (KeyError, ValueError):
+            continue
+
+    if not rows:
+        return {
+            'trade_level_max_drawdown': 0,
+            'max_intraday_drawdown': 0,
+            'max_intraday_drawdown_date': None,
+            'time_under_water_minutes': 0
+        }
+
+    arrays = trades_to_arrays(*zip(*rows))
+
+    net_cents = arrays['net_cents']
+    period = grouped_drawdowns(arrays['close_ts'], net_cents, np.zeros(len(net_cents), dtype=np.int64))
+    daily = grouped_drawdowns(arrays['close_ts'], net_cents, arrays['dates'])
+    worst = int(np.argmax(daily['max_drawdown']))
+
+    return {
+        'trade_level_max_drawdown': int(period['max_drawdown'][0]) / 100,
+        'max_intraday_drawdown': int(daily['max_drawdown'][worst]) / 100,
+        'max_intraday_drawdown_date': str(arrays['dates'][daily['starts'][worst]]),
+        'time_under_water_minutes': round(float(daily['time_under_water'].sum()) / 60, 1)
+    }
+
+def _group_payload(labels, stats):
+    return {
+        'labels': labels,
+        'maxDrawdown': (stats['max_drawdown'] / 100).tolist(),
+        'timeUnderWater': stats['time_under_water'].astype(np.int64).tolist(),
+        'recovery': stats['recovery'].astype(np.int64).tolist()
+    }
+
+def export_equity_curve(output_file='docs/data/equity-curve.json'):
+    """
+    Genera el payload compacto de la curva de equity para el dashboard
+
+    Los tiempos van en segundos desde 't0' y los tiempos bajo el agua y de
+    recuperación en segundos (-1 = drawdown sin recuperar al cierre del grupo).
+    """
+    arrays = load_trade_arrays()
+    close_ts = arrays['close_ts']
+    net_cents = arrays['net_cents']
+
+    if len(net_cents) == 0:
+        print("⚠️  No hay trades para generar la curva de equity")
+        return None
+
+    months = arrays['dates'].astype('U7')
+    daily = grouped_drawdowns(close_ts, net_cents, arrays['dates'])
+    monthly = grouped_drawdowns(close_ts, net_cents, months)
+
+    t0 = int(close_ts[0])
+    payload = {
+        't0': t0,
+        't': (close_ts - t0).tolist(),
+        'equity': (np.cumsum(net_cents) / 100).tolist(),
+        'days': _group_payload(arrays['dates'][daily['starts']].tolist(), daily),
+        'months': _group_payload(months[monthly['starts']].tolist(), monthly)
+    }
+
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    write_json(output_file, payload, compact=True)
+
+    print(f"✅ Curva de equity generada en {output_file} ({len(net_cents)} trades)")
+    return output_file
+
+if __name__ == "__main__":
+    export_equity_curve()
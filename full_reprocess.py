@@ -5,10 +5,16 @@ Reprocesador completo que genera todos los resúmenes necesarios
 
 import os
 import sys
+import io
+import calendar
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from advanced_exporter import reprocess_recent_days, export_date_range
 from weekly_summary import generate_weekly_summary
 from monthly_summary import generate_monthly_summary
+from trading_data import list_daily_dates, load_day
+from pipeline_metrics import start_run, stage
 
 def get_weeks_in_range(start_date, end_date):
     """Obtiene todas las semanas en un rango de fechas"""
@@ -38,10 +44,71 @@ def get_months_in_range(start_date, end_date):
     
     return sorted(months)
 
-def full_reprocess(days_back=60):
+def load_trade_table(start_date, end_date):
+    """Carga una sola vez todos los archivos diarios del rango, indexados por fecha"""
+    table = {}
+    for date_str in list_daily_dates(start_date, end_date):
+        data = load_day(date_str)
+        if data is not None:
+            table[date_str] = data
+    return table
+
+def days_from_table(table, start_date, end_date):
+    """Días de la tabla dentro del rango, en orden de fecha"""
+    start_str = start_date.strftime('%Y-%m-%d')
+    end_str = end_date.strftime('%Y-%m-%d')
+    return [table[date] for date in sorted(table) if start_str <= date <= end_str]
+
+def _weekly_job(args):
+    """Genera un resumen semanal capturando su salida para imprimirla en orden"""
+    week_start, daily_data = args
+    output = io.StringIO()
+    with redirect_stdout(output):
+        try:
+            filename = generate_weekly_summary(week_start, daily_data=daily_data)
+            error = None
+        except Exception as e:
+            filename = None
+            error = str(e)
+    return filename, error, output.getvalue()
+
+def _monthly_job(args):
+    """Genera un resumen mensual capturando su salida para imprimirla en orden"""
+    year, month, daily_data = args
+    output = io.StringIO()
+    with redirect_stdout(output):
+        try:
+            filename = generate_monthly_summary(year, month, daily_data=daily_data)
+            error = None
+        except Exception as e:
+            filename = None
+            error = str(e)
+    return filename, error, output.getvalue()
+
+def run_period_jobs(job, args_list, workers=1):
+    """
+    Ejecuta trabajos de resumen por período, en serie o en un pool de procesos
+    
+    Los resultados se devuelven en el mismo orden que args_list, así que la
+    salida y los archivos generados son idénticos con cualquier número de workers.
+    """
+    if workers <= 1 or len(args_list) <= 1:
+        return [job(args) for args in args_list]
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(args_list))) as executor:
+        return list(executor.map(job, args_list))
+
+def full_reprocess(days_back=60, workers=1):
     """
     Reprocesa días, genera resúmenes semanales y mensuales automáticamente
+    
+    Args:
+        days_back: Días hacia atrás a reprocesar
+        workers: Procesos para generar los resúmenes (1 = en serie, 0 = todos los CPUs)
     """
+    if workers == 0:
+        workers = os.cpu_count() or 1
+
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days_back)
     
@@ -51,44 +118,70 @@ def full_reprocess(days_back=60):
     
     # 1. Exportar todos los días
     print("\n📊 FASE 1: Exportando datos diarios...")
-    exported_files = export_date_range(start_date, end_date, force_update=True)
+    with stage('export'):
+        exported_files = export_date_range(start_date, end_date, force_update=True)
     print(f"✅ Exportados {len(exported_files)} archivos diarios")
     
-    # 2. Generar resúmenes semanales
-    print("\n📊 FASE 2: Generando resúmenes semanales...")
+    # Cargar una sola vez todos los días que cubren las semanas y meses del rango
     weeks = get_weeks_in_range(start_date, end_date)
-    weekly_count = 0
+    months = get_months_in_range(start_date, end_date)
+    first_month_day = datetime(months[0][0], months[0][1], 1)
+    last_year, last_month = months[-1]
+    last_month_day = datetime(last_year, last_month, calendar.monthrange(last_year, last_month)[1])
+    with stage('load'):
+        trade_table = load_trade_table(
+            min(weeks[0], first_month_day).replace(hour=0, minute=0, second=0, microsecond=0),
+            max(weeks[-1] + timedelta(days=6), last_month_day)
+        )
+    
+    # 2. Generar resúmenes semanales
+    print(f"\n📊 FASE 2: Generando resúmenes semanales ({workers} workers)...")
+    weekly_jobs = []
     
     for week_start in weeks:
-        try:
-            # Solo generar si la semana ya terminó o es la actual
-            week_end = week_start + timedelta(days=6)
-            if week_end <= end_date or week_start <= end_date:
-                print(f"  📅 Procesando semana del {week_start.strftime('%Y-%m-%d')}...")
-                generate_weekly_summary(week_start)
-                weekly_count += 1
-        except Exception as e:
-            print(f"  ⚠️  Error procesando semana {week_start}: {e}")
+        # Solo generar si la semana ya terminó o es la actual
+        week_end = week_start + timedelta(days=6)
+        if week_end <= end_date or week_start <= end_date:
+            weekly_jobs.append((week_start, days_from_table(trade_table, week_start, week_end)))
+    
+    with stage('weekly'):
+        weekly_results = run_period_jobs(_weekly_job, weekly_jobs, workers)
+    
+    weekly_count = 0
+    for (week_start, _), (filename, error, output) in zip(weekly_jobs, weekly_results):
+        print(f"  📅 Procesando semana del {week_start.strftime('%Y-%m-%d')}...")
+        print(output, end='')
+        if error:
+            print(f"  ⚠️  Error procesando semana {week_start}: {error}")
+        else:
+            weekly_count += 1
     
     print(f"✅ Generados {weekly_count} resúmenes semanales")
     
     # 3. Generar resúmenes mensuales
-    print("\n📊 FASE 3: Generando resúmenes mensuales...")
-    months = get_months_in_range(start_date, end_date)
-    monthly_count = 0
+    print(f"\n📊 FASE 3: Generando resúmenes mensuales ({workers} workers)...")
+    current_month = datetime.now().month
+    current_year = datetime.now().year
+    monthly_jobs = []
     
     for year, month in months:
-        try:
-            # Solo generar si el mes ya terminó o es el actual
-            current_month = datetime.now().month
-            current_year = datetime.now().year
-            
-            if (year < current_year) or (year == current_year and month <= current_month):
-                print(f"  📅 Procesando {year}-{month:02d}...")
-                generate_monthly_summary(year, month)
-                monthly_count += 1
-        except Exception as e:
-            print(f"  ⚠️  Error procesando mes {year}-{month:02d}: {e}")
+        # Solo generar si el mes ya terminó o es el actual
+        if (year < current_year) or (year == current_year and month <= current_month):
+            month_start = datetime(year, month, 1)
+            month_end = datetime(year, month, calendar.monthrange(year, month)[1])
+            monthly_jobs.append((year, month, days_from_table(trade_table, month_start, month_end)))
+    
+    with stage('monthly'):
+        monthly_results = run_period_jobs(_monthly_job, monthly_jobs, workers)
+    
+    monthly_count = 0
+    for (year, month, _), (filename, error, output) in zip(monthly_jobs, monthly_results):
+        print(f"  📅 Procesando {year}-{month:02d}...")
+        print(output, end='')
+        if error:
+            print(f"  ⚠️  Error procesando mes {year}-{month:02d}: {error}")
+        else:
+            monthly_count += 1
     
     print(f"✅ Generados {monthly_count} resúmenes mensuales")
     
@@ -100,9 +193,13 @@ def full_reprocess(days_back=60):
     print(f"  - {monthly_count} resúmenes mensuales")
 
 if __name__ == "__main__":
+    start_run('full_reprocess')
     if len(sys.argv) > 1:
         days = int(sys.argv[1])
-        full_reprocess(days)
+        workers = int(os.getenv('REPROCESS_WORKERS', '1'))
+        if '--workers' in sys.argv:
+            workers = int(sys.argv[sys.argv.index('--workers') + 1])
+        full_reprocess(days, workers=workers)
     else:
-        print("Uso: python full_reprocess.py <días>")
-        print("Ejemplo: python full_reprocess.py 60")
\ No newline at end of file
+        print("Uso: python full_reprocess.py <días> [--workers N]")
+        print("Ejemplo: python full_reprocess.py 60 --workers 4")
\ No newline at end of file
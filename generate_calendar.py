@@ -4,43 +4,19 @@ Generador de calendario de trading estilo GitHub contributions
 """
 
 import os
-import json
 from datetime import datetime, timedelta
 from collections import defaultdict
-
-def load_json_file(filepath):
-    """Carga un archivo JSON de forma segura"""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except:
-        return None
+from trading_data import aggregate, load_json_keys, to_cents, from_cents
+from pipeline_metrics import start_run
 
 def get_year_data(year):
     """Obtiene todos los datos de trading de un año"""
-    daily_data = {}
-    
-    # Cargar todos los archivos diarios del año
-    start_date = datetime(year, 1, 1)
-    end_date = datetime(year, 12, 31)
+    rows = aggregate(datetime(year, 1, 1), datetime(year, 12, 31), 'day', ['trades', 'netPnL', 'winRate'])
     
-    current = start_date
-    while current <= end_date:
-        date_str = current.strftime('%Y-%m-%d')
-        filepath = f"exports/daily/{date_str}.json"
-        
-        if os.path.exists(filepath):
-            data = load_json_file(filepath)
-            if data:
-                daily_data[date_str] = {
-                    'trades': data['summary']['totalTrades'],
-                    'pnl': data['summary']['netPnL'],
-                    'winRate': data['summary']['winningTrades'] / data['summary']['totalTrades'] if data['summary']['totalTrades'] > 0 else 0
-                }
-        
-        current += timedelta(days=1)
-    
-    return daily_data
+    return {
+        row['period']: {'trades': row['trades'], 'pnl': row['netPnL'], 'winRate': row['winRate']}
+        for row in rows
+    }
 
 def generate_svg_calendar(year_data, year):
     """Genera un calendario SVG estilo GitHub contributions"""
@@ -177,7 +153,7 @@ def generate_markdown_calendar(year):
 def calculate_year_stats(year_data):
     """Calcula estadísticas del año"""
     total_trades = 0
-    total_pnl = 0
+    total_cents = 0
     profit_days = 0
     loss_days = 0
     best_day = None
@@ -188,7 +164,7 @@ def calculate_year_stats(year_data):
     for date, data in year_data.items():
         if data['trades'] > 0:
             total_trades += data['trades']
-            total_pnl += data['pnl']
+            total_cents += to_cents(data['pnl'])
             
             if data['pnl'] > 0:
                 profit_days += 1
@@ -204,6 +180,7 @@ def calculate_year_stats(year_data):
                 worst_day = date
     
     trading_days = len([d for d in year_data.values() if d['trades'] > 0])
+    total_pnl = from_cents(total_cents)
     
     return {
         'trading_days': trading_days,
@@ -218,7 +195,7 @@ def calculate_year_stats(year_data):
         'best_day_pnl': best_pnl if best_pnl != -float('inf') else 0,
         'worst_day': worst_day or 'N/A',
         'worst_day_pnl': worst_pnl if worst_pnl != float('inf') else 0,
-        'daily_avg': (total_pnl / trading_days) if trading_days > 0 else 0
+        'daily_avg': from_cents(total_cents / trading_days) if trading_days > 0 else 0
     }
 
 def generate_monthly_breakdown(year):
@@ -228,7 +205,7 @@ def generate_monthly_breakdown(year):
     for month in range(1, 13):
         month_file = f"exports/monthly/{year}-{month:02d}.json"
         if os.path.exists(month_file):
-            data = load_json_file(month_file)
+            data = load_json_keys(month_file, ('monthName', 'overview'))
             if data:
                 monthly_stats.append({
                     'month': data['monthName'],
@@ -281,6 +258,7 @@ def update_readme_with_calendar(calendar_content):
         return False
 
 if __name__ == "__main__":
+    start_run('generate_calendar')
     year = datetime.now().year
     
     # Generar calendario y estadísticas
@@ -4,97 +4,32 @@ Genera datos JSON para el dashboard de GitHub Pages
 """
 
 import os
-import json
 from datetime import datetime
-from generate_calendar import get_year_data, calculate_year_stats, load_json_file
+from generate_calendar import get_year_data, calculate_year_stats
+from rolling_metrics import export_rolling_metrics
+from equity_curve import export_equity_curve
+from trade_cube import update_trade_cube, export_cube_payload
+from symbol_index import update_symbol_index
+from symbol_matrix import update_symbol_matrix, export_symbol_heatmap_payload
+from yearly_rollups import get_all_rollups, calculate_all_time_stats, calculate_year_over_year
+from trading_data import load_json_keys, cache_info
+from day_states import update_day_states, compose_states, streak_metrics
+from quantile_sketches import export_distribution_payload
+from json_codec import write_json
+from pipeline_metrics import start_run
 
-def calculate_enhanced_metrics(year_data):
-    """Calcula métricas adicionales para el dashboard"""
-    all_trades = []
-    total_gross_profit = 0
-    total_gross_loss = 0
-    total_fees = 0
-    
-    # Recopilar todos los trades del año
-    for date, day_data in year_data.items():
-        daily_file = f"exports/daily/{date}.json"
-        if os.path.exists(daily_file):
-            daily_data = load_json_file(daily_file)
-            if daily_data and 'trades' in daily_data:
-                all_trades.extend(daily_data['trades'])
-    
-    if not all_trades:
-        return {
-            'profit_factor': 0,
-            'biggest_win': 0,
-            'biggest_loss': 0,
-            'total_fees': 0,
-            'max_win_streak': 0,
-            'max_loss_streak': 0,
-            'current_streak': 0,
-            'current_streak_type': 'none'
-        }
-    
-    # Ordenar trades por fecha y hora
-    all_trades.sort(key=lambda x: (x['date'], x['opened']))
-    
-    # Calcular métricas
-    biggest_win = 0
-    biggest_loss = 0
-    current_streak = 0
-    max_win_streak = 0
-    max_loss_streak = 0
-    last_trade_type = None
-    
-    for trade in all_trades:
-        pnl = trade.get('pnl', 0)
-        net = trade.get('net', pnl)
-        commission = trade.get('commission', 0)
-        
-        # Acumular comisiones
-        total_fees += commission
-        
-        # Profit factor calculation
-        if pnl > 0:
-            total_gross_profit += pnl
-        else:
-            total_gross_loss += abs(pnl)
-        
-        # Biggest win/loss
-        if net > biggest_win:
-            biggest_win = net
-        if net < biggest_loss:
-            biggest_loss = net
-        
-        # Streak calculation
-        if net > 0:
-            if last_trade_type == 'win':
-                current_streak += 1
-            else:
-                current_streak = 1
-                last_trade_type = 'win'
-            max_win_streak = max(max_win_streak, current_streak)
-        elif net < 0:
-            if last_trade_type == 'loss':
-                current_streak += 1
-            else:
-                current_streak = 1
-                last_trade_type = 'loss'
-            max_loss_streak = max(max_loss_streak, current_streak)
-    
-    # Calculate profit factor
-    profit_factor = (total_gross_profit / total_gross_loss) if total_gross_loss > 0 else float('inf') if total_gross_profit > 0 else 0
-    
-    return {
-        'profit_factor': round(profit_factor, 2) if profit_factor != float('inf') else 999.99,
-        'biggest_win': round(biggest_win, 2),
-        'biggest_loss': round(biggest_loss, 2),
-        'total_fees': round(total_fees, 2),
-        'max_win_streak': max_win_streak,
-        'max_loss_streak': max_loss_streak,
-        'current_streak': current_streak if last_trade_type else 0,
-        'current_streak_type': last_trade_type or 'none'
-    }
+def calculate_enhanced_metrics(year_data, day_states=None):
+    """
+    Calcula métricas adicionales para el dashboard
+
+    Rachas, extremos y comisiones salen de componer en orden los estados
+    por día (ver day_states.py), sin juntar ni ordenar todos los trades.
+    """
+    if day_states is None:
+        day_states = update_day_states()
+
+    year_states = [day_states[date] for date in sorted(year_data) if date in day_states]
+    return streak_metrics(compose_states(year_states))
 
 def generate_dashboard_data():
     """Genera un archivo JSON con todos los datos necesarios para el dashboard"""
@@ -104,8 +39,9 @@ def generate_dashboard_data():
     year_data = get_year_data(year)
     stats = calculate_year_stats(year_data)
     
-    # Calcular métricas mejoradas
-    enhanced_metrics = calculate_enhanced_metrics(year_data)
+    # Calcular métricas mejoradas desde los estados por día
+    day_states = update_day_states()
+    enhanced_metrics = calculate_enhanced_metrics(year_data, day_states)
     
     # Combinar todas las estadísticas
     stats.update(enhanced_metrics)
@@ -115,7 +51,7 @@ def generate_dashboard_data():
     for month in range(1, 13):
         month_file = f"exports/monthly/{year}-{month:02d}.json"
         if os.path.exists(month_file):
-            data = load_json_file(month_file)
+            data = load_json_keys(month_file, ('monthName', 'overview'))
             if data:
                 monthly_data.append({
                     'month': month,
@@ -130,7 +66,7 @@ def generate_dashboard_data():
     for week in range(1, 54):
         week_file = f"exports/weekly/{year}-W{week:02d}.json"
         if os.path.exists(week_file):
-            data = load_json_file(week_file)
+            data = load_json_keys(week_file, ('weekPeriod', 'summary'))
             if data:
                 weekly_data.append({
                     'week': week,
@@ -140,22 +76,54 @@ def generate_dashboard_data():
                     'winRate': data['summary']['winRate']
                 })
     
+    # Vistas históricas desde rollups (solo el año en curso se recalcula)
+    rollups = get_all_rollups()
+    all_time_stats = calculate_all_time_stats(rollups)
+    all_time_streaks = streak_metrics(compose_states(day_states.values()))
+    all_time_stats['maxWinStreak'] = all_time_streaks['max_win_streak']
+    all_time_stats['maxLossStreak'] = all_time_streaks['max_loss_streak']
+    
     # Crear objeto de datos completo
     dashboard_data = {
         'lastUpdate': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'year': year,
-        'yearData': year_data,
         'yearStats': stats,
+        'allTimeStats': all_time_stats,
+        'yearOverYear': calculate_year_over_year(rollups),
         'monthlyData': monthly_data,
-        'weeklyData': weekly_data
+        'weeklyData': weekly_data,
+        # Un registro por día: al final para que los lectores por claves no lo recorran
+        'yearData': year_data
     }
     
     # Guardar en docs para GitHub Pages
     os.makedirs('docs', exist_ok=True)
-    with open('docs/dashboard-data.json', 'w') as f:
-        json.dump(dashboard_data, f, indent=2)
+    write_json('docs/dashboard-data.json', dashboard_data)
     
     print("✅ Dashboard data generado en docs/dashboard-data.json")
+    
+    # Series móviles (5/20/60 días) en un payload aparte para no inflar dashboard-data.json
+    export_rolling_metrics()
+    
+    # Curva de equity trade a trade precalculada para los gráficos
+    export_equity_curve()
+    
+    # Cubo de trades (se reconstruyen solo los días modificados)
+    export_cube_payload(update_trade_cube())
+    
+    # Índice por símbolo para consultas históricas instantáneas
+    symbol_index = update_symbol_index()
+    
+    # Matriz símbolo × día: heatmap, concentración y recurrencia de símbolos
+    export_symbol_heatmap_payload(update_symbol_matrix(symbol_index))
+    
+    # Percentiles de P&L, R y holding por período desde sketches diarios combinables
+    export_distribution_payload()
+    
+    info = cache_info()
+    print(f"🗄️  Caché JSON: {info['hits']} aciertos, {info['misses']} lecturas de disco, "
+          f"{info['entries']} archivos en memoria")
 
 if __name__ == "__main__":
+    start_run('generate_dashboard_data')
     generate_dashboard_data()
\ No newline at end of file
@@ -4,21 +4,16 @@ Genera datos JSON para cada mes individual
 """
 
 import os
-import json
+import calendar
 from datetime import datetime
+from trading_data import aggregate, aggregate_total, load_days, trade_net
+from json_codec import write_json
+from pipeline_metrics import start_run
 
-def load_json_file(filepath):
-    """Carga un archivo JSON de forma segura"""
-    try:
-        with open(filepath, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error cargando {filepath}: {e}")
-        return None
-
-def generate_monthly_data():
+def generate_monthly_data(year=None):
     """Genera archivos JSON para cada mes con datos detallados"""
-    year = datetime.now().year
+    if year is None:
+        year = datetime.now().year
     
     # Crear directorio para datos mensuales
     os.makedirs('docs/data/monthly', exist_ok=True)
@@ -44,58 +39,67 @@ def generate_monthly_data():
         }
         
         # Recopilar todos los trades del mes
-        for day in range(1, 32):
-            try:
-                date_str = f"{year}-{month:02d}-{day:02d}"
-                daily_file = f"exports/daily/{date_str}.json"
-                
-                if os.path.exists(daily_file):
-                    daily_data = load_json_file(daily_file)
-                    if daily_data and daily_data.get('trades'):
-                        # Guardar datos diarios
-                        month_data['dailyData'][date_str] = {
-                            'trades': len(daily_data['trades']),
-                            'pnl': daily_data['summary']['netPnL'],
-                            'winRate': daily_data['summary'].get('winRate', 0)
-                        }
-                        
-                        # Agregar trades
-                        month_trades.extend(daily_data['trades'])
-                        
-                        # Actualizar resumen
-                        month_data['summary']['totalTrades'] += len(daily_data['trades'])
-                        month_data['summary']['totalPnL'] += daily_data['summary']['netPnL']
-                        month_data['summary']['tradingDays'] += 1
-                        
-                        # Best/worst day
-                        if daily_data['summary']['netPnL'] > month_data['summary']['bestDayPnL']:
-                            month_data['summary']['bestDayPnL'] = daily_data['summary']['netPnL']
-                            month_data['summary']['bestDay'] = date_str
-                        
-                        if daily_data['summary']['netPnL'] < month_data['summary']['worstDayPnL']:
-                            month_data['summary']['worstDayPnL'] = daily_data['summary']['netPnL']
-                            month_data['summary']['worstDay'] = date_str
-            except:
+        first_day = f"{year}-{month:02d}-01"
+        last_day = f"{year}-{month:02d}-{calendar.monthrange(year, month)[1]:02d}"
+        
+        for row in aggregate(first_day, last_day, 'day', ['trades', 'netPnL', 'winRate']):
+            if row['trades'] == 0:
                 continue
+            date_str = row['period']
+            
+            # Guardar datos diarios
+            month_data['dailyData'][date_str] = {
+                'trades': row['trades'],
+                'pnl': row['netPnL'],
+                'winRate': row['winRate']
+            }
+            
+            # Best/worst day
+            if row['netPnL'] > month_data['summary']['bestDayPnL']:
+                month_data['summary']['bestDayPnL'] = row['netPnL']
+                month_data['summary']['bestDay'] = date_str
+            
+            if row['netPnL'] < month_data['summary']['worstDayPnL']:
+                month_data['summary']['worstDayPnL'] = row['netPnL']
+                month_data['summary']['worstDay'] = date_str
+        
+        for daily_data in load_days(first_day, last_day):
+            month_trades.extend(daily_data.get('trades', []))
+        
+        # Actualizar resumen
+        totals = aggregate_total(first_day, last_day, ['trades', 'netPnL', 'tradingDays', 'winRate'])
+        month_data['summary']['totalTrades'] = totals['trades']
+        month_data['summary']['totalPnL'] = totals['netPnL']
+        month_data['summary']['tradingDays'] = totals['tradingDays']
         
         # Calcular win rate
         if month_trades:
-            winning_trades = [t for t in month_trades if (t.get('net', t.get('pnl', 0))) > 0]
-            month_data['summary']['winRate'] = len(winning_trades) / len(month_trades) * 100
+            month_data['summary']['winRate'] = round(totals['winRate'] * 100, 2)
             
             # Ordenar trades por P&L
-            sorted_trades = sorted(month_trades, key=lambda x: x.get('net', x.get('pnl', 0)), reverse=True)
+            sorted_trades = sorted(month_trades, key=trade_net, reverse=True)
             
             # Top 5 winners y losers
-            month_data['topWinners'] = sorted_trades[:5] if len(sorted_trades) >= 5 else sorted_trades[:len([t for t in sorted_trades if t.get('net', t.get('pnl', 0)) > 0])]
-            month_data['topLosers'] = sorted([t for t in sorted_trades if t.get('net', t.get('pnl', 0)) < 0], key=lambda x: x.get('net', x.get('pnl', 0)))[:5]
+            month_data['topWinners'] = sorted_trades[:5] if len(sorted_trades) >= 5 else sorted_trades[:len([t for t in sorted_trades if trade_net(t) > 0])]
+            month_data['topLosers'] = sorted([t for t in sorted_trades if trade_net(t) < 0], key=trade_net)[:5]
         
         # Guardar archivo del mes
         month_file = f"docs/data/monthly/{year}-{month:02d}.json"
-        with open(month_file, 'w') as f:
-            json.dump(month_data, f, indent=2)
+        write_json(month_file, month_data)
         
         print(f"✅ Datos generados para {year}-{month:02d}")
 
+def generate_all_monthly_data():
+    """Genera el año en curso y completa los años cerrados que todavía no tienen datos publicados"""
+    from yearly_rollups import discover_years
+    
+    current_year = datetime.now().year
+    for closed_year in discover_years():
+        if closed_year < current_year and not os.path.exists(f"docs/data/monthly/{closed_year}-12.json"):
+            generate_monthly_data(closed_year)
+    
+    generate_monthly_data(current_year)
+
 if __name__ == "__main__":
-    generate_monthly_data()
\ No newline at end of file
+    start_run('generate_monthly_data')
+    generate_all_monthly_data()
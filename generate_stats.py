@@ -4,147 +4,87 @@ Generador de estadísticas dinámicas para el README
 """
 
 import os
-import json
-import glob
-from datetime import datetime, timedelta
+from datetime import datetime
 from collections import defaultdict
+from period_compare import load_comparer, period_range
+from pipeline_metrics import start_run
 
-def load_json_file(filepath):
-    """Carga un archivo JSON de forma segura"""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except:
-        return None
+def period_stats(comparer, kind, offset, label):
+    """Trades, P&L y win rate de un período desde los rollups diarios"""
+    start, end = period_range(kind, None, offset)
+    stats = comparer.totals(start, end)
+    win_rate = f"{stats['winRate']*100:.1f}%" if stats['trades'] > 0 else "0%"
+    
+    return {
+        'period': label,
+        'trades': stats['trades'],
+        'pnl': stats['netPnL'],
+        'winRate': win_rate
+    }
 
-def get_current_week_stats():
+def get_current_week_stats(comparer):
     """Obtiene estadísticas de la semana actual"""
-    today = datetime.now()
-    week_num = today.isocalendar()[1]
-    year = today.year
-    
-    # Buscar archivo de la semana actual
-    weekly_file = f"exports/weekly/{year}-W{week_num:02d}.json"
-    
-    if os.path.exists(weekly_file):
-        data = load_json_file(weekly_file)
-        if data:
-            return {
-                'period': f"Week {week_num}",
-                'trades': data['summary']['totalTrades'],
-                'pnl': data['summary']['netPnL'],
-                'winRate': f"{data['summary']['winRate']*100:.1f}%"
-            }
-    
-    # Si no existe, calcular desde archivos diarios
-    monday = today - timedelta(days=today.weekday())
-    stats = calculate_period_stats(monday, today)
-    stats['period'] = f"Week {week_num} (partial)"
-    return stats
+    week_num = datetime.now().isocalendar()[1]
+    return period_stats(comparer, 'week', 0, f"Week {week_num} (partial)")
 
-def get_last_week_stats():
+def get_last_week_stats(comparer):
     """Obtiene estadísticas de la semana anterior"""
-    today = datetime.now()
-    last_monday = today - timedelta(days=today.weekday() + 7)
-    week_num = last_monday.isocalendar()[1]
-    year = last_monday.year
-    
-    weekly_file = f"exports/weekly/{year}-W{week_num:02d}.json"
-    
-    if os.path.exists(weekly_file):
-        data = load_json_file(weekly_file)
-        if data:
-            return {
-                'period': f"Week {week_num}",
-                'trades': data['summary']['totalTrades'],
-                'pnl': data['summary']['netPnL'],
-                'winRate': f"{data['summary']['winRate']*100:.1f}%"
-            }
-    
-    return {'period': f"Week {week_num}", 'trades': 0, 'pnl': 0, 'winRate': "0%"}
+    last_monday, _ = period_range('week', None, -1)
+    return period_stats(comparer, 'week', -1, f"Week {last_monday.isocalendar()[1]}")
 
-def get_current_month_stats():
+def get_current_month_stats(comparer):
     """Obtiene estadísticas del mes actual"""
-    today = datetime.now()
-    month = today.month
-    year = today.year
-    
-    # Calcular desde archivos diarios
-    first_day = datetime(year, month, 1)
-    stats = calculate_period_stats(first_day, today)
-    stats['period'] = f"{today.strftime('%B')} (partial)"
-    return stats
+    return period_stats(comparer, 'month', 0, f"{datetime.now().strftime('%B')} (partial)")
 
-def get_last_month_stats():
+def get_last_month_stats(comparer):
     """Obtiene estadísticas del mes anterior"""
-    today = datetime.now()
-    if today.month == 1:
-        month = 12
-        year = today.year - 1
+    first_day, _ = period_range('month', None, -1)
+    return period_stats(comparer, 'month', -1, first_day.strftime('%B'))
+
+def format_change(change, money=False, percent=False):
+    """Delta de una comparación con su variación porcentual"""
+    delta = change['delta']
+    if percent:
+        text = f"{delta*100:+.1f} pts"
+    elif money:
+        text = f"{'+' if delta >= 0 else '-'}${abs(delta):,.2f}"
     else:
-        month = today.month - 1
-        year = today.year
-    
-    monthly_file = f"exports/monthly/{year}-{month:02d}.json"
-    
-    if os.path.exists(monthly_file):
-        data = load_json_file(monthly_file)
-        if data:
-            return {
-                'period': data['monthName'],
-                'trades': data['overview']['totalTrades'],
-                'pnl': data['overview']['netPnL'],
-                'winRate': f"{data['overview']['winRate']*100:.1f}%"
-            }
-    
-    return {'period': datetime(year, month, 1).strftime('%B'), 'trades': 0, 'pnl': 0, 'winRate': "0%"}
+        text = f"{delta:+,.0f}"
+    if change['pctChange'] is not None and not percent:
+        text += f" ({change['pctChange']:+.1f}%)"
+    return text
 
-def calculate_period_stats(start_date, end_date):
-    """Calcula estadísticas para un período desde archivos diarios"""
-    total_trades = 0
-    total_pnl = 0
-    winning_trades = 0
+def generate_comparison_table(comparer):
+    """Tabla período contra período (hasta la fecha) desde los rollups diarios"""
+    labels = {'wow': 'Week over week', 'mom': 'Month over month', 'yoy': 'Year over year'}
     
-    current = start_date
-    while current <= end_date:
-        daily_file = f"exports/daily/{current.strftime('%Y-%m-%d')}.json"
-        if os.path.exists(daily_file):
-            data = load_json_file(daily_file)
-            if data and data.get('trades'):
-                total_trades += len(data['trades'])
-                total_pnl += data['summary']['netPnL']
-                winning_trades += data['summary']['winningTrades']
-        current += timedelta(days=1)
+    table = "\n#### 🔁 Period over Period (to date)\n\n"
+    table += "| Comparison | P&L | Δ P&L | Δ Trades | Δ Win Rate |\n"
+    table += "|------------|-----|-------|----------|------------|\n"
     
-    win_rate = f"{(winning_trades/total_trades*100):.1f}%" if total_trades > 0 else "0%"
+    for name, label in labels.items():
+        result = comparer.compare(name, partial=True, metrics=('trades', 'netPnL', 'winRate'))
+        metrics = result['metrics']
+        table += (f"| **{label}** | {format_pnl(metrics['netPnL']['current'])} vs {format_pnl(metrics['netPnL']['previous'])} "
+                  f"| {format_change(metrics['netPnL'], money=True)} | {format_change(metrics['trades'])} "
+                  f"| {format_change(metrics['winRate'], percent=True)} |\n")
     
-    return {
-        'trades': total_trades,
-        'pnl': round(total_pnl, 2),
-        'winRate': win_rate
-    }
+    return table
 
-def calculate_yearly_projection():
-    """Calcula proyección anual basada en el rendimiento hasta ahora"""
-    # Obtener todos los archivos mensuales del año actual
+def calculate_yearly_projection(comparer=None, simulate_risk=True):
+    """
+    Calcula proyección anual basada en el rendimiento hasta ahora
+    
+    Con simulate_risk (y NumPy disponible) agrega bandas de confianza del
+    P&L de fin de año y métricas de riesgo por Monte Carlo.
+    """
+    # Acumulado del año desde los rollups diarios
+    if comparer is None:
+        comparer = load_comparer()
     year = datetime.now().year
-    monthly_files = sorted(glob.glob(f"exports/monthly/{year}-*.json"))
-    
-    total_pnl = 0
-    total_trades = 0
-    months_with_data = 0
-    
-    for file in monthly_files:
-        data = load_json_file(file)
-        if data:
-            total_pnl += data['overview']['netPnL']
-            total_trades += data['overview']['totalTrades']
-            months_with_data += 1
-    
-    # Agregar mes actual
-    current_month_stats = get_current_month_stats()
-    total_pnl += current_month_stats['pnl']
-    total_trades += current_month_stats['trades']
+    ytd = comparer.totals(datetime(year, 1, 1), datetime.now())
+    total_pnl = ytd['netPnL']
+    total_trades = ytd['trades']
     
     # Calcular días transcurridos vs días totales del año
     today = datetime.now()
@@ -159,13 +99,22 @@ def calculate_yearly_projection():
         projected_pnl = daily_avg_pnl * days_in_year
         projected_trades = int(daily_avg_trades * days_in_year)
         
-        return {
+        projection = {
             'actual_pnl': round(total_pnl, 2),
             'projected_pnl': round(projected_pnl, 2),
             'actual_trades': total_trades,
             'projected_trades': projected_trades,
             'days_remaining': days_in_year - days_passed
         }
+        
+        if simulate_risk:
+            try:
+                from risk_simulator import run_risk_simulation
+                projection['simulation'] = run_risk_simulation(projection['actual_pnl'])
+            except ImportError:
+                projection['simulation'] = None
+        
+        return projection
     
     return None
 
@@ -180,12 +129,13 @@ def format_pnl(value):
 
 def generate_stats_table():
     """Genera la tabla de estadísticas en formato Markdown"""
-    # Obtener todas las estadísticas
-    current_week = get_current_week_stats()
-    last_week = get_last_week_stats()
-    current_month = get_current_month_stats()
-    last_month = get_last_month_stats()
-    yearly = calculate_yearly_projection()
+    # Obtener todas las estadísticas (un solo pase por los rollups diarios)
+    comparer = load_comparer()
+    current_week = get_current_week_stats(comparer)
+    last_week = get_last_week_stats(comparer)
+    current_month = get_current_month_stats(comparer)
+    last_month = get_last_month_stats(comparer)
+    yearly = calculate_yearly_projection(comparer)
     
     # Generar tabla
     table = "### 📊 Live Trading Statistics\n\n"
@@ -200,6 +150,9 @@ def generate_stats_table():
     table += f"| **{current_month['period']}** | {current_month['trades']} | {format_pnl(current_month['pnl'])} | {current_month['winRate']} |\n"
     table += f"| {last_month['period']} | {last_month['trades']} | {format_pnl(last_month['pnl'])} | {last_month['winRate']} |\n"
     
+    # Comparaciones período contra período
+    table += generate_comparison_table(comparer)
+    
     # Proyección anual
     if yearly:
         table += "\n#### 📈 Yearly Projection\n\n"
@@ -207,7 +160,19 @@ def generate_stats_table():
         table += "|--------|------------|---------------|\n"
         table += f"| **Trades** | {yearly['actual_trades']:,} | {yearly['projected_trades']:,} |\n"
         table += f"| **P&L** | {format_pnl(yearly['actual_pnl'])} | {format_pnl(yearly['projected_pnl'])} |\n"
-        table += f"\n*Based on current performance with {yearly['days_remaining']} days remaining*\n"
+        
+        simulation = yearly.get('simulation')
+        if simulation:
+            bands = simulation['eoy_pnl_bands']
+            table += f"| **P&L range (P5 – P95)** | | {format_pnl(bands['p5'])} – {format_pnl(bands['p95'])} |\n"
+            table += f"| **P&L median (Monte Carlo)** | | {format_pnl(bands['p50'])} |\n"
+            table += f"\n*Based on current performance with {yearly['days_remaining']} days remaining*\n"
+            table += (f"\n*Monte Carlo ({simulation['paths']:,} paths): "
+                      f"{simulation['probability_profitable_year']*100:.1f}% chance of a profitable year, "
+                      f"{simulation['risk_of_ruin']*100:.1f}% risk of a ${simulation['drawdown_limit']:,.0f} drawdown, "
+                      f"{simulation['monthly_target_probability']*100:.1f}% chance of ${simulation['monthly_target']:,.0f} next month*\n")
+        else:
+            table += f"\n*Based on current performance with {yearly['days_remaining']} days remaining*\n"
     
     table += f"\n*Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M')} UTC*"
     
@@ -245,6 +210,7 @@ def update_readme(stats_table):
         return False
 
 if __name__ == "__main__":
+    start_run('generate_stats')
     # Cambiar al directorio base si es necesario
     if not os.path.exists("exports"):
         print("❌ No se encontró el directorio exports")
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Codec JSON con backend rápido opcional (orjson) y respaldo en la librería estándar
+Los archivos versionados se escriben byte a byte igual que json.dump(indent=2);
+los artefactos solo para máquinas se escriben compactos. read_json_keys() lee
+por bloques solo algunas claves de primer nivel de un archivo grande
+"""
+
+import re
+import json
+import math
+from pipeline_metrics import count
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+# Rango en el que orjson y repr() formatean los floats igual (fuera de él
+# Python usa exponente con signo, p. ej. 1e-05 o 1e+16)
+_FLOAT_MIN = 1e-4
+_FLOAT_MAX = 1e16
+
+# Lo que json escapa con ensure_ascii además de los de control: no ASCII y DEL (0x7f)
+_NON_ASCII = re.compile(r'[^\x00-\x7e]')
+
+# Tamaño de bloque del lector incremental
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+_STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*"', re.S)
+_SCALAR_END = re.compile(r'[ \t\n\r,}\]]')
+
+def _escape_char(match):
+    """Escapa un carácter no ASCII como lo hace json con ensure_ascii"""
+    code = ord(match.group(0))
+    if code < 0x10000:
+        return '\\u%04x' % code
+    code -= 0x10000
+    return '\\u%04x\\u%04x' % (0xd800 | (code >> 10), 0xdc00 | (code & 0x3ff))
+
+def _orjson_compatible(value, compact=False):
+    """
+    Indica si orjson produciría exactamente la salida de json para este objeto
+
+    Se descartan floats no finitos o con exponente, claves no string y
+    cualquier tipo que la librería estándar no serializa. Con compact solo
+    importa que signifique lo mismo: se aceptan exponentes y claves no
+    string, pero no NaN/Infinity (orjson los escribe como null).
+    """
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if item is None or isinstance(item, (str, bool, int)):
+            continue
+        if isinstance(item, float):
+            if not math.isfinite(item):
+                return False
+            if not compact and item != 0 and not _FLOAT_MIN <= abs(item) < _FLOAT_MAX:
+                return False
+        elif isinstance(item, dict):
+            for key, child in item.items():
+                if not compact and not isinstance(key, str):
+                    return False
+                stack.append(child)
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        else:
+            return False
+    return True
+
+def loads(data):
+    """Decodifica JSON desde str o bytes"""
+    count('jsonBytesDecoded', len(data))
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity o enteros enormes: la librería estándar sí los acepta
+            pass
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+def read_json(file_path):
+    """Lee y decodifica un archivo JSON"""
+    count('filesRead')
+    with open(file_path, 'rb') as f:
+        return loads(f.read())
+
+class _ChunkReader:
+    """
+    Buffer de texto que se rellena por bloques y descarta lo ya consumido
+
+    Mientras hay una marca (un valor que se está capturando) se conserva el
+    texto desde la marca; fuera de eso solo queda en memoria el bloque actual.
+    """
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.mark = None
+
+    def more(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            return False
+        keep = self.pos if self.mark is None else self.mark
+        self.buf = self.buf[keep:] + chunk
+        self.pos -= keep
+        if self.mark is not None:
+            self.mark = 0
+        return True
+
+    def peek(self):
+        """Salta espacios y devuelve el próximo carácter ('' al final del archivo)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"JSON inválido: se esperaba {char!r} en la posición {self.pos}")
+        self.pos += 1
+
+    def skip_string(self):
+        """Avanza sobre un string (pos en la comilla de apertura)"""
+        while True:
+            match = _STRING_BODY.match(self.buf, self.pos + 1)
+            if match:
+                self.pos = match.end()
+                return
+            if not self.more():
+                raise ValueError("JSON inválido: string sin cerrar")
+
+    def skip_value(self):
+        """Avanza sobre un valor completo (objeto, lista, string o escalar)"""
+        first = self.peek()
+        if first == '"':
+            self.skip_string()
+            return
+        if first not in '{[':
+            while True:
+                match = _SCALAR_END.search(self.buf, self.pos)
+                if match:
+                    self.pos = match.start()
+                    return
+                self.pos = len(self.buf)
+                if not self.more():
+                    return
+
+        depth = 0
+        while True:
+            match = _STRUCTURAL.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self.more():
+                    raise ValueError("JSON inválido: estructura sin cerrar")
+                continue
+            char = match.group(0)
+            if char == '"':
+                self.pos = match.start()
+                self.skip_string()
+                continue
+            self.pos = match.end()
+            depth += 1 if char in '{[' else -1
+            if depth == 0:
+                return
+
+    def read_value(self):
+        """Avanza sobre un valor y devuelve su texto"""
+        self.peek()
+        self.mark = self.pos
+        self.skip_value()
+        text = self.buf[self.mark:self.pos]
+        self.mark = None
+        return text
+
+def read_json_keys(file_path, keys, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Lee solo algunas claves de primer nivel de un objeto JSON
+
+    El archivo se recorre por bloques: los valores que no se piden se
+    saltan sin decodificarlos ni guardarlos, y la lectura termina en cuanto
+    aparecen todas las claves pedidas, así que conviene que los archivos
+    pongan primero las claves livianas. Con claves repetidas gana la primera.
+
+    Returns:
+        Dict con las claves encontradas (las ausentes no aparecen)
+    """
+    wanted = set(keys)
+    found = {}
+    count('filesRead')
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        reader = _ChunkReader(f, chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return found
+
+        while len(found) < len(wanted):
+            if reader.peek() != '"':
+                raise ValueError(f"JSON inválido: se esperaba una clave en la posición {reader.pos}")
+            key = loads(reader.read_value())
+            reader.expect(':')
+
+            if key in wanted and key not in found:
+                found[key] = loads(reader.read_value())
+            else:
+                reader.skip_value()
+
+            separator = reader.peek()
+            if separator == '}':
+                break
+            reader.expect(',')
+
+    return found
+
+def dumps(obj, compact=False, ensure_ascii=True):
+    """
+    Serializa a texto JSON
+
+    Args:
+        compact: Sin indentación ni espacios (artefactos que no se versionan)
+        ensure_ascii: Escapar caracteres no ASCII (solo con compact=False,
+            igual que el parámetro de json.dump)
+    """
+    if compact:
+        if orjson is not None and _orjson_compatible(obj, compact=True):
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+            except TypeError:
+                pass
+        return json.dumps(obj, separators=(',', ':'))
+
+    if orjson is not None and _orjson_compatible(obj):
+        try:
+            text = orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+        except TypeError:
+            # Enteros de más de 64 bits o surrogates sueltos
+            text = None
+        if text is not None:
+            if ensure_ascii:
+                text = _NON_ASCII.sub(_escape_char, text)
+            return text
+
+    return json.dumps(obj, indent=2, ensure_ascii=ensure_ascii)
+
+def write_json(file_path, obj, compact=False, ensure_ascii=True):
+    """Escribe un archivo JSON (formato de dumps) en UTF-8"""
+    text = dumps(obj, compact=compact, ensure_ascii=ensure_ascii)
+    count('filesWritten')
+    count('jsonCharsWritten', len(text))
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(text)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Calendario de sesiones del NYSE generado por reglas, sin conexión
+Fines de semana, feriados del exchange (con su día observado) y cierres especiales
+"""
+
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+
+# Cierres no recurrentes del NYSE (duelos nacionales, emergencias)
+SPECIAL_CLOSURES = {
+    date(2012, 10, 29): "Huracán Sandy",
+    date(2012, 10, 30): "Huracán Sandy",
+    date(2018, 12, 5): "Duelo nacional George H.W. Bush",
+    date(2025, 1, 9): "Duelo nacional Jimmy Carter",
+}
+
+def to_date(value):
+    """Normaliza datetime/date/string 'YYYY-MM-DD' a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+def easter_sunday(year):
+    """Domingo de Pascua gregoriano (algoritmo anónimo de Meeus/Jones/Butcher)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+def _nth_weekday(year, month, weekday, n):
+    """n-ésimo día de la semana del mes (weekday 0 = lunes)"""
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+def _last_weekday(year, month, weekday):
+    """Último día de la semana del mes (weekday 0 = lunes)"""
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    last = next_month - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+def _observed(day):
+    """Día observado de un feriado fijo: sábado -> viernes, domingo -> lunes"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+@lru_cache(maxsize=None)
+def nyse_holidays(year):
+    """
+    Feriados del NYSE de un año como {fecha: nombre}
+
+    Año Nuevo en sábado no se observa el viernes anterior (regla del NYSE:
+    ese viernes es del año previo y el mercado abre). Juneteenth cuenta
+    desde 2022 y Martin Luther King desde 1998.
+    """
+    holidays = {}
+
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays[_observed(new_year)] = "Año Nuevo"
+    if year >= 1998:
+        holidays[_nth_weekday(year, 1, 0, 3)] = "Martin Luther King Jr."
+    holidays[_nth_weekday(year, 2, 0, 3)] = "Día de los Presidentes"
+    holidays[easter_sunday(year) - timedelta(days=2)] = "Viernes Santo"
+    holidays[_last_weekday(year, 5, 0)] = "Memorial Day"
+    if year >= 2022:
+        holidays[_observed(date(year, 6, 19))] = "Juneteenth"
+    holidays[_observed(date(year, 7, 4))] = "Día de la Independencia"
+    holidays[_nth_weekday(year, 9, 0, 1)] = "Labor Day"
+    holidays[_nth_weekday(year, 11, 3, 4)] = "Acción de Gracias"
+    holidays[_observed(date(year, 12, 25))] = "Navidad"
+
+    for day, name in SPECIAL_CLOSURES.items():
+        if day.year == year:
+            holidays[day] = name
+
+    return holidays
+
+def holiday_name(value):
+    """Nombre del feriado de esa fecha, o None si no es feriado"""
+    day = to_date(value)
+    return nyse_holidays(day.year).get(day)
+
+def is_trading_day(value):
+    """Indica si hay sesión en el NYSE esa fecha (no es fin de semana ni feriado)"""
+    day = to_date(value)
+    return day.weekday() < 5 and day not in nyse_holidays(day.year)
+
+def trading_days(start, end):
+    """Fechas con sesión dentro del rango (inclusive), en orden"""
+    day = to_date(start)
+    end = to_date(end)
+    days = []
+    while day <= end:
+        if is_trading_day(day):
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+def shift_trading_days(value, sessions):
+    """
+    Fecha que queda `sessions` sesiones antes (negativo) o después (positivo)
+
+    Si la fecha de partida no tiene sesión, el primer paso cae en la
+    sesión más cercana en esa dirección.
+    """
+    day = to_date(value)
+    step = 1 if sessions >= 0 else -1
+    remaining = abs(sessions)
+    while remaining:
+        day += timedelta(days=step)
+        if is_trading_day(day):
+            remaining -= 1
+    return day
+
+if __name__ == "__main__":
+    import sys
+
+    year = int(sys.argv[1]) if len(sys.argv) > 1 else datetime.now().year
+    print(f"🗓️  Feriados NYSE {year}:")
+    for day, name in sorted(nyse_holidays(year).items()):
+        print(f"  {day.strftime('%Y-%m-%d %a')}  {name}")
+    sessions = trading_days(date(year, 1, 1), date(year, 12, 31))
+    print(f"📈 {len(sessions)} sesiones de trading")
@@ -5,11 +5,13 @@ Consolida todos los datos del mes para análisis profundo
 """
 
 import os
-import json
 import calendar
 from datetime import datetime, timedelta
 from collections import defaultdict
 import glob
+from trading_data import load_days, load_json_keys, summarize_days, summarize_trades, summarize_by, compute_metrics, trade_net, to_cents, from_cents
+from json_codec import write_json
+from pipeline_metrics import start_run
 
 def load_weekly_summaries(year, month):
     """Carga todos los resúmenes semanales del mes"""
@@ -20,41 +22,35 @@ def load_weekly_summaries(year, month):
     weekly_files = []
     for week in range(1, 54):  # Posibles semanas del año
         filename = os.path.join(weekly_dir, f"{year}-W{week:02d}.json")
-        if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Verificar si la semana pertenece al mes
-                week_period = data.get('weekPeriod', '')
-                if f"{year}-{month:02d}" in week_period:
-                    weekly_files.append(data)
+        data = load_json_keys(filename, ('weekNumber', 'weekPeriod', 'summary'))
+        if data:
+            # Verificar si la semana pertenece al mes
+            week_period = data.get('weekPeriod', '')
+            if f"{year}-{month:02d}" in week_period:
+                weekly_files.append(data)
     
     return weekly_files
 
 def load_all_daily_files(year, month):
     """Carga todos los archivos diarios del mes"""
-    base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
-    daily_dir = os.path.join(base_dir, "daily")
-    
+    last_day = calendar.monthrange(year, month)[1]
+    return load_days(f"{year}-{month:02d}-01", f"{year}-{month:02d}-{last_day:02d}")
+
+def split_daily_data(daily_data):
+    """Separa días ya cargados en la lista de trades y los resúmenes de los días operados"""
     all_trades = []
     daily_summaries = []
     
-    # Obtener primer y último día del mes
-    first_day = 1
-    last_day = calendar.monthrange(year, month)[1]
-    
-    for day in range(first_day, last_day + 1):
-        date_str = f"{year}-{month:02d}-{day:02d}"
-        file_path = os.path.join(daily_dir, f"{date_str}.json")
-        
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                all_trades.extend(data.get('trades', []))
-                daily_summaries.append({
-                    'date': data.get('date'),
-                    'trades': data.get('summary', {}).get('totalTrades', 0),
-                    'pnl': data.get('summary', {}).get('netPnL', 0)
-                })
+    for data in daily_data:
+        trades = data.get('trades', [])
+        if not trades:
+            continue
+        all_trades.extend(trades)
+        daily_summaries.append({
+            'date': data.get('date'),
+            'trades': len(trades),
+            'pnl': from_cents(summarize_trades(trades)['net'])
+        })
     
     return all_trades, daily_summaries
 
@@ -72,18 +68,18 @@ def analyze_monthly_performance(trades, daily_summaries):
         'risk_metrics': {}
     }
     
-    # Curva de rentabilidad acumulada
+    # Curva de rentabilidad acumulada (en centavos para que los acumulados sean exactos)
     cumulative_pnl = 0
     peak_pnl = 0
     max_drawdown = 0
     drawdowns = []
     
     for day in sorted(daily_summaries, key=lambda x: x['date']):
-        cumulative_pnl += day['pnl']
+        cumulative_pnl += to_cents(day['pnl'])
         analysis['profitability_curve'].append({
             'date': day['date'],
             'daily_pnl': day['pnl'],
-            'cumulative_pnl': round(cumulative_pnl, 2)
+            'cumulative_pnl': from_cents(cumulative_pnl)
         })
         
         # Calcular drawdown
@@ -95,46 +91,48 @@ def analyze_monthly_performance(trades, daily_summaries):
                 max_drawdown = current_drawdown
     
     analysis['drawdown_analysis'] = {
-        'max_drawdown': round(max_drawdown, 2),
+        'max_drawdown': from_cents(max_drawdown),
         'max_drawdown_percent': round((max_drawdown / peak_pnl * 100), 2) if peak_pnl > 0 else 0
     }
     
-    # Análisis por símbolo
-    symbol_trades = defaultdict(list)
-    for trade in trades:
-        symbol = trade.get('symbol', 'UNKNOWN')
-        symbol_trades[symbol].append(trade)
+    # Drawdown trade a trade (incluye caídas intradía que el cierre diario oculta)
+    try:
+        from equity_curve import calculate_intraday_drawdowns
+        analysis['drawdown_analysis'].update(calculate_intraday_drawdowns(trades))
+    except ImportError:
+        pass
     
-    for symbol, trades_list in symbol_trades.items():
-        wins = [t for t in trades_list if t.get('pnl', 0) > 0]
-        losses = [t for t in trades_list if t.get('pnl', 0) < 0]
+    # Análisis por símbolo (una sola pasada con las métricas registradas)
+    by_symbol = summarize_by(trades, {'symbol': lambda trade: trade.get('symbol', 'UNKNOWN')})['symbol']
+    for symbol, record in by_symbol.items():
+        stats = compute_metrics(record, ('trades', 'netPnL', 'wins', 'losses', 'avgWin', 'avgLoss', 'winRate', 'expectancy'))
         
         analysis['symbol_performance'][symbol] = {
-            'trades': len(trades_list),
-            'pnl': round(sum(t.get('pnl', 0) for t in trades_list), 2),
-            'wins': len(wins),
-            'losses': len(losses),
-            'avg_win': round(sum(t['pnl'] for t in wins) / len(wins), 2) if wins else 0,
-            'avg_loss': round(sum(t['pnl'] for t in losses) / len(losses), 2) if losses else 0,
-            'win_rate': round(len(wins) / len(trades_list), 4) if trades_list else 0,
-            'expectancy': round((len(wins) / len(trades_list) * (sum(t['pnl'] for t in wins) / len(wins)) + 
-                                len(losses) / len(trades_list) * (sum(t['pnl'] for t in losses) / len(losses))), 2) if trades_list and wins and losses else 0
+            'trades': stats['trades'],
+            'pnl': stats['netPnL'],
+            'wins': stats['wins'],
+            'losses': stats['losses'],
+            'avg_win': stats['avgWin'],
+            'avg_loss': stats['avgLoss'],
+            'win_rate': stats['winRate'],
+            'expectancy': stats['expectancy']
         }
     
     # Métricas de consistencia
-    profitable_days = len([d for d in daily_summaries if d['pnl'] > 0])
-    losing_days = len([d for d in daily_summaries if d['pnl'] < 0])
+    day_cents = [to_cents(d['pnl']) for d in daily_summaries]
+    profitable_days = len([c for c in day_cents if c > 0])
+    losing_days = len([c for c in day_cents if c < 0])
     
     analysis['consistency_metrics'] = {
         'profitable_days': profitable_days,
         'losing_days': losing_days,
         'win_rate_days': round(profitable_days / len(daily_summaries), 4) if daily_summaries else 0,
-        'avg_winning_day': round(sum(d['pnl'] for d in daily_summaries if d['pnl'] > 0) / profitable_days, 2) if profitable_days else 0,
-        'avg_losing_day': round(sum(d['pnl'] for d in daily_summaries if d['pnl'] < 0) / losing_days, 2) if losing_days else 0
+        'avg_winning_day': round(sum(c for c in day_cents if c > 0) / profitable_days / 100, 2) if profitable_days else 0,
+        'avg_losing_day': round(sum(c for c in day_cents if c < 0) / losing_days / 100, 2) if losing_days else 0
     }
     
     # Métricas de riesgo
-    all_pnls = [t.get('pnl', 0) for t in trades]
+    all_pnls = [trade_net(t) for t in trades]
     if all_pnls:
         analysis['risk_metrics'] = {
             'sharpe_ratio': calculate_sharpe_ratio(all_pnls),
@@ -179,7 +177,7 @@ def calculate_max_consecutive_losses(trades):
     current_losses = 0
     
     for trade in trades:
-        if trade.get('pnl', 0) < 0:
+        if trade_net(trade) < 0:
             current_losses += 1
             max_losses = max(max_losses, current_losses)
         else:
@@ -187,8 +185,14 @@ def calculate_max_consecutive_losses(trades):
     
     return max_losses
 
-def generate_monthly_summary(year=None, month=None):
-    """Genera resumen mensual completo"""
+def generate_monthly_summary(year=None, month=None, daily_data=None):
+    """
+    Genera resumen mensual completo
+    
+    Args:
+        year, month: Mes a resumir (por defecto el actual)
+        daily_data: Días ya cargados del mes, en orden; si es None se leen de disco
+    """
     # Si no se especifica, usar el mes actual
     if year is None or month is None:
         now = datetime.now()
@@ -202,7 +206,9 @@ def generate_monthly_summary(year=None, month=None):
     weekly_summaries = load_weekly_summaries(year, month)
     
     # Cargar todos los trades diarios
-    all_trades, daily_summaries = load_all_daily_files(year, month)
+    if daily_data is None:
+        daily_data = load_all_daily_files(year, month)
+    all_trades, daily_summaries = split_daily_data(daily_data)
     
     if not all_trades:
         print("⚠️  No hay datos para este mes")
@@ -212,10 +218,7 @@ def generate_monthly_summary(year=None, month=None):
     performance_analysis = analyze_monthly_performance(all_trades, daily_summaries)
     
     # Calcular totales del mes
-    total_pnl = sum(t.get('pnl', 0) for t in all_trades)
-    total_commissions = sum(t.get('commission', 0) for t in all_trades)
-    winning_trades = [t for t in all_trades if t.get('pnl', 0) > 0]
-    losing_trades = [t for t in all_trades if t.get('pnl', 0) < 0]
+    totals = summarize_days(daily_data)
     
     # Estructura del resumen mensual
     monthly_summary = {
@@ -225,22 +228,20 @@ def generate_monthly_summary(year=None, month=None):
         'year': year,
         'account': all_trades[0].get('account', 'UNKNOWN') if all_trades else 'UNKNOWN',
         'overview': {
-            'totalTradingDays': len(daily_summaries),
-            'totalTrades': len(all_trades),
-            'grossPnL': round(total_pnl, 2),
-            'totalCommissions': round(total_commissions, 2),
-            'netPnL': round(total_pnl - total_commissions, 2),
-            'avgDailyPnL': round((total_pnl - total_commissions) / len(daily_summaries), 2) if daily_summaries else 0,
-            'winningTrades': len(winning_trades),
-            'losingTrades': len(losing_trades),
-            'winRate': round(len(winning_trades) / len(all_trades), 4) if all_trades else 0,
-            'avgWin': round(sum(t['pnl'] for t in winning_trades) / len(winning_trades), 2) if winning_trades else 0,
-            'avgLoss': round(sum(t['pnl'] for t in losing_trades) / len(losing_trades), 2) if losing_trades else 0,
-            'profitFactor': round(abs(sum(t['pnl'] for t in winning_trades) / sum(t['pnl'] for t in losing_trades)), 2) if losing_trades and sum(t['pnl'] for t in losing_trades) != 0 else 0,
-            'expectancy': round((len(winning_trades) / len(all_trades) * (sum(t['pnl'] for t in winning_trades) / len(winning_trades)) + 
-                                len(losing_trades) / len(all_trades) * (sum(t['pnl'] for t in losing_trades) / len(losing_trades))), 2) if all_trades and winning_trades and losing_trades else 0
+            'totalTradingDays': totals['tradingDays'],
+            'totalTrades': totals['trades'],
+            'grossPnL': totals['grossPnL'],
+            'totalCommissions': totals['commissions'],
+            'netPnL': totals['netPnL'],
+            'avgDailyPnL': totals['avgDailyPnL'],
+            'winningTrades': totals['wins'],
+            'losingTrades': totals['losses'],
+            'winRate': totals['winRate'],
+            'avgWin': totals['avgWin'],
+            'avgLoss': totals['avgLoss'],
+            'profitFactor': totals['profitFactor'],
+            'expectancy': totals['expectancy']
         },
-        'performanceAnalysis': performance_analysis,
         'weeklyBreakdown': [
             {
                 'week': ws.get('weekNumber'),
@@ -250,7 +251,10 @@ def generate_monthly_summary(year=None, month=None):
                 'winRate': ws.get('summary', {}).get('winRate', 0)
             } for ws in weekly_summaries
         ],
-        'recommendations': []  # Se llenarán después
+        'recommendations': [],  # Se llenarán después
+        # El análisis (curva, símbolos) es lo más pesado: va al final para
+        # que read_json_keys() pueda leer el resto sin recorrerlo
+        'performanceAnalysis': performance_analysis
     }
     
     # Generar recomendaciones
@@ -263,8 +267,7 @@ def generate_monthly_summary(year=None, month=None):
     
     filename = os.path.join(monthly_dir, f"{year}-{month:02d}.json")
     
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(monthly_summary, f, indent=2, ensure_ascii=False)
+    write_json(filename, monthly_summary, ensure_ascii=False)
     
     print(f"✅ Resumen mensual generado: {filename}")
     print(f"📊 Resumen del mes: {monthly_summary['overview']['totalTrades']} trades, "
@@ -355,6 +358,8 @@ def generate_text_report(summary, filename):
 if __name__ == "__main__":
     import sys
     
+    start_run('monthly_summary')
+    
     if len(sys.argv) >= 3:
         # Si se pasan año y mes como argumentos
         year = int(sys.argv[1])
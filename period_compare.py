@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Comparación entre períodos (semana, mes, año, mismo día de la semana) desde rollups diarios
+Las sumas acumuladas de los estados por día permiten obtener los totales de
+cualquier rango con dos búsquedas binarias, sin volver a leer los exports
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, date, timedelta
+from itertools import accumulate
+from trading_data import totals_metrics, metric_requires, to_date_str
+from day_states import update_day_states, SUM_KEYS
+from market_calendar import to_date
+
+# Comparaciones predefinidas: (tipo de período, desplazamiento del período anterior)
+COMPARISONS = {
+    'wow': ('week', -1),
+    'mom': ('month', -1),
+    'yoy': ('year', -1),
+    'weekday': ('day', -28)
+}
+
+DEFAULT_METRICS = ('trades', 'netPnL', 'winRate', 'profitFactor', 'expectancy')
+
+# Extremos que se pueden sacar de los estados diarios (no tienen suma acumulada)
+RANGE_EXTREMES = ('maxNet', 'minNet', 'bestDay', 'worstDay')
+
+def period_range(kind, reference=None, offset=0):
+    """
+    Rango (inicio, fin) del período que contiene la fecha de referencia
+
+    Args:
+        kind: 'day', 'week' (lunes a domingo), 'month' o 'year'
+        offset: Períodos a desplazar (-1 = el anterior); con 'day' son días
+    """
+    day = to_date(reference or datetime.now())
+
+    if kind == 'day':
+        day += timedelta(days=offset)
+        return day, day
+    if kind == 'week':
+        start = day - timedelta(days=day.weekday()) + timedelta(weeks=offset)
+        return start, start + timedelta(days=6)
+    if kind == 'month':
+        index = day.year * 12 + day.month - 1 + offset
+        start = date(index // 12, index % 12 + 1, 1)
+        next_index = index + 1
+        end = date(next_index // 12, next_index % 12 + 1, 1) - timedelta(days=1)
+        return start, end
+    if kind == 'year':
+        year = day.year + offset
+        return date(year, 1, 1), date(year, 12, 31)
+    raise ValueError(f"Tipo de período no soportado: {kind}")
+
+def _comparable(value):
+    """Valor numérico de una métrica (el P&L para bestDay/worstDay; None si no hay)"""
+    if isinstance(value, dict):
+        return value['pnl']
+    return value
+
+class PeriodComparer:
+    """Totales de cualquier rango de fechas en O(log días) con sumas acumuladas"""
+
+    def __init__(self, day_states):
+        self.dates = sorted(day_states)
+        self.prefix = {}
+
+        columns = {key: [day_states[d][key] for d in self.dates] for key in SUM_KEYS}
+        columns['tradingDays'] = [1 if day_states[d]['trades'] > 0 else 0 for d in self.dates]
+        columns['profitDays'] = [1 if day_states[d]['trades'] > 0 and day_states[d]['net'] > 0 else 0 for d in self.dates]
+        columns['lossDays'] = [1 if day_states[d]['trades'] > 0 and day_states[d]['net'] < 0 else 0 for d in self.dates]
+
+        for key, values in columns.items():
+            self.prefix[key] = [0] + list(accumulate(values))
+
+        # Extremos por día: el del rango se busca recorriendo solo ese tramo
+        self.best_trade = [day_states[d]['bestTrade'] for d in self.dates]
+        self.worst_trade = [day_states[d]['worstTrade'] for d in self.dates]
+        self.day_net = [day_states[d]['net'] if day_states[d]['trades'] > 0 else None for d in self.dates]
+
+    def _extremes(self, lo, hi):
+        """maxNet, minNet, bestDay y worstDay de los días [lo, hi) como los de aggregate()"""
+        best = [value for value in self.best_trade[lo:hi] if value is not None]
+        worst = [value for value in self.worst_trade[lo:hi] if value is not None]
+        days = [(self.dates[i], self.day_net[i]) for i in range(lo, hi) if self.day_net[i] is not None]
+        return {
+            'maxNet': max(best) if best else None,
+            'minNet': min(worst) if worst else None,
+            # Con empates gana el primer día, igual que aggregate()
+            'bestDay': max(days, key=lambda day: day[1]) if days else None,
+            'worstDay': min(days, key=lambda day: day[1]) if days else None
+        }
+
+    def totals(self, start, end, metrics=None):
+        """
+        Métricas del rango [start, end] con las definiciones de aggregate()
+
+        Las sumas salen en O(log días); si se piden métricas de extremos
+        (largestWin, bestDay...) se recorre además el tramo del rango.
+
+        Raises:
+            ValueError: Si alguna métrica necesita un acumulador que los
+                estados diarios no guardan
+        """
+        lo = bisect_left(self.dates, to_date_str(start))
+        hi = bisect_right(self.dates, to_date_str(end))
+        totals = {key: prefix[hi] - prefix[lo] for key, prefix in self.prefix.items()}
+
+        if metrics is not None:
+            requires = metric_requires(metrics)
+            unsupported = sorted(requires - set(RANGE_EXTREMES))
+            if unsupported:
+                raise ValueError(f"Métricas no disponibles desde los estados diarios "
+                                 f"(requieren {', '.join(unsupported)}): "
+                                 f"{', '.join(m for m in metrics if set(metric_requires((m,))) & set(unsupported))}")
+            if requires:
+                totals.update(self._extremes(lo, hi))
+
+        return totals_metrics(totals)
+
+    def compare_ranges(self, current, previous, metrics=DEFAULT_METRICS):
+        """
+        Deltas entre dos rangos (inicio, fin)
+
+        Returns:
+            Dict métrica -> {'current', 'previous', 'delta', 'pctChange'};
+            pctChange es None si el valor anterior es 0, y delta también si
+            falta un valor (p. ej. bestDay de un rango sin días operados).
+            En bestDay/worstDay los deltas comparan el P&L del día.
+        """
+        now = self.totals(*current, metrics=metrics)
+        before = self.totals(*previous, metrics=metrics)
+
+        result = {}
+        for metric in metrics:
+            current_value = _comparable(now[metric])
+            previous_value = _comparable(before[metric])
+            delta = None if current_value is None or previous_value is None else current_value - previous_value
+            result[metric] = {
+                'current': now[metric],
+                'previous': before[metric],
+                'delta': round(delta, 4) if delta is not None else None,
+                'pctChange': round(delta / abs(previous_value) * 100, 1) if delta is not None and previous_value else None
+            }
+        return result
+
+    def compare(self, comparison, reference=None, metrics=DEFAULT_METRICS, partial=False):
+        """
+        Compara el período de la referencia con el anterior
+
+        Args:
+            comparison: 'wow', 'mom', 'yoy' o 'weekday' (mismo día de la
+                semana cuatro semanas antes)
+            partial: Cortar ambos períodos en el mismo punto (semana, mes o
+                año hasta la fecha contra el mismo tramo del anterior)
+        """
+        kind, offset = COMPARISONS[comparison]
+        reference = to_date(reference or datetime.now())
+        current = period_range(kind, reference)
+        previous = period_range(kind, reference, offset)
+
+        if partial and kind != 'day':
+            elapsed = reference - current[0]
+            current = (current[0], reference)
+            previous = (previous[0], min(previous[0] + elapsed, previous[1]))
+
+        return {
+            'comparison': comparison,
+            'current': {'start': str(current[0]), 'end': str(current[1])},
+            'previous': {'start': str(previous[0]), 'end': str(previous[1])},
+            'metrics': self.compare_ranges(current, previous, metrics)
+        }
+
+def load_comparer():
+    """PeriodComparer sobre los estados diarios cacheados"""
+    return PeriodComparer(update_day_states())
+
+if __name__ == "__main__":
+    import sys
+
+    comparer = load_comparer()
+    reference = sys.argv[1] if len(sys.argv) > 1 else None
+    for name in COMPARISONS:
+        result = comparer.compare(name, reference)
+        pnl = result['metrics']['netPnL']
+        change = f"{pnl['pctChange']:+.1f}%" if pnl['pctChange'] is not None else "n/a"
+        print(f"📊 {name}: {result['current']['start']} → {result['current']['end']} vs "
+              f"{result['previous']['start']} → {result['previous']['end']}: "
+              f"P&L ${pnl['current']:,.2f} vs ${pnl['previous']:,.2f} ({change})")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Métricas de ejecución del pipeline: tiempos por etapa y contadores
+Cada script registra su corrida con start_run() y al terminar se agrega una
+línea JSON a exports/metrics/pipeline.jsonl con tiempos (reloj y CPU) por
+etapa, requests HTTP, archivos y bytes leídos/escritos, trades procesados y
+aciertos de caché, para ver regresiones entre corridas programadas. El archivo
+no se versiona: en CI se conserva con actions/cache y se sube como artifact
+"""
+
+import os
+import sys
+import time
+import atexit
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+
+METRICS_VERSION = 1
+
+# PIPELINE_METRICS=0 desactiva el archivo (los contadores siguen en memoria)
+METRICS_ENABLED = os.getenv('PIPELINE_METRICS', '1') != '0'
+
+# Límites superiores (ms) del histograma de latencia HTTP; el último bucket es el resto
+HTTP_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000)
+
+_RUN = {'script': None, 'startedAt': None, 'wall': None, 'cpu': None}
+_STAGES = {}
+_COUNTERS = {}
+_LOCK = threading.Lock()
+_HTTP = {'requests': 0, 'errors': 0, 'bytes': 0, 'seconds': 0.0, 'histogram': [0] * (len(HTTP_BUCKETS_MS) + 1)}
+
+def get_metrics_file():
+    """Ruta del archivo de métricas (una corrida por línea)"""
+    default = os.path.join(os.getenv('EXPORT_OUTPUT_DIR', 'exports'), "metrics", "pipeline.jsonl")
+    return os.getenv('PIPELINE_METRICS_FILE', default)
+
+def count(name, value=1):
+    """Suma a un contador de la corrida (seguro entre hilos del pool de lectura)"""
+    with _LOCK:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + value
+
+def count_cache(name, hits, misses):
+    """Aciertos y recálculos de un caché incremental (índices por día, resultados...)"""
+    count(f"cache.{name}.hits", hits)
+    count(f"cache.{name}.misses", misses)
+
+@contextmanager
+def stage(name):
+    """Mide tiempo de reloj y de CPU de una etapa (acumula si se repite)"""
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield
+    finally:
+        entry = _STAGES.setdefault(name, {'calls': 0, 'wallSeconds': 0.0, 'cpuSeconds': 0.0})
+        entry['calls'] += 1
+        entry['wallSeconds'] += time.perf_counter() - wall
+        entry['cpuSeconds'] += time.process_time() - cpu
+
+def observe_http(seconds, size, ok=True):
+    """Registra un request HTTP: latencia en segundos y bytes descargados"""
+    with _LOCK:
+        _observe_http(seconds, size, ok)
+
+def _observe_http(seconds, size, ok):
+    _HTTP['requests'] += 1
+    _HTTP['bytes'] += size
+    _HTTP['seconds'] += seconds
+    if not ok:
+        _HTTP['errors'] += 1
+
+    millis = seconds * 1000
+    for i, limit in enumerate(HTTP_BUCKETS_MS):
+        if millis <= limit:
+            _HTTP['histogram'][i] += 1
+            return
+    _HTTP['histogram'][-1] += 1
+
+def requests_hook(response, *args, **kwargs):
+    """Hook de respuesta para requests.Session (session.hooks['response'])"""
+    observe_http(response.elapsed.total_seconds(), len(response.content), response.status_code < 400)
+    return response
+
+def start_run(script):
+    """
+    Empieza a medir la corrida de un script y agenda su registro al salir
+
+    Solo los puntos de entrada (bloques __main__) la llaman, así que un
+    script importado por otro no genera una línea propia.
+    """
+    _RUN.update({
+        'script': script,
+        'startedAt': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'wall': time.perf_counter(),
+        'cpu': time.process_time()
+    })
+    atexit.register(write_run)
+
+def snapshot():
+    """Métricas acumuladas hasta ahora como dict serializable"""
+    record = {
+        'version': METRICS_VERSION,
+        'script': _RUN['script'],
+        'startedAt': _RUN['startedAt'],
+        'argv': sys.argv[1:],
+        'wallSeconds': round(time.perf_counter() - _RUN['wall'], 3) if _RUN['wall'] is not None else None,
+        'cpuSeconds': round(time.process_time() - _RUN['cpu'], 3) if _RUN['cpu'] is not None else None,
+        'stages': {name: {'calls': entry['calls'],
+                          'wallSeconds': round(entry['wallSeconds'], 3),
+                          'cpuSeconds': round(entry['cpuSeconds'], 3)}
+                   for name, entry in _STAGES.items()},
+        'counters': dict(sorted(_COUNTERS.items())),
+        'http': {
+            'requests': _HTTP['requests'],
+            'errors': _HTTP['errors'],
+            'bytes': _HTTP['bytes'],
+            'seconds': round(_HTTP['seconds'], 3),
+            'latencyBucketsMs': list(HTTP_BUCKETS_MS),
+            'latencyHistogram': list(_HTTP['histogram'])
+        }
+    }
+
+    # El caché JSON en memoria lleva sus propios contadores
+    trading_data = sys.modules.get('trading_data')
+    if trading_data is not None:
+        record['jsonCache'] = trading_data.cache_info()
+
+    return record
+
+def write_run(metrics_file=None):
+    """Agrega la corrida actual al archivo de métricas"""
+    if not METRICS_ENABLED or _RUN['script'] is None:
+        return None
+
+    from json_codec import dumps
+
+    metrics_file = metrics_file or get_metrics_file()
+    try:
+        os.makedirs(os.path.dirname(metrics_file), exist_ok=True)
+        with open(metrics_file, 'a', encoding='utf-8') as f:
+            f.write(dumps(snapshot(), compact=True) + '\n')
+    except OSError as e:
+        print(f"⚠️  No se pudieron guardar las métricas: {e}")
+        return None
+    return metrics_file
+
+def load_runs(metrics_file=None, script=None):
+    """Corridas registradas (opcionalmente de un solo script), en orden"""
+    from json_codec import loads
+
+    metrics_file = metrics_file or get_metrics_file()
+    if not os.path.exists(metrics_file):
+        return []
+
+    runs = []
+    with open(metrics_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                run = loads(line)
+            except ValueError:
+                continue
+            if script is None or run.get('script') == script:
+                runs.append(run)
+    return runs
+
+if __name__ == "__main__":
+    script = sys.argv[1] if len(sys.argv) > 1 else None
+    runs = load_runs(script=script)
+    print(f"📈 {len(runs)} corridas registradas en {get_metrics_file()}")
+    for run in runs[-10:]:
+        stages = ', '.join(f"{name} {entry['wallSeconds']:.2f}s" for name, entry in run['stages'].items())
+        print(f"  {run['startedAt']}  {run['script']:<24} {run['wallSeconds']:7.2f}s "
+              f"(CPU {run['cpuSeconds']:.2f}s, HTTP {run['http']['requests']}) {stages}")
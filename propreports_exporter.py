@@ -5,13 +5,15 @@ Extrae datos de trading de PropReports y los exporta en formato JSON
 """
 
 import requests
-import json
 import os
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 import re
 from typing import Dict, List, Optional
 import time
+from json_codec import write_json
+from trading_data import summarize_by, summarize_trades, compute_metrics, from_cents
+from pipeline_metrics import start_run, stage, requests_hook
 
 class PropReportsExporter:
     def __init__(self, domain: str, username: str, password: str):
@@ -19,8 +21,10 @@ class PropReportsExporter:
         self.username = username
         self.password = password
         self.session = requests.Session()
+        self.session.hooks['response'].append(requests_hook)
         self.base_url = f"https://{domain}"
         
+    @stage('login')
     def login(self) -> bool:
         """Autentica con PropReports"""
         login_url = f"{self.base_url}/login.php"
@@ -63,6 +67,7 @@ class PropReportsExporter:
             print(f"❌ Error de conexión: {e}")
             return False
     
+    @stage('fetch')
     def get_trades_page(self, date_from: str, date_to: str) -> Optional[str]:
         """Obtiene la página de trades para un rango de fechas"""
         # URL correcta para reportes en PropReports
@@ -90,6 +95,7 @@ class PropReportsExporter:
             print(f"❌ Error al obtener trades: {e}")
             return None
     
+    @stage('parse')
     def parse_trades_html(self, html_content: str) -> List[Dict]:
         """Parsea el HTML de trades y extrae los datos"""
         soup = BeautifulSoup(html_content, 'html.parser')
@@ -208,11 +214,12 @@ class PropReportsExporter:
                 trades_by_day[date] = []
             trades_by_day[date].append(trade)
         
-        # Calcular estadísticas
-        total_trades = len(trades)
-        total_pnl = sum(trade.get('pnl', 0) for trade in trades)
-        winning_trades = [t for t in trades if t.get('pnl', 0) > 0]
-        losing_trades = [t for t in trades if t.get('pnl', 0) < 0]
+        # Totales por día en centavos, en una sola pasada
+        day_totals = summarize_by(trades, {'date': lambda trade: trade.get('date', 'unknown')})['date']
+        
+        # Estadísticas del registro de métricas (ganador = neto positivo, montos en centavos)
+        metrics = compute_metrics(summarize_trades(trades),
+                                  ('trades', 'grossPnL', 'wins', 'losses', 'winRate', 'avgWin', 'avgLoss'))
         
         # Estructura de datos para exportar
         export_data = {
@@ -223,13 +230,13 @@ class PropReportsExporter:
                 'to': max(trades, key=lambda x: x['date'])['date'] if trades else ''
             },
             'summary': {
-                'totalTrades': total_trades,
-                'totalPnL': round(total_pnl, 2),
-                'winningTrades': len(winning_trades),
-                'losingTrades': len(losing_trades),
-                'winRate': round(len(winning_trades) / total_trades, 4) if total_trades > 0 else 0,
-                'avgWin': round(sum(t['pnl'] for t in winning_trades) / len(winning_trades), 2) if winning_trades else 0,
-                'avgLoss': round(sum(t['pnl'] for t in losing_trades) / len(losing_trades), 2) if losing_trades else 0
+                'totalTrades': metrics['trades'],
+                'totalPnL': metrics['grossPnL'],
+                'winningTrades': metrics['wins'],
+                'losingTrades': metrics['losses'],
+                'winRate': metrics['winRate'],
+                'avgWin': metrics['avgWin'],
+                'avgLoss': metrics['avgLoss']
             },
             'dailyData': [
                 {
@@ -237,9 +244,9 @@ class PropReportsExporter:
                     'trades': day_trades,
                     'dailySummary': {
                         'totalTrades': len(day_trades),
-                        'grossPnL': round(sum(t.get('pnl', 0) for t in day_trades), 2),
-                        'commissions': round(sum(t.get('commission', 0) for t in day_trades), 2),
-                        'netPnL': round(sum(t.get('pnl', 0) - t.get('commission', 0) for t in day_trades), 2)
+                        'grossPnL': from_cents(day_totals[date]['gross']),
+                        'commissions': from_cents(day_totals[date]['commissions']),
+                        'netPnL': from_cents(day_totals[date]['net'])
                     }
                 }
                 for date, day_trades in sorted(trades_by_day.items())
@@ -251,8 +258,7 @@ class PropReportsExporter:
         filename = f"{output_dir}/propreports_{self.username}_{timestamp}.json"
         
         # Guardar JSON
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        write_json(filename, export_data, ensure_ascii=False)
         
         print(f"✅ Datos exportados a: {filename}")
         return filename
@@ -311,4 +317,5 @@ def main():
         print("\n❌ Error en la exportación")
 
 if __name__ == "__main__":
+    start_run('propreports_exporter')
     main()
\ No newline at end of file
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Sketches de cuantiles combinables (estilo DDSketch) para P&L y duración de trades
+Se guarda un sketch por día y métrica; semanas, meses, años o toda la historia
+se obtienen combinando sketches, sin volver a leer los trades
+"""
+
+import os
+import math
+from trading_data import (get_daily_dir, list_daily_dates, load_day, file_signature,
+                          trade_net_cents, parse_hold_seconds, period_key, GRANULARITIES)
+from json_codec import read_json, write_json
+from pipeline_metrics import count_cache
+
+SKETCHES_VERSION = 1
+
+# Error relativo máximo de cada cuantil (1%)
+RELATIVE_ACCURACY = 0.01
+
+# Tamaño de 1R en dólares para expresar el P&L en múltiplos de riesgo
+R_UNIT_DOLLARS = float(os.getenv('R_UNIT_DOLLARS', '25'))
+
+# Métricas con sketch por día: P&L neto en centavos y holding en segundos
+SKETCH_METRICS = ('pnl', 'hold')
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+def get_sketches_file():
+    """Ruta del archivo de sketches diarios"""
+    base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
+    return os.path.join(base_dir, "index", "day-sketches.json")
+
+def _bucket_key(magnitude):
+    return math.ceil(math.log(magnitude) / _LOG_GAMMA)
+
+def _bucket_value(key):
+    """Punto medio (en error relativo) del bucket"""
+    return 2 * _GAMMA ** key / (_GAMMA + 1)
+
+class QuantileSketch:
+    """
+    Sketch logarítmico con error relativo acotado
+
+    Valores positivos y negativos van en buckets separados por magnitud y
+    el cero tiene su propio contador. Combinar dos sketches es sumar los
+    contadores, así que el resultado no depende del orden ni del agrupamiento.
+    """
+
+    def __init__(self):
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        if value > 0:
+            key = _bucket_key(value)
+            self.positive[key] = self.positive.get(key, 0) + 1
+        elif value < 0:
+            key = _bucket_key(-value)
+            self.negative[key] = self.negative.get(key, 0) + 1
+        else:
+            self.zero += 1
+
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """Suma otro sketch a este (in place) y lo devuelve"""
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero += other.zero
+        self.count += other.count
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Valor aproximado del cuantil q (0-1); None si el sketch está vacío"""
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = 0
+
+        # De los negativos más grandes en magnitud hacia cero, luego positivos
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return max(-_bucket_value(key), self.min)
+        seen += self.zero
+        if seen > rank:
+            return 0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return min(_bucket_value(key), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'positive': sorted(self.positive.items()),
+            'negative': sorted(self.negative.items()),
+            'zero': self.zero,
+            'count': self.count,
+            'min': self.min,
+            'max': self.max
+        }
+
+    @classmethod
+    def from_dict(cls, stored):
+        sketch = cls()
+        sketch.positive = {key: count for key, count in stored['positive']}
+        sketch.negative = {key: count for key, count in stored['negative']}
+        sketch.zero = stored['zero']
+        sketch.count = stored['count']
+        sketch.min = stored['min']
+        sketch.max = stored['max']
+        return sketch
+
+def build_day_sketches(trades):
+    """Sketches de un día: P&L neto en centavos y holding en segundos"""
+    sketches = {metric: QuantileSketch() for metric in SKETCH_METRICS}
+    for trade in trades:
+        sketches['pnl'].add(trade_net_cents(trade))
+        try:
+            sketches['hold'].add(parse_hold_seconds(trade.get('held', '')))
+        except ValueError:
+            pass
+    return sketches
+
+def update_day_sketches(sketches_file=None):
+    """
+    Actualiza los sketches recalculando solo los días cuyo archivo cambió
+
+    Returns:
+        Dict fecha -> {métrica: QuantileSketch}, en orden de fecha
+    """
+    if sketches_file is None:
+        sketches_file = get_sketches_file()
+    daily_dir = get_daily_dir()
+
+    stored = {'version': SKETCHES_VERSION, 'relativeAccuracy': RELATIVE_ACCURACY, 'days': {}}
+    if os.path.exists(sketches_file):
+        try:
+            loaded = read_json(sketches_file)
+            if loaded.get('version') == SKETCHES_VERSION and loaded.get('relativeAccuracy') == RELATIVE_ACCURACY:
+                stored = loaded
+        except Exception:
+            pass
+
+    days = {}
+    rebuilt = 0
+
+    for date_str in list_daily_dates():
+        signature = file_signature(os.path.join(daily_dir, f"{date_str}.json"))
+
+        previous = stored['days'].get(date_str)
+        if previous and previous['signature'] == signature:
+            days[date_str] = previous
+            continue
+
+        data = load_day(date_str)
+        if data is None:
+            continue
+
+        sketches = build_day_sketches(data.get('trades', []))
+        days[date_str] = {'signature': signature}
+        days[date_str].update({metric: sketch.to_dict() for metric, sketch in sketches.items()})
+        rebuilt += 1
+
+    count_cache('daySketches', len(days) - rebuilt, rebuilt)
+    removed = len(set(stored['days']) - set(days))
+    if rebuilt or removed or not os.path.exists(sketches_file):
+        os.makedirs(os.path.dirname(sketches_file), exist_ok=True)
+        write_json(sketches_file, {'version': SKETCHES_VERSION, 'relativeAccuracy': RELATIVE_ACCURACY,
+                                   'days': days}, compact=True)
+        print(f"📐 Sketches diarios actualizados: {rebuilt} días recalculados de {len(days)}")
+
+    return {
+        date_str: {metric: QuantileSketch.from_dict(day[metric]) for metric in SKETCH_METRICS}
+        for date_str, day in days.items()
+    }
+
+def merge_sketches(day_sketches, start=None, end=None, granularity='all'):
+    """
+    Combina los sketches diarios por período
+
+    Returns:
+        Dict período -> {métrica: QuantileSketch}, en orden cronológico
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Granularidad no soportada: {granularity}")
+
+    periods = {}
+    for date_str in sorted(day_sketches):
+        if (start and date_str < start) or (end and date_str > end):
+            continue
+        key = period_key(date_str, granularity)
+        merged = periods.setdefault(key, {metric: QuantileSketch() for metric in SKETCH_METRICS})
+        for metric in SKETCH_METRICS:
+            merged[metric].merge(day_sketches[date_str][metric])
+    return periods
+
+def _summary(sketch, scale):
+    """Percentiles, mínimo y máximo de un sketch en la unidad de salida"""
+    if sketch.count == 0:
+        return None
+    summary = {f"p{p}": round(sketch.quantile(p / 100) / scale, 2) for p in PERCENTILES}
+    summary['min'] = round(sketch.min / scale, 2)
+    summary['max'] = round(sketch.max / scale, 2)
+    return summary
+
+def distribution(sketches, r_unit=None):
+    """
+    Panel de distribución de un período combinado
+
+    El P&L se informa en dólares y en múltiplos de R (P&L / r_unit, por
+    defecto R_UNIT_DOLLARS); el holding en segundos.
+    """
+    r_unit = r_unit or R_UNIT_DOLLARS
+    return {
+        'trades': sketches['pnl'].count,
+        'pnl': _summary(sketches['pnl'], 100),
+        'rMultiple': _summary(sketches['pnl'], r_unit * 100),
+        'holdSeconds': _summary(sketches['hold'], 1)
+    }
+
+def export_distribution_payload(day_sketches=None, output_file='docs/data/distributions.json'):
+    """Paneles de distribución por semana, mes, año y total histórico para el dashboard"""
+    if day_sketches is None:
+        day_sketches = update_day_sketches()
+
+    payload = {'rUnit': R_UNIT_DOLLARS, 'relativeAccuracy': RELATIVE_ACCURACY}
+    for granularity, name in (('week', 'byWeek'), ('month', 'byMonth'), ('year', 'byYear'), ('all', 'allTime')):
+        rows = []
+        for period, sketches in merge_sketches(day_sketches, granularity=granularity).items():
+            if sketches['pnl'].count == 0:
+                continue
+            row = {'period': period}
+            row.update(distribution(sketches))
+            rows.append(row)
+        payload[name] = rows[0] if granularity == 'all' and rows else rows
+
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    write_json(output_file, payload, compact=True)
+
+    print(f"✅ Distribuciones generadas en {output_file}")
+    return output_file
+
+if __name__ == "__main__":
+    import sys
+
+    granularity = sys.argv[1] if len(sys.argv) > 1 else 'month'
+    day_sketches = update_day_sketches()
+    for period, sketches in merge_sketches(day_sketches, granularity=granularity).items():
+        panel = distribution(sketches)
+        if panel['trades'] == 0:
+            continue
+        print(f"📊 {period}: {panel['trades']} trades, mediana ${panel['pnl']['p50']}, "
+              f"p5/p95 ${panel['pnl']['p5']}/${panel['pnl']['p95']}, "
+              f"holding mediano {panel['holdSeconds']['p50']:.0f}s")
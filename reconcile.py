@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Conciliación entre los exports diarios y los artefactos derivados
+Compara el overview de cada resumen mensual, el summary de cada semanal y las
+celdas del calendario SVG contra los totales de los días que cubren, en los
+campos que todos los generadores definen igual; los totales salen del índice
+de resúmenes diarios y se suman con NumPy
+"""
+
+import os
+import re
+import glob
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from trading_data import update_day_summaries, load_json_keys, from_cents, PREFETCH_WORKERS
+
+# Diferencia tolerada en montos, en centavos (los conteos deben coincidir exactos)
+TOLERANCE_CENTS = int(os.getenv('RECONCILE_TOLERANCE_CENTS', '1'))
+
+# Columnas diarias de summarize_trades() que se concilian
+DAY_COLUMNS = ('trades', 'net', 'gross', 'commissions')
+MONEY_COLUMNS = ('net', 'gross', 'commissions')
+
+# Campo del overview/summary -> columna diaria con la que se compara. Solo
+# los campos que todos los generadores definen igual que los diarios: el
+# monthly_summary/weekly_summary del exportador (lo copian los workflows
+# generate-*-summaries) cuenta como días todos los archivos del período,
+# calcula el neto como bruto - comisiones y el ganador por pnl bruto
+SUMMARY_FIELDS = {
+    'totalTrades': 'trades',
+    'grossPnL': 'gross',
+    'totalCommissions': 'commissions'
+}
+
+# Campos que dependen del generador y no se concilian
+PRODUCER_DEFINED_FIELDS = ('totalTradingDays', 'winningTrades', 'losingTrades', 'netPnL')
+
+# Celda del calendario SVG (la escribe generate_calendar.generate_svg_calendar)
+_SVG_CELL = re.compile(r'data-date="(\d{4}-\d{2}-\d{2})" data-trades="(\d+)" data-pnl="(-?[\d.]+)"')
+
+class DayTotals:
+    """Sumas acumuladas de las columnas diarias para totales de rangos vectorizados"""
+
+    def __init__(self, summaries):
+        self.dates = np.array(sorted(summaries), dtype=str)
+        self.prefix = {}
+        for column in DAY_COLUMNS:
+            values = [summaries[d].totals[column] for d in self.dates]
+            self.prefix[column] = np.concatenate(([0], np.cumsum(np.array(values, dtype=np.int64))))
+
+    def ranges(self, starts, ends):
+        """Totales de cada rango [start, end] (fechas 'YYYY-MM-DD'): columna -> array"""
+        lo = np.searchsorted(self.dates, np.array(starts, dtype=str), side='left')
+        hi = np.searchsorted(self.dates, np.array(ends, dtype=str), side='right')
+        return {column: prefix[hi] - prefix[lo] for column, prefix in self.prefix.items()}
+
+def _load_all(paths, keys):
+    """Lee en paralelo las claves pedidas de cada archivo (None si no se puede leer)"""
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, PREFETCH_WORKERS)) as executor:
+        return list(executor.map(lambda path: load_json_keys(path, keys), paths))
+
+def _compare(artifact, names, rows, expected, fields=SUMMARY_FIELDS):
+    """
+    Compara campo por campo los valores de los artefactos con los esperados
+
+    Args:
+        names: Identificador de cada fila (archivo o fecha)
+        rows: Dicts con los campos del artefacto (en dólares los montos)
+        expected: Columna -> array con el total de los días de cada fila
+
+    Returns:
+        Lista de diferencias fuera de tolerancia
+    """
+    mismatches = []
+    for field, column in fields.items():
+        money = column in MONEY_COLUMNS
+        raw = np.array([row.get(field) if row.get(field) is not None else np.nan for row in rows], dtype=float)
+        missing = np.isnan(raw)
+        actual = np.round(np.where(missing, 0, raw) * (100 if money else 1)).astype(np.int64)
+        delta = actual - expected[column]
+        bad = missing | (np.abs(delta) > (TOLERANCE_CENTS if money else 0))
+
+        for i in np.flatnonzero(bad):
+            scale = from_cents if money else int
+            mismatches.append({
+                'artifact': artifact,
+                'name': names[i],
+                'field': field,
+                'expected': scale(int(expected[column][i])),
+                'actual': None if missing[i] else scale(int(actual[i])),
+                'delta': None if missing[i] else scale(int(delta[i]))
+            })
+    return mismatches
+
+def reconcile_monthly(totals, base_dir):
+    """Overview de cada resumen mensual contra la suma de sus días"""
+    paths = sorted(glob.glob(os.path.join(base_dir, 'monthly', '*.json')))
+    loaded = _load_all(paths, ('overview',))
+    names, rows, starts, ends = [], [], [], []
+    for path, data in zip(paths, loaded):
+        month = os.path.basename(path)[:7]
+        names.append(os.path.basename(path))
+        rows.append((data or {}).get('overview', {}))
+        starts.append(f"{month}-01")
+        ends.append(f"{month}-31")
+    return len(rows), _compare('monthly', names, rows, totals.ranges(starts, ends))
+
+def reconcile_weekly(totals, base_dir):
+    """Summary de cada resumen semanal contra la suma de sus días"""
+    paths = sorted(glob.glob(os.path.join(base_dir, 'weekly', '*.json')))
+    loaded = _load_all(paths, ('weekPeriod', 'summary'))
+    names, rows, starts, ends = [], [], [], []
+    for path, data in zip(paths, loaded):
+        period = (data or {}).get('weekPeriod', '').split(' to ')
+        if len(period) != 2:
+            continue
+        names.append(os.path.basename(path))
+        rows.append(data.get('summary', {}))
+        starts.append(period[0])
+        ends.append(period[1])
+    return len(rows), _compare('weekly', names, rows, totals.ranges(starts, ends))
+
+def reconcile_calendar(totals, assets_dir='.github/assets'):
+    """Trades y P&L de cada celda del calendario SVG contra su día"""
+    names, rows = [], []
+    for path in sorted(glob.glob(os.path.join(assets_dir, 'calendar-*.svg'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            for date_str, trades, pnl in _SVG_CELL.findall(f.read()):
+                names.append(f"{os.path.basename(path)}:{date_str}")
+                rows.append({'trades': int(trades), 'pnl': float(pnl)})
+    dates = [name.rsplit(':', 1)[1] for name in names]
+    expected = totals.ranges(dates, dates)
+    return len(rows), _compare('calendar', names, rows, expected, {'trades': 'trades', 'pnl': 'net'})
+
+def reconcile_all(base_dir=None, assets_dir='.github/assets'):
+    """
+    Concilia mensuales, semanales y calendario contra los diarios
+
+    Returns:
+        Dict con 'checked' (artefactos revisados por tipo), 'mismatches' y 'seconds'
+    """
+    start = time.perf_counter()
+    base_dir = base_dir or os.getenv('EXPORT_OUTPUT_DIR', 'exports')
+    totals = DayTotals(update_day_summaries())
+
+    checked = {}
+    mismatches = []
+    for name, run in (('monthly', lambda: reconcile_monthly(totals, base_dir)),
+                      ('weekly', lambda: reconcile_weekly(totals, base_dir)),
+                      ('calendar', lambda: reconcile_calendar(totals, assets_dir))):
+        count, found = run()
+        checked[name] = count
+        mismatches.extend(found)
+
+    return {'checked': checked, 'mismatches': mismatches, 'seconds': round(time.perf_counter() - start, 3)}
+
+def print_report(report, limit=50):
+    """Imprime el resultado de reconcile_all() y devuelve True si todo concilia"""
+    checked = report['checked']
+    print(f"🧾 Conciliación: {checked['monthly']} mensuales, {checked['weekly']} semanales, "
+          f"{checked['calendar']} celdas de calendario en {report['seconds']:.2f}s")
+
+    mismatches = report['mismatches']
+    if not mismatches:
+        print("✅ Todos los artefactos concilian con los diarios")
+        return True
+
+    print(f"❌ {len(mismatches)} diferencias (tolerancia {TOLERANCE_CENTS} centavos en montos):")
+    for m in mismatches[:limit]:
+        if m['actual'] is None:
+            print(f"  - {m['artifact']} {m['name']}: falta {m['field']} (esperado {m['expected']})")
+        else:
+            print(f"  - {m['artifact']} {m['name']}: {m['field']} = {m['actual']} vs {m['expected']} "
+                  f"(delta {m['delta']:+})")
+    if len(mismatches) > limit:
+        print(f"  ... y {len(mismatches) - limit} más")
+    return False
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(0 if print_report(reconcile_all()) else 1)
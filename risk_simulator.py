@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Simulador Monte Carlo de riesgo por block bootstrap
+Remuestrea el P&L histórico (diario o por trade) en lotes NumPy para estimar
+bandas de P&L a fin de año, riesgo de ruina y probabilidad de objetivos mensuales
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from market_calendar import trading_days
+
+# Días de trading en un mes típico, usado para los objetivos mensuales
+TRADING_DAYS_PER_MONTH = 21
+
+# Percentiles de las bandas de P&L
+PERCENTILES = (5, 25, 50, 75, 95)
+
+def load_pnl_samples(mode='daily'):
+    """P&L histórico en orden cronológico: por día de trading o por trade"""
+    if mode == 'trade':
+        from equity_curve import load_trade_arrays
+        return load_trade_arrays()['net_cents'] / 100
+
+    from rolling_metrics import load_daily_series
+    return np.asarray(load_daily_series()['net'], dtype=np.float64) / 100
+
+def remaining_trading_days(today=None):
+    """Sesiones del NYSE que quedan en el año después de hoy (sin feriados)"""
+    if today is None:
+        today = datetime.now()
+    start = (today + timedelta(days=1)).date()
+    end = datetime(today.year, 12, 31).date()
+    return len(trading_days(start, end))
+
+def _simulate_batch(args):
+    """
+    Simula un lote de caminos y devuelve solo sus estadísticas
+
+    Cada lote recibe su propia semilla derivada, así que el resultado no
+    depende de cuántos procesos se usen.
+    """
+    samples, n_paths, eoy_steps, month_steps, block_size, seed, drawdown_limit, monthly_target = args
+    rng = np.random.default_rng(seed)
+
+    horizon = max(eoy_steps, month_steps)
+    block_size = max(1, min(block_size, len(samples)))
+    n_blocks = -(-horizon // block_size)
+
+    # Bloques contiguos del historial para conservar la autocorrelación
+    block_starts = rng.integers(0, len(samples) - block_size + 1, size=(n_paths, n_blocks))
+    indices = (block_starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)[:, :horizon]
+    equity = np.cumsum(samples[indices], axis=1)
+
+    if eoy_steps > 0:
+        year_equity = equity[:, :eoy_steps]
+        peaks = np.maximum(np.maximum.accumulate(year_equity, axis=1), 0)
+        final_pnl = year_equity[:, -1]
+        max_drawdown = (peaks - year_equity).max(axis=1)
+    else:
+        final_pnl = np.zeros(n_paths)
+        max_drawdown = np.zeros(n_paths)
+
+    return (
+        final_pnl,
+        max_drawdown >= drawdown_limit,
+        equity[:, month_steps - 1] >= monthly_target
+    )
+
+def simulate(samples, eoy_steps, month_steps, n_paths=100000, block_size=5, seed=42,
+             drawdown_limit=1000, monthly_target=500, batch_size=10000, workers=1):
+    """
+    Ejecuta el block bootstrap por lotes, opcionalmente repartido en procesos
+
+    Args:
+        samples: P&L histórico en orden cronológico
+        eoy_steps: Pasos (días o trades) que quedan hasta fin de año
+        month_steps: Pasos que componen un mes de trading
+        n_paths: Número de caminos simulados
+        block_size: Largo de cada bloque remuestreado
+        seed: Semilla del generador (resultados reproducibles)
+        drawdown_limit: Drawdown que se considera ruina
+        monthly_target: Objetivo de P&L para el próximo mes
+        batch_size: Caminos por lote (limita la memoria)
+        workers: Procesos para repartir los lotes (1 = en serie)
+
+    Returns:
+        Diccionario con el P&L simulado hasta fin de año por camino, la
+        probabilidad de ruina y la de alcanzar el objetivo mensual
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    if len(samples) == 0 or month_steps <= 0:
+        return None
+
+    batch_sizes = [batch_size] * (n_paths // batch_size)
+    if n_paths % batch_size:
+        batch_sizes.append(n_paths % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+
+    jobs = [
+        (samples, size, eoy_steps, month_steps, block_size, child, drawdown_limit, monthly_target)
+        for size, child in zip(batch_sizes, seeds)
+    ]
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            results = list(executor.map(_simulate_batch, jobs))
+    else:
+        results = [_simulate_batch(job) for job in jobs]
+
+    return {
+        'final_pnl': np.concatenate([r[0] for r in results]),
+        'risk_of_ruin': float(np.concatenate([r[1] for r in results]).mean()),
+        'monthly_target_probability': float(np.concatenate([r[2] for r in results]).mean())
+    }
+
+def run_risk_simulation(ytd_pnl, mode='daily', n_paths=None, seed=None,
+                        drawdown_limit=None, monthly_target=None, workers=None, today=None):
+    """
+    Proyección de fin de año con incertidumbre a partir del P&L acumulado del año
+
+    Los parámetros no indicados se leen de variables de entorno:
+    RISK_SIM_PATHS, RISK_SIM_SEED, RISK_DRAWDOWN_LIMIT, MONTHLY_PNL_TARGET
+    y RISK_SIM_WORKERS.
+    """
+    n_paths = n_paths or int(os.getenv('RISK_SIM_PATHS', '100000'))
+    seed = seed if seed is not None else int(os.getenv('RISK_SIM_SEED', '42'))
+    drawdown_limit = drawdown_limit if drawdown_limit is not None else float(os.getenv('RISK_DRAWDOWN_LIMIT', '1000'))
+    monthly_target = monthly_target if monthly_target is not None else float(os.getenv('MONTHLY_PNL_TARGET', '500'))
+    workers = workers or int(os.getenv('RISK_SIM_WORKERS', '1'))
+
+    samples = load_pnl_samples(mode)
+    if len(samples) < 2:
+        return None
+
+    days_left = remaining_trading_days(today)
+    eoy_steps = days_left
+    month_steps = TRADING_DAYS_PER_MONTH
+    if mode == 'trade':
+        # Trades esperados según el ritmo histórico de trades por día de trading
+        trades_per_day = len(samples) / max(len(load_pnl_samples('daily')), 1)
+        eoy_steps = int(round(days_left * trades_per_day))
+        month_steps = max(int(round(TRADING_DAYS_PER_MONTH * trades_per_day)), 1)
+
+    result = simulate(samples, eoy_steps, month_steps, n_paths=n_paths, seed=seed,
+                      drawdown_limit=drawdown_limit, monthly_target=monthly_target, workers=workers)
+    if result is None:
+        return None
+
+    eoy = ytd_pnl + result['final_pnl']
+    bands = np.percentile(eoy, PERCENTILES)
+
+    return {
+        'mode': mode,
+        'paths': n_paths,
+        'seed': seed,
+        'remaining_trading_days': days_left,
+        'eoy_pnl_bands': {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, bands)},
+        'eoy_pnl_mean': round(float(eoy.mean()), 2),
+        'probability_profitable_year': round(float((eoy > 0).mean()), 4),
+        'drawdown_limit': drawdown_limit,
+        'risk_of_ruin': round(result['risk_of_ruin'], 4),
+        'monthly_target': monthly_target,
+        'monthly_target_probability': round(result['monthly_target_probability'], 4)
+    }
+
+if __name__ == "__main__":
+    import time
+    from generate_stats import calculate_yearly_projection
+
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'daily'
+    yearly = calculate_yearly_projection(simulate_risk=False)
+    ytd = yearly['actual_pnl'] if yearly else 0
+
+    start = time.time()
+    simulation = run_risk_simulation(ytd, mode=mode)
+    elapsed = time.time() - start
+
+    if simulation:
+        print(f"🎲 {simulation['paths']:,} caminos ({mode}) en {elapsed:.2f}s")
+        print(f"📈 P&L fin de año: {simulation['eoy_pnl_bands']}")
+        print(f"⚠️  Riesgo de ruina (DD >= ${simulation['drawdown_limit']:,.0f}): {simulation['risk_of_ruin']*100:.1f}%")
+        print(f"🎯 Probabilidad de objetivo mensual (${simulation['monthly_target']:,.0f}): "
+              f"{simulation['monthly_target_probability']*100:.1f}%")
+    else:
+        print("⚠️  No hay suficiente historial para simular")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Métricas móviles sobre la serie diaria de trading
+Calcula ventanas de 5/20/60 días de trading a partir de sumas prefijas
+"""
+
+import os
+import numpy as np
+from trading_data import iter_day_summaries
+from json_codec import write_json
+
+# Ventanas en días de trading (días con al menos un trade)
+ROLLING_WINDOWS = (5, 20, 60)
+
+def load_daily_series():
+    """
+    Carga la serie diaria (solo días con trades) ordenada por fecha, con montos en centavos
+
+    Los totales salen del índice de resúmenes diarios: no se decodifican trades.
+    """
+    series = {
+        'dates': [],
+        'net': [],
+        'trades': [],
+        'wins': [],
+        'gross_profit': [],
+        'gross_loss': []
+    }
+
+    for date_str, day in iter_day_summaries():
+        record = day.totals
+        if record['trades'] == 0:
+            continue
+
+        series['dates'].append(date_str)
+        series['net'].append(record['net'])
+        series['trades'].append(record['trades'])
+        series['wins'].append(record['wins'])
+        series['gross_profit'].append(record['grossProfit'])
+        series['gross_loss'].append(record['grossLoss'])
+
+    return series
+
+def _prefix(values, dtype=np.int64):
+    """Array de sumas prefijas con un cero inicial (P[i] = suma de values[:i])"""
+    prefix = np.zeros(len(values) + 1, dtype=dtype)
+    np.cumsum(np.asarray(values, dtype=dtype), out=prefix[1:])
+    return prefix
+
+def _window_sums(prefix, window):
+    """Suma de cada ventana completa terminando en cada índice i >= window - 1"""
+    return prefix[window:] - prefix[:-window]
+
+def _rolling_max_drawdown(cumulative, window):
+    """Máximo drawdown de cada ventana, medido desde el equity previo a la ventana"""
+    # cumulative incluye el cero inicial, así que cada ventana usa window + 1 puntos
+    views = np.lib.stride_tricks.sliding_window_view(cumulative, window + 1)
+    peaks = np.maximum.accumulate(views, axis=1)
+    return (peaks - views).max(axis=1)
+
+def calculate_rolling_metrics(series, windows=ROLLING_WINDOWS):
+    """
+    Calcula win rate, P&L, profit factor, Sharpe y max drawdown móviles
+
+    Todas las métricas de suma salen de restar dos posiciones de los arrays
+    prefijos, así que cada ventana cuesta O(1) sin importar su tamaño.
+    """
+    n = len(series['dates'])
+
+    net_prefix = _prefix(series['net'])
+    sq_prefix = _prefix(np.square(np.asarray(series['net'], dtype=np.int64)))
+    trades_prefix = _prefix(series['trades'])
+    wins_prefix = _prefix(series['wins'])
+    profit_prefix = _prefix(series['gross_profit'])
+    loss_prefix = _prefix(series['gross_loss'])
+
+    results = {}
+    for window in windows:
+        if n < window:
+            continue
+
+        pnl = _window_sums(net_prefix, window)
+        trades = _window_sums(trades_prefix, window)
+        wins = _window_sums(wins_prefix, window)
+        gross_profit = _window_sums(profit_prefix, window)
+        gross_loss = _window_sums(loss_prefix, window)
+
+        # Win rate a nivel de trade
+        win_rate = np.divide(wins, trades, out=np.zeros(len(wins)), where=trades > 0)
+
+        # Profit factor con el mismo tope que usa el dashboard para infinito
+        profit_factor = np.divide(gross_profit, gross_loss, out=np.zeros(len(gross_profit)), where=gross_loss > 0)
+        profit_factor[(gross_loss == 0) & (gross_profit > 0)] = 999.99
+
+        # Sharpe anualizado sobre P&L diario (desviación poblacional)
+        # La varianza escalada (n·Σx² - (Σx)²) se calcula exacta en centavos enteros
+        scaled_variance = window * _window_sums(sq_prefix, window) - np.square(pnl)
+        mean = pnl / window
+        std = np.sqrt(scaled_variance) / window
+        sharpe = np.divide(mean, std, out=np.zeros(len(mean)), where=scaled_variance > 0) * np.sqrt(252)
+
+        max_drawdown = _rolling_max_drawdown(net_prefix, window)
+
+        results[str(window)] = {
+            'offset': window - 1,
+            'pnl': (pnl / 100).tolist(),
+            'winRate': np.round(win_rate, 4).tolist(),
+            'profitFactor': np.round(profit_factor, 2).tolist(),
+            'sharpe': np.round(sharpe, 2).tolist(),
+            'maxDrawdown': (max_drawdown / 100).tolist()
+        }
+
+    return results
+
+def export_rolling_metrics(output_file='docs/data/rolling-metrics.json'):
+    """Genera el payload compacto de métricas móviles para el dashboard"""
+    series = load_daily_series()
+
+    # 'offset' indica el índice en 'dates' donde empieza cada serie
+    payload = {
+        'dates': series['dates'],
+        'windows': calculate_rolling_metrics(series)
+    }
+
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    write_json(output_file, payload, compact=True)
+
+    print(f"✅ Métricas móviles generadas en {output_file} ({len(series['dates'])} días de trading)")
+    return output_file
+
+if __name__ == "__main__":
+    export_rolling_metrics()
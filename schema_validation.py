@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Validación de esquema de los exports y del dashboard con caché de resultados
+Cada archivo se valida una vez por contenido: el resultado queda guardado por
+file_signature y solo se revisan de nuevo los archivos que cambiaron (o todos
+si cambian los esquemas). El reporte JSON lo consume validate-and-alert.yml
+"""
+
+import os
+import re
+import glob
+import hashlib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from trading_data import file_signature
+from json_codec import read_json, write_json
+from pipeline_metrics import count_cache
+
+RESULTS_VERSION = 1
+
+# Número JSON (bool es subclase de int y no cuenta)
+NUMBER = 'number'
+
+DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+class OptionalKey:
+    """Clave que puede faltar; si está debe cumplir el esquema"""
+
+    def __init__(self, spec):
+        self.spec = spec
+
+    def __repr__(self):
+        return f"OptionalKey({self.spec!r})"
+
+class Nullable:
+    """Valor que puede ser null"""
+
+    def __init__(self, spec):
+        self.spec = spec
+
+    def __repr__(self):
+        return f"Nullable({self.spec!r})"
+
+TRADE = {
+    'date': DATE,
+    'opened': str,
+    'symbol': str,
+    'pnl': NUMBER,
+    'commission': NUMBER,
+    'net': OptionalKey(NUMBER),
+    'closed': OptionalKey(str),
+    'held': OptionalKey(str),
+    'type': OptionalKey(str)
+}
+
+PERIOD_TOTALS = {
+    'totalTradingDays': int,
+    'totalTrades': int,
+    'grossPnL': NUMBER,
+    'totalCommissions': NUMBER,
+    'netPnL': NUMBER,
+    'winningTrades': int,
+    'losingTrades': int,
+    'winRate': NUMBER,
+    'profitFactor': NUMBER
+}
+
+COACHING_SECTIONS = {
+    'overall_performance': str,
+    'strengths': [str],
+    'areas_for_improvement': [str],
+    'specific_recommendations': [str],
+    'risk_management': str,
+    'psychological_insights': str
+}
+
+# Tipo de artefacto -> (patrón de archivos, esquema)
+SCHEMAS = {
+    'daily': ('{exports}/daily/*.json', {
+        'date': DATE,
+        'account': str,
+        'trades': [TRADE],
+        'summary': {
+            'totalTrades': int,
+            'totalPnL': NUMBER,
+            'totalCommissions': NUMBER,
+            'netPnL': NUMBER,
+            'winningTrades': int,
+            'losingTrades': int,
+            'symbols': [str]
+        },
+        'metadata': OptionalKey(dict)
+    }),
+    'weekly': ('{exports}/weekly/*.json', {
+        'weekPeriod': re.compile(r'^\d{4}-\d{2}-\d{2} to \d{4}-\d{2}-\d{2}$'),
+        'weekNumber': int,
+        'year': int,
+        'summary': PERIOD_TOTALS,
+        'extremes': dict,
+        'patterns': dict,
+        'dailyBreakdown': [{'date': DATE, 'trades': int, 'pnl': NUMBER}]
+    }),
+    'monthly': ('{exports}/monthly/*.json', {
+        'month': int,
+        'monthName': str,
+        'year': int,
+        'overview': PERIOD_TOTALS,
+        'performanceAnalysis': dict
+    }),
+    'coaching': ('{exports}/coaching/*/*.json', {
+        'period': str,
+        'generated_at': str,
+        'performance_summary': {'net_pnl': NUMBER, 'total_trades': int, 'win_rate': NUMBER},
+        'coaching': COACHING_SECTIONS
+    }),
+    'dashboard': ('docs/dashboard-data.json', {
+        'lastUpdate': str,
+        'year': int,
+        'yearData': dict,
+        'yearStats': dict,
+        'allTimeStats': OptionalKey(dict),
+        'yearOverYear': OptionalKey(list),
+        'monthlyData': [{'month': int, 'monthName': str, 'trades': int, 'pnl': NUMBER, 'winRate': NUMBER}],
+        'weeklyData': [{'week': int, 'period': str, 'trades': int, 'pnl': NUMBER, 'winRate': NUMBER}]
+    })
+}
+
+# Máximo de errores guardados por archivo
+MAX_ERRORS = 20
+
+def get_results_file():
+    """Ruta del caché de resultados de validación"""
+    base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
+    return os.path.join(base_dir, "index", "schema-results.json")
+
+def schemas_hash():
+    """Hash de los esquemas: si cambian, los resultados cacheados no valen"""
+    return hashlib.sha1(repr(sorted((kind, spec) for kind, (_, spec) in SCHEMAS.items())).encode('utf-8')).hexdigest()[:16]
+
+def _type_name(value):
+    return 'null' if value is None else type(value).__name__
+
+def check(value, spec, path='$', errors=None):
+    """
+    Valida un valor contra un esquema y acumula los errores
+
+    Esquemas: un tipo (str, int, dict...), NUMBER, una regex para strings,
+    un dict de claves (OptionalKey para las que pueden faltar), una lista de
+    un elemento para validar cada ítem, o Nullable(esquema).
+
+    Returns:
+        Lista de errores 'ruta: mensaje'
+    """
+    if errors is None:
+        errors = []
+    if len(errors) >= MAX_ERRORS:
+        return errors
+
+    if isinstance(spec, Nullable):
+        if value is not None:
+            check(value, spec.spec, path, errors)
+    elif spec is NUMBER:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            errors.append(f"{path}: se esperaba número, hay {_type_name(value)}")
+    elif isinstance(spec, type):
+        if (isinstance(value, bool) and spec is not bool) or not isinstance(value, spec):
+            errors.append(f"{path}: se esperaba {spec.__name__}, hay {_type_name(value)}")
+    elif isinstance(spec, re.Pattern):
+        if not isinstance(value, str) or not spec.match(value):
+            errors.append(f"{path}: formato inválido {value!r}")
+    elif isinstance(spec, list):
+        if not isinstance(value, list):
+            errors.append(f"{path}: se esperaba list, hay {_type_name(value)}")
+        else:
+            for i, item in enumerate(value):
+                check(item, spec[0], f"{path}[{i}]", errors)
+    elif isinstance(spec, dict):
+        if not isinstance(value, dict):
+            errors.append(f"{path}: se esperaba dict, hay {_type_name(value)}")
+        else:
+            for key, child in spec.items():
+                if key not in value:
+                    if not isinstance(child, OptionalKey):
+                        errors.append(f"{path}.{key}: falta")
+                    continue
+                check(value[key], child.spec if isinstance(child, OptionalKey) else child, f"{path}.{key}", errors)
+    return errors
+
+def validate_file(job):
+    """
+    Valida un archivo (corre en un proceso del pool)
+
+    Args:
+        job: (tipo de artefacto, ruta)
+
+    Returns:
+        (ruta, lista de errores)
+    """
+    kind, file_path = job
+    try:
+        data = read_json(file_path)
+    except Exception as e:
+        return file_path, [f"$: JSON inválido ({e})"]
+
+    errors = check(data, SCHEMAS[kind][1])
+
+    # El nombre del diario es su fecha
+    if kind == 'daily' and isinstance(data, dict):
+        stem = os.path.basename(file_path)[:-5]
+        if data.get('date') != stem:
+            errors.append(f"$.date: {data.get('date')!r} no coincide con el archivo {stem}")
+
+    return file_path, errors[:MAX_ERRORS]
+
+def list_artifacts(kinds=None):
+    """(tipo, ruta) de todos los artefactos a validar, en orden"""
+    base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
+    jobs = []
+    for kind, (pattern, _) in SCHEMAS.items():
+        if kinds and kind not in kinds:
+            continue
+        for file_path in sorted(glob.glob(pattern.format(exports=base_dir))):
+            jobs.append((kind, file_path))
+    return jobs
+
+def validate_all(kinds=None, workers=None, results_file=None):
+    """
+    Valida los artefactos revisando solo los que cambiaron desde la última vez
+
+    Args:
+        kinds: Tipos a validar (por defecto todos los de SCHEMAS)
+        workers: Procesos de validación (por defecto los CPUs; 1 = en serie)
+
+    Returns:
+        Reporte: totales por tipo, archivos revisados, aciertos de caché y
+        la lista de archivos inválidos con sus errores
+    """
+    if results_file is None:
+        results_file = get_results_file()
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    current_hash = schemas_hash()
+    stored = {}
+    if os.path.exists(results_file):
+        try:
+            loaded = read_json(results_file)
+            if loaded.get('version') == RESULTS_VERSION and loaded.get('schemas') == current_hash:
+                stored = loaded['files']
+        except Exception:
+            pass
+
+    jobs = list_artifacts(kinds)
+    signatures = {file_path: file_signature(file_path) for _, file_path in jobs}
+    pending = [job for job in jobs if stored.get(job[1], {}).get('signature') != signatures[job[1]]]
+
+    if workers <= 1 or len(pending) < 2:
+        results = [validate_file(job) for job in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            results = list(executor.map(validate_file, pending, chunksize=16))
+
+    count_cache('schemaResults', len(jobs) - len(pending), len(pending))
+    files = dict(stored)
+    for file_path, errors in results:
+        files[file_path] = {'signature': signatures[file_path], 'errors': errors}
+
+    # Sin filtro de tipos se olvidan los archivos que ya no existen
+    if not kinds:
+        files = {file_path: files[file_path] for _, file_path in jobs}
+
+    if pending or not os.path.exists(results_file):
+        os.makedirs(os.path.dirname(results_file), exist_ok=True)
+        write_json(results_file, {'version': RESULTS_VERSION, 'schemas': current_hash, 'files': files}, compact=True)
+
+    totals = {}
+    invalid = []
+    for kind, file_path in jobs:
+        errors = files[file_path]['errors']
+        counts = totals.setdefault(kind, {'files': 0, 'invalid': 0})
+        counts['files'] += 1
+        if errors:
+            counts['invalid'] += 1
+            invalid.append({'kind': kind, 'file': file_path, 'errors': errors})
+
+    return {
+        'generatedAt': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'schemas': current_hash,
+        'files': len(jobs),
+        'checked': len(pending),
+        'cached': len(jobs) - len(pending),
+        'invalidFiles': len(invalid),
+        'byKind': totals,
+        'invalid': invalid
+    }
+
+def print_report(report):
+    """Imprime el reporte de validate_all() y devuelve True si no hay errores"""
+    print(f"🧪 Esquemas: {report['files']} archivos, {report['checked']} revisados, "
+          f"{report['cached']} desde caché")
+    for kind, counts in report['byKind'].items():
+        status = "✅" if counts['invalid'] == 0 else "❌"
+        print(f"  {status} {kind}: {counts['files']} archivos, {counts['invalid']} inválidos")
+
+    for entry in report['invalid']:
+        print(f"❌ {entry['file']}:")
+        for error in entry['errors'][:5]:
+            print(f"    - {error}")
+    return report['invalidFiles'] == 0
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Valida el esquema de los exports con caché por contenido')
+    parser.add_argument('--kind', action='append', choices=sorted(SCHEMAS), help='Tipo de artefacto (repetible)')
+    parser.add_argument('--workers', type=int, default=None, help='Procesos de validación (1 = en serie)')
+    parser.add_argument('--report', help='Ruta del reporte JSON')
+    args = parser.parse_args()
+
+    report = validate_all(args.kind, args.workers)
+    if args.report:
+        write_json(args.report, report)
+        print(f"📄 Reporte guardado en {args.report}")
+
+    sys.exit(0 if print_report(report) else 1)
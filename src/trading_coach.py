@@ -3,7 +3,6 @@
 Trading Coach - AI-powered trading performance analysis using OpenAI GPT-4
 """
 
-import json
 import os
 import sys
 import argparse
@@ -13,6 +12,11 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+# Permite importar los módulos de análisis de la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from json_codec import read_json_keys, write_json
+
 class TradingCoach:
     def __init__(self, api_key: str, export_dir: str = "exports"):
         self.api_key = api_key
@@ -102,6 +106,24 @@ class TradingCoach:
         
         return coaching
     
+    def _setup_breakdown(self, date_from: str, date_to: str) -> str:
+        """Breakdown by side and hold time from the trade cube, if available"""
+        try:
+            from trade_cube import load_trade_cube
+            cube = load_trade_cube(str(self.export_dir / "cube/trade-cube.json"))
+        except (ImportError, OSError, ValueError):
+            return ""
+        
+        rows = cube.slice(date_from=date_from, date_to=date_to).rollup(('side', 'hold'))
+        if not rows:
+            return ""
+        
+        breakdown = "\nSETUP BREAKDOWN (side x hold time):\n"
+        for row in rows:
+            breakdown += (f"- {row['side']} {row['hold']}: {row['trades']} trades, ${row['net']:.2f}, "
+                          f"{row['winRate']*100:.0f}% win rate, PF {row['profitFactor']:.2f}\n")
+        return breakdown
+    
     def analyze_monthly_performance(self, year: int, month: int) -> Optional[Dict]:
         """Analyze monthly trading performance"""
         # Load monthly summary
@@ -130,8 +152,7 @@ class TradingCoach:
                 }
             }
             
-        with open(monthly_file, 'r') as f:
-            monthly_data = json.load(f)
+        monthly_data = read_json_keys(monthly_file, ('monthName', 'overview', 'performanceAnalysis'))
         
         # Create prompt with key metrics
         overview = monthly_data['overview']
@@ -195,6 +216,9 @@ SYMBOL PERFORMANCE:
                 if stats['pnl'] < 0:
                     prompt += f"- {symbol}: ${stats['pnl']:.2f} ({stats['trades']} trades, {stats['win_rate']*100:.0f}% win rate)\n"
         
+        last_day = calendar.monthrange(year, month)[1]
+        prompt += self._setup_breakdown(f"{year}-{month:02d}-01", f"{year}-{month:02d}-{last_day:02d}")
+        
         prompt += """
 Please provide:
 1. Overall performance assessment
@@ -233,8 +257,7 @@ Format the response with clear sections and bullet points where appropriate.
         coaching_dir.mkdir(parents=True, exist_ok=True)
         
         report_file = coaching_dir / f"{year}-{month:02d}.json"
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        write_json(report_file, report)
         
         print(f"✅ Monthly coaching report saved: {report_file}")
         return report
@@ -266,8 +289,7 @@ Format the response with clear sections and bullet points where appropriate.
                 }
             }
             
-        with open(weekly_file, 'r') as f:
-            weekly_data = json.load(f)
+        weekly_data = read_json_keys(weekly_file, ('weekPeriod', 'summary', 'extremes', 'patterns', 'tradingPatterns'))
         
         # Create prompt with key metrics
         summary = weekly_data.get('summary', {})
@@ -323,6 +345,13 @@ DAILY BREAKDOWN:
 TRADING PATTERNS:
 - Max Consecutive Wins: {patterns.get('maxConsecutiveWins', 'N/A')}
 - Max Consecutive Losses: {patterns.get('maxConsecutiveLosses', 'N/A')}
+"""
+        
+        week_bounds = weekly_data.get('weekPeriod', '').split(' to ')
+        if len(week_bounds) == 2:
+            prompt += self._setup_breakdown(week_bounds[0], week_bounds[1])
+        
+        prompt += """
 
 Please provide:
 1. Overall weekly performance assessment
@@ -362,8 +391,7 @@ Keep the response concise but actionable.
         coaching_dir.mkdir(parents=True, exist_ok=True)
         
         report_file = coaching_dir / f"{year}-W{week:02d}.json"
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        write_json(report_file, report)
         
         print(f"✅ Weekly coaching report saved: {report_file}")
         return report
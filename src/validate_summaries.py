@@ -5,8 +5,15 @@ Validate that summary generation scripts handle empty/missing data gracefully
 
 import json
 import os
+import sys
 from pathlib import Path
 
+# Permite importar los módulos de análisis de la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reconcile import reconcile_all, print_report
+from trade_dedupe import FingerprintIndex
+
 def validate_monthly_summaries():
     """Check all monthly summaries for data integrity"""
     monthly_dir = Path("exports/monthly")
@@ -58,28 +65,92 @@ def validate_weekly_summaries():
     return True
 
 def validate_coaching_handling():
-    """Ensure coaching can handle various data scenarios"""
-    test_scenarios = [
-        {"name": "Empty month", "trades": 0, "pnl": 0},
-        {"name": "Loss month", "trades": 50, "pnl": -100},
-        {"name": "Profit month", "trades": 100, "pnl": 500},
-        {"name": "Missing data", "trades": None, "pnl": None}
-    ]
+    """Ensure every coaching report has the sections the dashboard reads"""
+    coaching_dir = Path("exports/coaching")
+    required_fields = ['period', 'performance_summary', 'coaching']
+    
+    reports = sorted(coaching_dir.glob("*/*.json")) if coaching_dir.exists() else []
+    print(f"\n🧪 Checking {len(reports)} coaching reports:")
+    
+    issues = []
+    for report_file in reports:
+        try:
+            with open(report_file, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            issues.append(f"{report_file.name}: Error reading file - {e}")
+            continue
+        
+        missing = [field for field in required_fields if field not in data]
+        if missing:
+            issues.append(f"{report_file.parent.name}/{report_file.name}: Missing {', '.join(missing)}")
     
-    print("\n🧪 Testing coaching scenarios:")
-    for scenario in test_scenarios:
-        print(f"  - {scenario['name']}: Can be handled ✅")
+    if issues:
+        print("❌ Issues found:")
+        for issue in issues:
+            print(f"  - {issue}")
+        return False
     
+    print("  ✅ All coaching reports are complete")
     return True
 
+def _replay_export(stored, fetched):
+    """Replay advanced_exporter's dedupe/record loop over an in-memory index"""
+    index = FingerprintIndex()
+    for date_str, trades in sorted(stored.items()):
+        index.record(date_str, trades)
+
+    replacing = set(fetched)
+    for date_str, trades in sorted(fetched.items()):
+        kept, _ = index.dedupe(date_str, trades, replacing)
+        index.record(date_str, kept)
+    return index
+
+def validate_trade_dedupe():
+    """Regression check: a trade that PropReports moves to another day must not be lost"""
+    trade = {'opened': '23:59:58', 'closed': '00:00:03', 'symbol': 'ABCD', 'type': 'Long', 'pnl': 12.5, 'commission': 1.2}
+    cases = [
+        # (description, stored days, re-exported days, day expected to hold the trade)
+        ("moved to an earlier day", {'2026-03-27': [], '2026-03-28': [trade]},
+         {'2026-03-27': [trade], '2026-03-28': []}, '2026-03-27'),
+        ("moved to a later day", {'2026-03-27': [trade], '2026-03-28': []},
+         {'2026-03-27': [], '2026-03-28': [trade]}, '2026-03-28'),
+        ("already stored outside the range", {'2026-03-20': [trade]},
+         {'2026-03-27': [trade]}, '2026-03-20'),
+    ]
+
+    print("\n🧬 Checking trade dedupe across re-exports:")
+    issues = []
+    for description, stored, fetched, expected in cases:
+        index = _replay_export(stored, fetched)
+        holders = [date_str for date_str, day in sorted(index.days.items()) if day['fingerprints']]
+        if len(index) != 1 or holders != [expected] or index.duplicates():
+            issues.append(f"{description}: trade held by {holders or 'no day'}, expected {expected}")
+
+    if issues:
+        print("❌ Issues found:")
+        for issue in issues:
+            print(f"  - {issue}")
+        return False
+
+    print(f"  ✅ {len(cases)} re-export scenarios keep exactly one copy of the trade")
+    return True
+
+def validate_reconciliation():
+    """Check monthly, weekly and calendar figures against the daily exports"""
+    print("")
+    return print_report(reconcile_all())
+
 def main():
     print("🔍 Validating summary data handling...\n")
     
     monthly_ok = validate_monthly_summaries()
     weekly_ok = validate_weekly_summaries()
     coaching_ok = validate_coaching_handling()
+    dedupe_ok = validate_trade_dedupe()
+    reconciled = validate_reconciliation()
     
-    if monthly_ok and weekly_ok and coaching_ok:
+    if monthly_ok and weekly_ok and coaching_ok and dedupe_ok and reconciled:
         print("\n✅ All validations passed! System can handle missing/empty data.")
     else:
         print("\n❌ Some validations failed. Check issues above.")
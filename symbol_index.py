@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Índice histórico por símbolo
+Guarda dónde está cada trade de cada símbolo (fecha, fila), sus totales y su
+serie diaria de P&L para consultar estadísticas y curvas sin leer los diarios
+"""
+
+import os
+from trading_data import get_daily_dir, list_daily_dates, load_day, file_signature, trade_net_cents
+from json_codec import read_json, write_json
+
+INDEX_VERSION = 1
+
+def get_index_file():
+    """Ruta del índice de símbolos"""
+    base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
+    return os.path.join(base_dir, "index", "symbols.json")
+
+def _empty_totals():
+    return {'trades': 0, 'wins': 0, 'losses': 0, 'net': 0, 'grossProfit': 0, 'grossLoss': 0}
+
+def _day_entries(trades):
+    """Agrupa los trades de un día por símbolo: [neto, trades, wins, losses, bruto+, bruto-, filas]"""
+    entries = {}
+    for row, trade in enumerate(trades):
+        symbol = trade.get('symbol', 'UNKNOWN')
+        net_cents = trade_net_cents(trade)
+
+        entry = entries.setdefault(symbol, [0, 0, 0, 0, 0, 0, []])
+        entry[0] += net_cents
+        entry[1] += 1
+        entry[2] += 1 if net_cents > 0 else 0
+        entry[3] += 1 if net_cents < 0 else 0
+        entry[4] += max(net_cents, 0)
+        entry[5] += -min(net_cents, 0)
+        entry[6].append(row)
+    return entries
+
+def _refresh_symbol(record):
+    """Recalcula totales y curva de equity de un símbolo a partir de sus días"""
+    record['days'].sort(key=lambda d: d[0])
+
+    totals = _empty_totals()
+    equity = []
+    cumulative = 0
+    for date_str, net, trades, wins, losses, gross_profit, gross_loss, rows in record['days']:
+        totals['net'] += net
+        totals['trades'] += trades
+        totals['wins'] += wins
+        totals['losses'] += losses
+        totals['grossProfit'] += gross_profit
+        totals['grossLoss'] += gross_loss
+        cumulative += net
+        equity.append(cumulative)
+
+    record['totals'] = totals
+    record['equity'] = equity
+
+def update_symbol_index(index_file=None):
+    """
+    Actualiza el índice procesando solo los días cuyo archivo cambió
+
+    Los días modificados o eliminados se quitan de los símbolos que tocaban y
+    solo esos símbolos recalculan totales y curva.
+    """
+    if index_file is None:
+        index_file = get_index_file()
+    daily_dir = get_daily_dir()
+
+    stored = {'version': INDEX_VERSION, 'days': {}, 'symbols': {}}
+    if os.path.exists(index_file):
+        try:
+            loaded = read_json(index_file)
+            if loaded.get('version') == INDEX_VERSION:
+                stored = loaded
+        except Exception:
+            pass
+
+    days = stored['days']
+    symbols = stored['symbols']
+    current = {date_str: os.path.join(daily_dir, f"{date_str}.json") for date_str in list_daily_dates()}
+
+    touched = set()
+
+    # Quitar días eliminados o modificados
+    for date_str in list(days):
+        file_path = current.get(date_str)
+        if file_path is not None and file_signature(file_path) == days[date_str]['signature']:
+            current.pop(date_str)
+            continue
+
+        for symbol in days[date_str]['symbols']:
+            record = symbols.get(symbol)
+            if record:
+                record['days'] = [d for d in record['days'] if d[0] != date_str]
+                touched.add(symbol)
+        del days[date_str]
+
+    # Agregar días nuevos o modificados
+    for date_str, file_path in sorted(current.items()):
+        data = load_day(date_str)
+        if data is None:
+            continue
+
+        entries = _day_entries(data.get('trades', []))
+        days[date_str] = {'signature': file_signature(file_path), 'symbols': sorted(entries)}
+
+        for symbol, entry in entries.items():
+            record = symbols.setdefault(symbol, {'days': []})
+            record['days'].append([date_str] + entry)
+            touched.add(symbol)
+
+    for symbol in touched:
+        if symbols[symbol]['days']:
+            _refresh_symbol(symbols[symbol])
+        else:
+            del symbols[symbol]
+
+    stored = {'version': INDEX_VERSION, 'days': days, 'symbols': symbols}
+    if touched or not os.path.exists(index_file):
+        os.makedirs(os.path.dirname(index_file), exist_ok=True)
+        write_json(index_file, stored, compact=True)
+        print(f"🔎 Índice de símbolos actualizado: {len(touched)} símbolos recalculados")
+
+    return SymbolIndex(stored)
+
+def load_symbol_index(index_file=None):
+    """Carga el índice guardado sin revisar los archivos diarios"""
+    return SymbolIndex(read_json(index_file or get_index_file()))
+
+class SymbolIndex:
+    """Consultas de tiempo constante sobre el índice de símbolos"""
+
+    def __init__(self, stored):
+        self.records = stored['symbols']
+
+    def symbols(self):
+        return sorted(self.records)
+
+    def get_symbol_stats(self, symbol):
+        """Estadísticas históricas del símbolo (None si nunca se operó)"""
+        record = self.records.get(symbol)
+        if record is None:
+            return None
+
+        totals = record['totals']
+        trades = totals['trades']
+        gross_profit = totals['grossProfit'] / 100
+        gross_loss = totals['grossLoss'] / 100
+
+        if gross_loss > 0:
+            profit_factor = round(gross_profit / gross_loss, 2)
+        else:
+            profit_factor = 999.99 if gross_profit > 0 else 0
+
+        return {
+            'symbol': symbol,
+            'trades': trades,
+            'tradingDays': len(record['days']),
+            'firstDate': record['days'][0][0],
+            'lastDate': record['days'][-1][0],
+            'netPnL': totals['net'] / 100,
+            'wins': totals['wins'],
+            'losses': totals['losses'],
+            'winRate': round(totals['wins'] / trades, 4) if trades else 0,
+            'grossProfit': gross_profit,
+            'grossLoss': gross_loss,
+            'profitFactor': profit_factor,
+            'avgTrade': round(totals['net'] / trades / 100, 2) if trades else 0
+        }
+
+    def get_symbol_equity_curve(self, symbol):
+        """Serie diaria de P&L y equity acumulado del símbolo"""
+        record = self.records.get(symbol)
+        if record is None:
+            return None
+
+        return {
+            'dates': [d[0] for d in record['days']],
+            'dailyPnL': [d[1] / 100 for d in record['days']],
+            'equity': [value / 100 for value in record['equity']]
+        }
+
+    def get_symbol_locations(self, symbol):
+        """Ubicación de cada trade del símbolo como (fecha, fila en el archivo diario)"""
+        record = self.records.get(symbol)
+        if record is None:
+            return []
+        return [(d[0], row) for d in record['days'] for row in d[7]]
+
+if __name__ == "__main__":
+    import sys
+
+    index = update_symbol_index()
+
+    if len(sys.argv) > 1:
+        symbol = sys.argv[1].upper()
+        stats = index.get_symbol_stats(symbol)
+        if stats:
+            print(f"📈 {symbol}: {stats['trades']} trades en {stats['tradingDays']} días, "
+                  f"P&L: ${stats['netPnL']:,.2f}, Win rate: {stats['winRate']*100:.1f}%, "
+                  f"PF: {stats['profitFactor']}")
+        else:
+            print(f"⚠️  No hay trades de {symbol}")
+    else:
+        print(f"📊 {len(index.symbols())} símbolos indexados")
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Matriz dispersa símbolo × día de trading con P&L neto y cantidad de trades
+Se arma desde el índice de símbolos (que ya se actualiza solo con los días
+modificados), se guarda en .npz comprimido y responde concentración,
+recurrencia y heatmaps con NumPy
+"""
+
+import os
+import numpy as np
+from trading_data import period_key, GRANULARITIES
+from symbol_index import update_symbol_index
+from json_codec import write_json
+
+MATRIX_VERSION = 1
+
+def get_matrix_file():
+    """Ruta de la matriz símbolo × día"""
+    base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
+    return os.path.join(base_dir, "index", "symbol-day-matrix.npz")
+
+class SymbolDayMatrix:
+    """
+    Matriz en formato coordenado (fila = símbolo, columna = día)
+
+    Solo se guardan las celdas con trades; el P&L va en centavos enteros.
+    """
+
+    def __init__(self, symbols, dates, rows, cols, net, trades):
+        self.symbols = list(symbols)
+        self.dates = list(dates)
+        self.rows = rows
+        self.cols = cols
+        self.net = net
+        self.trades = trades
+
+    @classmethod
+    def from_index(cls, index):
+        """Construye la matriz desde un SymbolIndex sin leer los archivos diarios"""
+        symbols = index.symbols()
+        dates = sorted({day[0] for symbol in symbols for day in index.records[symbol]['days']})
+        date_ids = {date_str: i for i, date_str in enumerate(dates)}
+
+        rows, cols, net, trades = [], [], [], []
+        for row, symbol in enumerate(symbols):
+            for day in index.records[symbol]['days']:
+                rows.append(row)
+                cols.append(date_ids[day[0]])
+                net.append(day[1])
+                trades.append(day[2])
+
+        # Orden por día y luego por símbolo, estable entre ejecuciones
+        order = np.lexsort((np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)))
+        return cls(
+            symbols, dates,
+            np.asarray(rows, dtype=np.int32)[order],
+            np.asarray(cols, dtype=np.int32)[order],
+            np.asarray(net, dtype=np.int64)[order],
+            np.asarray(trades, dtype=np.int32)[order]
+        )
+
+    def save(self, matrix_file):
+        os.makedirs(os.path.dirname(matrix_file), exist_ok=True)
+        np.savez_compressed(
+            matrix_file,
+            version=np.array(MATRIX_VERSION),
+            symbols=np.array(self.symbols, dtype=str),
+            dates=np.array(self.dates, dtype=str),
+            rows=self.rows, cols=self.cols, net=self.net, trades=self.trades
+        )
+
+    @classmethod
+    def load(cls, matrix_file):
+        with np.load(matrix_file) as stored:
+            if int(stored['version']) != MATRIX_VERSION:
+                raise ValueError(f"Versión de matriz no soportada: {int(stored['version'])}")
+            return cls(stored['symbols'].tolist(), stored['dates'].tolist(),
+                       stored['rows'], stored['cols'], stored['net'], stored['trades'])
+
+    def same_as(self, other):
+        return (self.symbols == other.symbols and self.dates == other.dates and
+                all(np.array_equal(getattr(self, name), getattr(other, name))
+                    for name in ('rows', 'cols', 'net', 'trades')))
+
+    def __len__(self):
+        return len(self.net)
+
+    def _periods(self, granularity):
+        """Período de cada columna: (códigos por columna, etiquetas)"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Granularidad no soportada: {granularity}")
+        keys = [period_key(date_str, granularity) for date_str in self.dates]
+        labels = sorted(set(keys))
+        label_ids = {label: i for i, label in enumerate(labels)}
+        return np.array([label_ids[key] for key in keys], dtype=np.int64), labels
+
+    def _period_sums(self, granularity):
+        """Matrices densas período × símbolo de P&L (centavos) y trades"""
+        codes, labels = self._periods(granularity)
+        cell = codes[self.cols] * len(self.symbols) + self.rows
+        size = len(labels) * len(self.symbols)
+        shape = (len(labels), len(self.symbols))
+        net = np.bincount(cell, weights=self.net, minlength=size).round().astype(np.int64).reshape(shape)
+        trades = np.bincount(cell, weights=self.trades, minlength=size).astype(np.int64).reshape(shape)
+        return labels, net, trades
+
+    def concentration(self, granularity='month', top_n=5):
+        """
+        Peso de los N símbolos con más P&L absoluto en cada período
+
+        topShare es la fracción del P&L absoluto del período que explican
+        esos N símbolos (1.0 = todo el resultado vino de ellos).
+        """
+        labels, net, trades = self._period_sums(granularity)
+        magnitude = np.abs(net)
+        totals = magnitude.sum(axis=1)
+        top = np.argsort(-magnitude, axis=1, kind='stable')[:, :top_n]
+        top_sums = np.take_along_axis(magnitude, top, axis=1).sum(axis=1)
+
+        rows = []
+        for p, label in enumerate(labels):
+            active = int((trades[p] > 0).sum())
+            leaders = [i for i in top[p] if trades[p, i] > 0]
+            rows.append({
+                'period': label,
+                'symbols': active,
+                'netPnL': int(net[p].sum()) / 100,
+                'topShare': round(float(top_sums[p] / totals[p]), 4) if totals[p] > 0 else 0,
+                'top': [{'symbol': self.symbols[i], 'netPnL': int(net[p, i]) / 100,
+                         'trades': int(trades[p, i])} for i in leaders]
+            })
+        return rows
+
+    def recurrence(self, granularity='month'):
+        """
+        Cuántas veces vuelve cada símbolo: días y períodos con trades
+
+        Returns:
+            Lista ordenada por días operados (desc) con días, períodos,
+            fracción de los días de trading y primera/última fecha
+        """
+        codes, labels = self._periods(granularity)
+        n_symbols = len(self.symbols)
+
+        days = np.bincount(self.rows, minlength=n_symbols)
+        periods_seen = np.zeros((n_symbols, len(labels)), dtype=bool)
+        periods_seen[self.rows, codes[self.cols]] = True
+        periods = periods_seen.sum(axis=1)
+
+        first = np.full(n_symbols, len(self.dates), dtype=np.int64)
+        np.minimum.at(first, self.rows, self.cols)
+        last = np.full(n_symbols, -1, dtype=np.int64)
+        np.maximum.at(last, self.rows, self.cols)
+
+        net = np.bincount(self.rows, weights=self.net, minlength=n_symbols).round().astype(np.int64)
+        total_days = len(self.dates)
+
+        order = np.lexsort((np.arange(n_symbols), -days))
+        return [{
+            'symbol': self.symbols[i],
+            'days': int(days[i]),
+            'periods': int(periods[i]),
+            'dayShare': round(float(days[i]) / total_days, 4) if total_days else 0,
+            'firstDate': self.dates[first[i]],
+            'lastDate': self.dates[last[i]],
+            'netPnL': int(net[i]) / 100
+        } for i in order if days[i] > 0]
+
+    def heatmap(self, granularity='week', top_n=20):
+        """
+        Heatmap de los N símbolos con más P&L absoluto por período
+
+        Returns:
+            Dict con etiquetas de períodos, símbolos y matrices densas
+            (símbolo × período) de P&L en dólares y trades
+        """
+        labels, net, trades = self._period_sums(granularity)
+        weight = np.abs(net).sum(axis=0)
+        chosen = [i for i in np.argsort(-weight, kind='stable')[:top_n] if trades[:, i].sum() > 0]
+
+        return {
+            'granularity': granularity,
+            'periods': labels,
+            'symbols': [self.symbols[i] for i in chosen],
+            'netPnL': (net[:, chosen].T / 100).tolist(),
+            'trades': trades[:, chosen].T.tolist()
+        }
+
+def update_symbol_matrix(index=None, matrix_file=None):
+    """
+    Reconstruye la matriz desde el índice de símbolos y la guarda si cambió
+
+    Args:
+        index: SymbolIndex ya actualizado (por defecto se actualiza aquí)
+    """
+    if matrix_file is None:
+        matrix_file = get_matrix_file()
+    if index is None:
+        index = update_symbol_index()
+
+    matrix = SymbolDayMatrix.from_index(index)
+
+    previous = None
+    if os.path.exists(matrix_file):
+        try:
+            previous = SymbolDayMatrix.load(matrix_file)
+        except Exception:
+            pass
+
+    if previous is None or not matrix.same_as(previous):
+        matrix.save(matrix_file)
+        print(f"🧮 Matriz símbolo × día guardada: {len(matrix.symbols)} símbolos, "
+              f"{len(matrix.dates)} días, {len(matrix)} celdas")
+
+    return matrix
+
+def load_symbol_matrix(matrix_file=None):
+    """Carga la matriz guardada sin revisar el índice ni los diarios"""
+    return SymbolDayMatrix.load(matrix_file or get_matrix_file())
+
+def export_symbol_heatmap_payload(matrix, output_file='docs/data/symbol-heatmap.json', top_n=20):
+    """Heatmap semanal, concentración mensual y recurrencia para el dashboard"""
+    payload = {
+        'heatmap': matrix.heatmap('week', top_n),
+        'concentration': matrix.concentration('month', 5),
+        'recurrence': matrix.recurrence('month')[:top_n]
+    }
+
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    write_json(output_file, payload, compact=True)
+
+    print(f"✅ Heatmap de símbolos generado en {output_file}")
+    return output_file
+
+if __name__ == "__main__":
+    import sys
+
+    granularity = sys.argv[1] if len(sys.argv) > 1 else 'month'
+    matrix = update_symbol_matrix()
+    export_symbol_heatmap_payload(matrix)
+
+    for row in matrix.concentration(granularity, 5):
+        leaders = ', '.join(f"{t['symbol']} ${t['netPnL']:,.2f}" for t in row['top'][:3])
+        print(f"📊 {row['period']}: {row['symbols']} símbolos, top 5 = {row['topShare']*100:.0f}% ({leaders})")
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Cubo de agregados de trades (fecha × hora × día de semana × símbolo × lado × duración)
+Se construye de forma incremental por día y responde slices y rollups con NumPy
+"""
+
+import os
+from datetime import datetime
+import numpy as np
+from trading_data import get_daily_dir, list_daily_dates, load_day, file_signature, parse_hold_seconds, trade_net_cents
+from json_codec import read_json, write_json
+
+CUBE_VERSION = 1
+
+SIDES = ('Long', 'Short')
+HOLD_BUCKETS = ('<5min', '5-15min', '15-60min', '>60min')
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+DIMENSIONS = ('date', 'hour', 'weekday', 'symbol', 'side', 'hold')
+MEASURES = ('trades', 'wins', 'losses', 'net', 'grossProfit', 'grossLoss', 'holdSeconds')
+
+def get_cube_file():
+    """Ruta del archivo del cubo"""
+    base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
+    return os.path.join(base_dir, "cube", "trade-cube.json")
+
+def hold_bucket(seconds):
+    """Índice del bucket de duración del trade"""
+    minutes = seconds / 60
+    if minutes < 5:
+        return 0
+    elif minutes < 15:
+        return 1
+    elif minutes < 60:
+        return 2
+    return 3
+
+def build_day_cells(trades, symbol_ids, symbols):
+    """
+    Agrega los trades de un día en celdas del cubo
+
+    Cada celda es [hora, símbolo, lado, bucket, trades, wins, losses,
+    neto, ganancia bruta, pérdida bruta, segundos de holding]; los montos
+    van en centavos enteros.
+    """
+    cells = {}
+
+    for trade in trades:
+        opened = trade.get('opened', '')
+        time_part = opened.split(' ')[-1]
+        try:
+            hour = int(time_part.split(':')[0])
+            hold_seconds = parse_hold_seconds(trade.get('held', ''))
+        except ValueError:
+            continue
+
+        symbol = trade.get('symbol', 'UNKNOWN')
+        if symbol not in symbol_ids:
+            symbol_ids[symbol] = len(symbols)
+            symbols.append(symbol)
+
+        side = 1 if trade.get('type', '').lower() == 'short' else 0
+        key = (hour, symbol_ids[symbol], side, hold_bucket(hold_seconds))
+        net_cents = trade_net_cents(trade)
+
+        cell = cells.setdefault(key, [0, 0, 0, 0, 0, 0, 0])
+        cell[0] += 1
+        cell[1] += 1 if net_cents > 0 else 0
+        cell[2] += 1 if net_cents < 0 else 0
+        cell[3] += net_cents
+        cell[4] += max(net_cents, 0)
+        cell[5] += -min(net_cents, 0)
+        cell[6] += hold_seconds
+
+    return [list(key) + values for key, values in sorted(cells.items())]
+
+def update_trade_cube(cube_file=None):
+    """
+    Actualiza el cubo reconstruyendo solo los días cuyo archivo cambió
+
+    Returns:
+        TradeCube con el contenido actualizado
+    """
+    if cube_file is None:
+        cube_file = get_cube_file()
+    daily_dir = get_daily_dir()
+
+    stored = {'version': CUBE_VERSION, 'symbols': [], 'days': {}}
+    if os.path.exists(cube_file):
+        try:
+            loaded = read_json(cube_file)
+            if loaded.get('version') == CUBE_VERSION:
+                stored = loaded
+        except Exception:
+            pass
+
+    symbols = stored['symbols']
+    symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+    days = {}
+    rebuilt = 0
+
+    for date_str in list_daily_dates():
+        signature = file_signature(os.path.join(daily_dir, f"{date_str}.json"))
+
+        previous = stored['days'].get(date_str)
+        if previous and previous['signature'] == signature:
+            days[date_str] = previous
+            continue
+
+        data = load_day(date_str)
+        if data is None:
+            continue
+
+        days[date_str] = {
+            'signature': signature,
+            'cells': build_day_cells(data.get('trades', []), symbol_ids, symbols)
+        }
+        rebuilt += 1
+
+    stored = {'version': CUBE_VERSION, 'symbols': symbols, 'days': days}
+    if rebuilt or not os.path.exists(cube_file):
+        os.makedirs(os.path.dirname(cube_file), exist_ok=True)
+        write_json(cube_file, stored, compact=True)
+        print(f"🧊 Cubo de trades actualizado: {rebuilt} días reconstruidos de {len(days)}")
+
+    return TradeCube.from_stored(stored)
+
+def load_trade_cube(cube_file=None):
+    """Carga el cubo guardado sin revisar los archivos diarios"""
+    return TradeCube.from_stored(read_json(cube_file or get_cube_file()))
+
+class TradeCube:
+    """Cubo de trades en arrays columnares con slices y rollups vectorizados"""
+
+    def __init__(self, dates, symbols, columns):
+        self.dates = dates
+        self.symbols = symbols
+        self.columns = columns
+
+    @classmethod
+    def from_stored(cls, stored):
+        dates = sorted(d for d, day in stored['days'].items() if day['cells'])
+        rows = []
+        day_index = []
+        for i, date_str in enumerate(dates):
+            cells = stored['days'][date_str]['cells']
+            rows.extend(cells)
+            day_index.extend([i] * len(cells))
+
+        matrix = np.asarray(rows, dtype=np.int64).reshape(-1, 4 + len(MEASURES))
+        day_index = np.asarray(day_index, dtype=np.int64)
+        weekdays = np.array([datetime.strptime(d, '%Y-%m-%d').weekday() for d in dates], dtype=np.int64)
+
+        columns = {
+            'date': day_index,
+            'hour': matrix[:, 0],
+            'weekday': weekdays[day_index] if len(dates) else day_index,
+            'symbol': matrix[:, 1],
+            'side': matrix[:, 2],
+            'hold': matrix[:, 3]
+        }
+        for i, measure in enumerate(MEASURES):
+            columns[measure] = matrix[:, 4 + i]
+
+        return cls(dates, list(stored['symbols']), columns)
+
+    def __len__(self):
+        return len(self.columns['hour'])
+
+    def _subset(self, mask):
+        return TradeCube(self.dates, self.symbols, {k: v[mask] for k, v in self.columns.items()})
+
+    def slice(self, date_from=None, date_to=None, hours=None, weekdays=None,
+              symbols=None, side=None, hold_buckets=None):
+        """
+        Filtra celdas del cubo
+
+        Ejemplo: trades Short de menos de 5 minutos los lunes antes de las 10:00
+            cube.slice(side='Short', hold_buckets=['<5min'], weekdays=['Mon'], hours=range(0, 10))
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        if date_from is not None:
+            mask &= self.columns['date'] >= np.searchsorted(self.dates, date_from, side='left')
+        if date_to is not None:
+            mask &= self.columns['date'] < np.searchsorted(self.dates, date_to, side='right')
+        if hours is not None:
+            mask &= np.isin(self.columns['hour'], list(hours))
+        if weekdays is not None:
+            codes = [WEEKDAYS.index(w) if isinstance(w, str) else w for w in weekdays]
+            mask &= np.isin(self.columns['weekday'], codes)
+        if symbols is not None:
+            codes = [self.symbols.index(s) for s in symbols if s in self.symbols]
+            mask &= np.isin(self.columns['symbol'], codes)
+        if side is not None:
+            mask &= self.columns['side'] == SIDES.index(side)
+        if hold_buckets is not None:
+            mask &= np.isin(self.columns['hold'], [HOLD_BUCKETS.index(b) for b in hold_buckets])
+
+        return self._subset(mask)
+
+    def _label(self, dimension, code):
+        if dimension == 'date':
+            return self.dates[code]
+        if dimension == 'symbol':
+            return self.symbols[code]
+        if dimension == 'weekday':
+            return WEEKDAYS[code]
+        if dimension == 'side':
+            return SIDES[code]
+        if dimension == 'hold':
+            return HOLD_BUCKETS[code]
+        return int(code)
+
+    @staticmethod
+    def _finalize(row):
+        """Convierte centavos a dólares y agrega métricas derivadas"""
+        for key in ('net', 'grossProfit', 'grossLoss'):
+            row[key] = row[key] / 100
+        trades = row['trades']
+        row['winRate'] = round(row['wins'] / trades, 4) if trades else 0
+        row['avgHoldSeconds'] = round(row['holdSeconds'] / trades) if trades else 0
+        if row['grossLoss'] > 0:
+            row['profitFactor'] = round(row['grossProfit'] / row['grossLoss'], 2)
+        else:
+            row['profitFactor'] = 999.99 if row['grossProfit'] > 0 else 0
+        return row
+
+    def totals(self):
+        """Suma de todas las celdas del cubo (o del slice)"""
+        row = {measure: int(self.columns[measure].sum()) for measure in MEASURES}
+        return self._finalize(row)
+
+    def rollup(self, by):
+        """
+        Agrupa el cubo por una o más dimensiones
+
+        Returns:
+            Lista de filas con las etiquetas de cada dimensión y las medidas sumadas
+        """
+        if isinstance(by, str):
+            by = (by,)
+        if len(self) == 0:
+            return []
+
+        keys = np.stack([self.columns[d] for d in by], axis=1)
+        groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+
+        sums = {}
+        for measure in MEASURES:
+            sums[measure] = np.bincount(inverse, weights=self.columns[measure], minlength=len(groups))
+
+        rows = []
+        for g, group in enumerate(groups):
+            row = {d: self._label(d, code) for d, code in zip(by, group)}
+            row.update({measure: int(round(sums[measure][g])) for measure in MEASURES})
+            rows.append(self._finalize(row))
+        return rows
+
+def export_cube_payload(cube, output_file='docs/data/trade-cube.json'):
+    """Rollups precalculados del cubo para el dashboard"""
+    payload = {
+        'byWeekdayHour': cube.rollup(('weekday', 'hour')),
+        'bySideHold': cube.rollup(('side', 'hold')),
+        'bySymbol': sorted(cube.rollup('symbol'), key=lambda r: r['net'], reverse=True)
+    }
+
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    write_json(output_file, payload, compact=True)
+
+    print(f"✅ Rollups del cubo generados en {output_file}")
+    return output_file
+
+if __name__ == "__main__":
+    cube = update_trade_cube()
+    export_cube_payload(cube)
+
+    totals = cube.totals()
+    print(f"📊 {len(cube)} celdas, {totals['trades']} trades, P&L: ${totals['net']:,.2f}")
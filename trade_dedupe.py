@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Huellas de trades e índice persistente para no contar un trade dos veces
+Cuando el reprocesamiento o un backfill asignan un trade a otra fecha (por
+ejemplo cerca de medianoche), la huella lo identifica sin importar el día y
+el índice dice en O(1) si ya está guardado en otro archivo diario
+"""
+
+import os
+import hashlib
+from trading_data import get_daily_dir, list_daily_dates, load_day, file_signature, to_cents
+from json_codec import read_json, write_json
+
+FINGERPRINT_VERSION = 1
+
+# Campos que identifican un trade; la fecha asignada y la cuenta quedan fuera
+FINGERPRINT_FIELDS = ('opened', 'closed', 'held', 'symbol', 'type', 'side',
+                      'entry', 'exit', 'price', 'size', 'quantity')
+
+# Montos que se normalizan a centavos antes de hashear
+MONEY_FIELDS = ('pnl', 'commission')
+
+def get_fingerprints_file():
+    """Ruta del índice de huellas"""
+    base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
+    return os.path.join(base_dir, "index", "trade-fingerprints.json")
+
+def trade_fingerprint(trade, occurrence=0):
+    """
+    Huella estable de un trade
+
+    Args:
+        occurrence: Cuántos trades idénticos aparecieron antes en el mismo
+            día (dos fills iguales en el mismo segundo son trades distintos)
+    """
+    parts = [str(trade.get(field, '')) for field in FINGERPRINT_FIELDS]
+    parts.extend(str(to_cents(trade.get(field, 0))) for field in MONEY_FIELDS)
+    parts.append(str(occurrence))
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:20]
+
+def fingerprint_trades(trades):
+    """Huellas de los trades de un día, en el mismo orden"""
+    seen = {}
+    fingerprints = []
+    for trade in trades:
+        base = trade_fingerprint(trade)
+        occurrence = seen.get(base, 0)
+        seen[base] = occurrence + 1
+        fingerprints.append(base if occurrence == 0 else trade_fingerprint(trade, occurrence))
+    return fingerprints
+
+class FingerprintIndex:
+    """
+    Huellas por día y su inversa huella -> día
+
+    Solo se persiste la lista por día; la inversa se arma al cargar. Una
+    huella en más de un día es un duplicado ya escrito (ver duplicates()).
+    """
+
+    def __init__(self, days=None):
+        self.days = days or {}
+        self.owners = {}
+        self.conflicts = {}
+        for date_str in sorted(self.days):
+            self._claim(date_str, self.days[date_str]['fingerprints'])
+
+    def _claim(self, date_str, fingerprints):
+        for fingerprint in fingerprints:
+            owner = self.owners.setdefault(fingerprint, date_str)
+            if owner != date_str:
+                self.conflicts.setdefault(fingerprint, {owner}).add(date_str)
+
+    def _release(self, date_str):
+        """Quita las huellas de un día (antes de reescribirlo o si se borró)"""
+        day = self.days.pop(date_str, None)
+        if day is None:
+            return
+        for fingerprint in day['fingerprints']:
+            dates = self.conflicts.get(fingerprint)
+            if dates:
+                dates.discard(date_str)
+                if len(dates) < 2:
+                    del self.conflicts[fingerprint]
+                if self.owners.get(fingerprint) == date_str:
+                    self.owners[fingerprint] = min(dates)
+            elif self.owners.get(fingerprint) == date_str:
+                del self.owners[fingerprint]
+
+    def dedupe(self, date_str, trades, replacing=()):
+        """
+        Separa los trades que ya están guardados en otro día
+
+        Args:
+            replacing: Fechas que se reescriben en esta misma corrida. Sus
+                huellas no cuentan como guardadas: si un trade pasa de un
+                día del rango a otro anterior, el día nuevo lo conserva y
+                el viejo se reescribe sin él (si no, se perdería)
+
+        Returns:
+            (trades a escribir, lista de (trade, fecha donde ya está))
+        """
+        kept = []
+        duplicates = []
+        for trade, fingerprint in zip(trades, fingerprint_trades(trades)):
+            owner = self.owners.get(fingerprint)
+            if owner is not None and owner != date_str and owner not in replacing:
+                duplicates.append((trade, owner))
+            else:
+                kept.append(trade)
+        return kept, duplicates
+
+    def record(self, date_str, trades, signature=None):
+        """Registra los trades escritos en un día (reemplaza lo anterior de ese día)"""
+        self._release(date_str)
+        fingerprints = fingerprint_trades(trades)
+        self.days[date_str] = {'signature': signature, 'fingerprints': fingerprints}
+        self._claim(date_str, fingerprints)
+
+    def forget(self, date_str):
+        self._release(date_str)
+
+    def duplicates(self):
+        """Huellas guardadas en más de un día: {huella: [fechas]}"""
+        return {fingerprint: sorted(dates) for fingerprint, dates in self.conflicts.items()}
+
+    def __len__(self):
+        return len(self.owners)
+
+    def save(self, fingerprints_file=None):
+        fingerprints_file = fingerprints_file or get_fingerprints_file()
+        os.makedirs(os.path.dirname(fingerprints_file), exist_ok=True)
+        write_json(fingerprints_file, {'version': FINGERPRINT_VERSION, 'days': self.days}, compact=True)
+
+def update_fingerprint_index(fingerprints_file=None):
+    """
+    Sincroniza el índice con los archivos diarios releyendo solo los que cambiaron
+
+    Los días escritos con record() ya guardan su firma, así que en una
+    ejecución normal no se relee ningún archivo.
+    """
+    if fingerprints_file is None:
+        fingerprints_file = get_fingerprints_file()
+    daily_dir = get_daily_dir()
+
+    days = {}
+    if os.path.exists(fingerprints_file):
+        try:
+            loaded = read_json(fingerprints_file)
+            if loaded.get('version') == FINGERPRINT_VERSION:
+                days = loaded['days']
+        except Exception:
+            pass
+
+    index = FingerprintIndex(days)
+    current = set(list_daily_dates())
+    changed = 0
+
+    for date_str in set(index.days) - current:
+        index.forget(date_str)
+        changed += 1
+
+    for date_str in sorted(current):
+        signature = file_signature(os.path.join(daily_dir, f"{date_str}.json"))
+        day = index.days.get(date_str)
+        if day and day['signature'] == signature:
+            continue
+
+        data = load_day(date_str)
+        if data is None:
+            continue
+        index.record(date_str, data.get('trades', []), signature)
+        changed += 1
+
+    if changed or not os.path.exists(fingerprints_file):
+        index.save(fingerprints_file)
+        print(f"🧬 Índice de huellas actualizado: {changed} días releídos, {len(index)} trades")
+
+    return index
+
+def report_duplicates(index):
+    """Imprime los trades guardados en más de un día y devuelve cuántos son"""
+    duplicates = index.duplicates()
+    if not duplicates:
+        print("✅ Sin trades duplicados entre días")
+        return 0
+
+    print(f"⚠️  {len(duplicates)} trades aparecen en más de un día:")
+    for fingerprint, dates in sorted(duplicates.items(), key=lambda item: item[1]):
+        print(f"  {fingerprint}: {', '.join(dates)}")
+    return len(duplicates)
+
+if __name__ == "__main__":
+    import sys
+
+    index = update_fingerprint_index()
+    sys.exit(1 if report_duplicates(index) else 0)
@@ -0,0 +1,807 @@
+#!/usr/bin/env python3
+"""
+Capa de datos compartida para los exports diarios
+Un único camino de lectura, un caché por proceso y una API de agregación por
+período con definiciones consistentes de P&L y de trade ganador
+"""
+
+import os
+import hashlib
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date
+from json_codec import read_json, read_json_keys, write_json, loads
+from market_calendar import is_trading_day
+from pipeline_metrics import count, count_cache
+
+# Granularidades soportadas por aggregate()
+GRANULARITIES = ('day', 'week', 'month', 'year', 'all')
+
+# Totales por trade que se acumulan siempre (montos en centavos)
+TRADE_TOTALS = ('trades', 'wins', 'losses', 'net', 'gross', 'commissions', 'grossProfit', 'grossLoss')
+
+# Acumuladores extra por trade: nombre -> (valor inicial, actualización, combinación)
+_ACCUMULATORS = OrderedDict()
+
+# Métricas registradas: nombre -> función que las calcula desde el bucket de un período
+_METRIC_FUNCS = OrderedDict()
+
+# Claves del bucket que necesita cada métrica además de los totales y los días
+_METRIC_REQUIRES = {}
+
+# Versión del índice de resúmenes diarios (cabeceras y totales sin trades)
+SUMMARIES_VERSION = 1
+
+# Tope del caché JSON, medido en bytes de los archivos en disco
+JSON_CACHE_MAX_BYTES = int(float(os.getenv('JSON_CACHE_MAX_MB', '64')) * 1024 * 1024)
+
+# Caché LRU de JSON leídos en este proceso: ruta -> (mtime_ns, tamaño, datos)
+_JSON_CACHE = OrderedDict()
+_CACHE_STATS = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes': 0}
+
+# Firmas de contenido ya calculadas en este proceso: ruta -> (mtime_ns, tamaño, firma)
+_SIGNATURES = {}
+
+# Índice de resúmenes ya actualizado en este proceso: ruta del índice -> días
+_DAY_SUMMARIES = {}
+
+# Sube con cada clear_cache(); los índices memoizados por proceso lo comparan
+_GENERATION = [0]
+
+# Hilos de lectura anticipada de archivos diarios y mínimo de archivos para usarlos
+PREFETCH_WORKERS = int(os.getenv('DAILY_PREFETCH_WORKERS', '8'))
+PREFETCH_MIN_FILES = 16
+
+# Ignorar archivos de días sin sesión del NYSE (fines de semana y feriados);
+# SKIP_NON_TRADING_DAYS=0 los vuelve a incluir
+SKIP_NON_TRADING_DAYS = os.getenv('SKIP_NON_TRADING_DAYS', '1') != '0'
+
+def get_daily_dir():
+    """Directorio de los exports diarios"""
+    base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
+    return os.path.join(base_dir, "daily")
+
+def file_signature(file_path):
+    """
+    Hash corto del contenido de un archivo (estable entre checkouts, a diferencia del mtime)
+
+    Se memoiza por mtime y tamaño: los índices incrementales (resúmenes,
+    estados, cubo, símbolos...) comparten la firma y cada archivo se hashea
+    a lo sumo una vez por proceso.
+    """
+    key = os.path.abspath(file_path)
+    stat = os.stat(key)
+    known = _SIGNATURES.get(key)
+    if known is not None and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+        return known[2]
+
+    with open(key, 'rb') as f:
+        signature = hashlib.sha1(f.read()).hexdigest()[:16]
+    _SIGNATURES[key] = (stat.st_mtime_ns, stat.st_size, signature)
+    return signature
+
+def _remember_signature(file_path, stat, signature):
+    """Registra una firma ya conocida (p. ej. del índice persistido) para el mtime actual"""
+    _SIGNATURES[os.path.abspath(file_path)] = (stat.st_mtime_ns, stat.st_size, signature)
+
+def data_generation():
+    """Contador de invalidaciones de clear_cache() para memoizar índices por proceso"""
+    return _GENERATION[0]
+
+def to_date_str(value):
+    """Normaliza datetime/date/string a 'YYYY-MM-DD'"""
+    if value is None:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    return str(value)[:10]
+
+def list_daily_dates(start=None, end=None, sessions_only=None):
+    """
+    Fechas con archivo diario dentro del rango (inclusive), en orden
+
+    Args:
+        sessions_only: Solo días con sesión del NYSE (por defecto
+            SKIP_NON_TRADING_DAYS); el filtro usa el nombre del archivo,
+            así que los días sin sesión no se abren ni se consultan
+    """
+    start_str = to_date_str(start)
+    end_str = to_date_str(end)
+    if sessions_only is None:
+        sessions_only = SKIP_NON_TRADING_DAYS
+
+    try:
+        names = os.listdir(get_daily_dir())
+    except FileNotFoundError:
+        return []
+
+    dates = []
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        date_str = name[:-5]
+        if start_str and date_str < start_str:
+            continue
+        if end_str and date_str > end_str:
+            continue
+        if sessions_only and not _is_session(date_str):
+            continue
+        dates.append(date_str)
+
+    return sorted(dates)
+
+def _is_session(date_str):
+    """is_trading_day tolerante a nombres de archivo que no son fechas"""
+    try:
+        return is_trading_day(date_str)
+    except ValueError:
+        return True
+
+def _cache_lookup(file_path, stat):
+    """Datos cacheados si la entrada sigue vigente para ese stat, si no None"""
+    cached = _JSON_CACHE.get(file_path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        _JSON_CACHE.move_to_end(file_path)
+        _CACHE_STATS['hits'] += 1
+        return cached[2]
+    return None
+
+def _cache_store(file_path, stat, data):
+    """Guarda un archivo recién decodificado y desaloja los menos usados"""
+    _forget(file_path)
+    if stat.st_size <= JSON_CACHE_MAX_BYTES:
+        _JSON_CACHE[file_path] = (stat.st_mtime_ns, stat.st_size, data)
+        _CACHE_STATS['bytes'] += stat.st_size
+        while _CACHE_STATS['bytes'] > JSON_CACHE_MAX_BYTES:
+            _, (_, size, _) = _JSON_CACHE.popitem(last=False)
+            _CACHE_STATS['bytes'] -= size
+            _CACHE_STATS['evictions'] += 1
+
+def load_json(file_path):
+    """
+    Carga un archivo JSON pasando por el caché LRU del proceso
+
+    La entrada se invalida sola si cambia el mtime o el tamaño del archivo.
+    Los datos devueltos son compartidos: no deben modificarse.
+
+    Returns:
+        Datos del archivo, o None si no existe o es inválido
+    """
+    file_path = os.path.abspath(file_path)
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        _forget(file_path)
+        return None
+
+    data = _cache_lookup(file_path, stat)
+    if data is not None:
+        return data
+
+    _CACHE_STATS['misses'] += 1
+    _forget(file_path)
+    try:
+        data = read_json(file_path)
+    except Exception:
+        return None
+
+    _cache_store(file_path, stat, data)
+    return data
+
+def load_json_keys(file_path, keys):
+    """
+    Lee solo algunas claves de primer nivel de un archivo JSON (ver read_json_keys)
+
+    No pasa por el caché: sirve para archivos grandes de los que basta la
+    cabecera. Si el archivo ya está en el caché se responde desde ahí.
+
+    Returns:
+        Dict con las claves encontradas, o None si no existe o es inválido
+    """
+    file_path = os.path.abspath(file_path)
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+
+    data = _cache_lookup(file_path, stat)
+    if data is not None:
+        return {key: data[key] for key in keys if key in data}
+
+    try:
+        return read_json_keys(file_path, keys)
+    except (OSError, ValueError):
+        return None
+
+def _forget(file_path):
+    cached = _JSON_CACHE.pop(file_path, None)
+    if cached is not None:
+        _CACHE_STATS['bytes'] -= cached[1]
+
+def cache_info():
+    """Contadores del caché JSON: aciertos, fallos, desalojos, entradas y bytes"""
+    info = dict(_CACHE_STATS)
+    info['entries'] = len(_JSON_CACHE)
+    return info
+
+def day_path(date_str):
+    """Ruta del archivo diario de una fecha"""
+    return os.path.join(get_daily_dir(), f"{to_date_str(date_str)}.json")
+
+def load_day(date_str):
+    """Carga el archivo diario de una fecha (None si no existe o es inválido)"""
+    return load_json(day_path(date_str))
+
+def _read_day_file(file_path):
+    """
+    Lee stat y bytes de un archivo diario (corre en un hilo del pool)
+
+    Si el caché ya tiene la versión vigente no se leen los bytes.
+    """
+    try:
+        stat = os.stat(file_path)
+        cached = _JSON_CACHE.get(file_path)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return stat, None
+        with open(file_path, 'rb') as f:
+            return stat, f.read()
+    except OSError:
+        return None, None
+
+def _decode_day(file_path, stat, raw):
+    """Decodifica en el hilo principal los bytes leídos por el pool y los cachea"""
+    if stat is None:
+        _forget(file_path)
+        return None
+
+    if raw is None:
+        data = _cache_lookup(file_path, stat)
+        # Pudo desalojarse entre la lectura y ahora
+        return data if data is not None else load_json(file_path)
+
+    _CACHE_STATS['misses'] += 1
+    count('filesRead')
+    try:
+        data = loads(raw)
+    except Exception:
+        _forget(file_path)
+        return None
+
+    _cache_store(file_path, stat, data)
+    return data
+
+def iter_day_items(start=None, end=None, workers=None):
+    """
+    Genera (fecha, datos) de los archivos diarios del rango en orden de fecha
+
+    Un pool de hilos lee los archivos por adelantado (hasta 4 por hilo) para
+    solapar la latencia del disco; la decodificación y el caché quedan en el
+    hilo principal. El consumidor puede ir agregando mientras se leen los
+    siguientes días.
+
+    Args:
+        workers: Hilos de lectura (por defecto DAILY_PREFETCH_WORKERS; 1 = en serie)
+    """
+    dates = list_daily_dates(start, end)
+    if workers is None:
+        workers = PREFETCH_WORKERS
+
+    if workers <= 1 or len(dates) < PREFETCH_MIN_FILES:
+        for date_str in dates:
+            data = load_day(date_str)
+            if data is not None:
+                yield date_str, data
+        return
+
+    paths = [os.path.abspath(day_path(date_str)) for date_str in dates]
+    window = workers * 4
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = deque()
+        submitted = 0
+        for i, date_str in enumerate(dates):
+            while submitted < len(paths) and submitted < i + window:
+                futures.append(executor.submit(_read_day_file, paths[submitted]))
+                submitted += 1
+
+            stat, raw = futures.popleft().result()
+            data = _decode_day(paths[i], stat, raw)
+            if data is not None:
+                yield date_str, data
+
+def iter_days(start=None, end=None, workers=None):
+    """Genera los archivos diarios del rango en orden de fecha, leyendo por adelantado"""
+    for _, data in iter_day_items(start, end, workers):
+        yield data
+
+def load_days(start=None, end=None):
+    """Archivos diarios del rango en orden de fecha"""
+    return list(iter_days(start, end))
+
+def clear_cache(date_str=None):
+    """Olvida un día cacheado, o todo el caché, tras reescribir exports"""
+    _GENERATION[0] += 1
+    _DAY_SUMMARIES.clear()
+    if date_str is None:
+        _JSON_CACHE.clear()
+        _CACHE_STATS['bytes'] = 0
+    else:
+        _forget(os.path.abspath(day_path(date_str)))
+
+def trade_net(trade):
+    """P&L neto de un trade: el neto que informa PropReports (incluye todas las comisiones)"""
+    return trade.get('net', trade.get('pnl', 0) - trade.get('commission', 0))
+
+def to_cents(amount):
+    """Convierte un monto en dólares a centavos enteros"""
+    return int(round(amount * 100))
+
+def from_cents(cents):
+    """Convierte centavos enteros a dólares (solo al serializar)"""
+    return cents / 100
+
+def trade_net_cents(trade):
+    """P&L neto de un trade en centavos enteros"""
+    return to_cents(trade_net(trade))
+
+def parse_hold_seconds(held):
+    """Convierte la duración de PropReports ('HH:MM:SS' o 'Nd HH:MM:SS') a segundos"""
+    if not held:
+        return 0
+
+    days = 0
+    if 'd' in held:
+        day_part, held = held.split('d', 1)
+        days = int(day_part.strip() or 0)
+
+    parts = [int(p) for p in held.strip().split(':')]
+    while len(parts) < 3:
+        parts.insert(0, 0)
+
+    hours, minutes, seconds = parts[-3:]
+    return days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+def is_winning_trade(trade):
+    """Un trade gana si su neto es positivo"""
+    return trade_net(trade) > 0
+
+def is_losing_trade(trade):
+    """Un trade pierde si su neto es negativo"""
+    return trade_net(trade) < 0
+
+def register_accumulator(name, initial, update, combine=None):
+    """
+    Declara un acumulador por trade que se llena en la misma pasada que los totales
+
+    Args:
+        initial: Valor inicial (inmutable)
+        update: función (valor, trade, neto en centavos) -> nuevo valor
+        combine: función (a, b) -> valor para unir días o grupos (por defecto suma)
+    """
+    _ACCUMULATORS[name] = (initial, update, combine or (lambda a, b: a + b))
+
+def register_metric(name, compute, requires=()):
+    """
+    Declara una métrica de período
+
+    compute recibe el bucket (totales en centavos, acumuladores registrados
+    y contadores de días) y devuelve el valor ya listo para serializar.
+    requires lista los acumuladores o extremos que usa, para saltarla
+    cuando se calcula desde totales que no los traen.
+    """
+    _METRIC_FUNCS[name] = compute
+    _METRIC_REQUIRES[name] = tuple(requires)
+
+def available_metrics():
+    """Métricas registradas, en orden de registro"""
+    return tuple(_METRIC_FUNCS)
+
+def metric_requires(metrics):
+    """Acumuladores o extremos que necesitan las métricas pedidas"""
+    _check_metrics(metrics)
+    return {key for metric in metrics for key in _METRIC_REQUIRES[metric]}
+
+def new_record():
+    """Totales vacíos de un conjunto de trades, con los acumuladores registrados"""
+    record = {key: 0 for key in TRADE_TOTALS}
+    for name, (initial, _, _) in _ACCUMULATORS.items():
+        record[name] = initial
+    return record
+
+def _accumulate(record, trade, net):
+    """Suma un trade (con su neto en centavos ya calculado) a un record"""
+    record['trades'] += 1
+    record['net'] += net
+    record['gross'] += to_cents(trade.get('pnl', 0))
+    record['commissions'] += to_cents(trade.get('commission', 0))
+    if net > 0:
+        record['wins'] += 1
+        record['grossProfit'] += net
+    elif net < 0:
+        record['losses'] += 1
+        record['grossLoss'] += -net
+    for name, (_, update, _) in _ACCUMULATORS.items():
+        record[name] = update(record[name], trade, net)
+
+def _combine(target, record):
+    """Une los totales y acumuladores de un record a otro"""
+    for key in TRADE_TOTALS:
+        target[key] += record[key]
+    for name, (_, _, combine) in _ACCUMULATORS.items():
+        target[name] = combine(target[name], record[name])
+
+def summarize_trades(trades):
+    """
+    Totales de un conjunto de trades con las definiciones comunes
+
+    Los montos (net, gross, commissions, grossProfit, grossLoss) van en
+    centavos enteros, así que las sumas son exactas en cualquier orden.
+    Los acumuladores registrados se llenan en la misma pasada.
+    """
+    record = new_record()
+    for trade in trades:
+        _accumulate(record, trade, trade_net_cents(trade))
+    count('tradesProcessed', record['trades'])
+    return record
+
+def summarize_by(trades, keys):
+    """
+    Totales por grupo para varias agrupaciones en una sola pasada
+
+    Args:
+        keys: Dict nombre -> función trade -> clave del grupo (None = el
+            trade no entra en esa agrupación)
+
+    Returns:
+        Dict nombre -> {clave: record}
+    """
+    groups = {name: {} for name in keys}
+    processed = 0
+    for trade in trades:
+        processed += 1
+        net = trade_net_cents(trade)
+        for name, key_func in keys.items():
+            key = key_func(trade)
+            if key is None:
+                continue
+            record = groups[name].get(key)
+            if record is None:
+                record = groups[name][key] = new_record()
+            _accumulate(record, trade, net)
+    count('tradesProcessed', processed)
+    return groups
+
+def period_key(date_str, granularity):
+    """Clave del período al que pertenece una fecha"""
+    if granularity == 'day':
+        return date_str
+    if granularity == 'week':
+        iso_year, iso_week, _ = datetime.strptime(date_str, '%Y-%m-%d').isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    if granularity == 'month':
+        return date_str[:7]
+    if granularity == 'year':
+        return date_str[:4]
+    return 'all'
+
+def _new_bucket():
+    bucket = new_record()
+    bucket.update({
+        'tradingDays': 0, 'profitDays': 0, 'lossDays': 0,
+        'bestDay': None, 'worstDay': None,
+        'startDate': None, 'endDate': None
+    })
+    return bucket
+
+def _add_day(bucket, date_str, record):
+    if bucket['startDate'] is None:
+        bucket['startDate'] = date_str
+    bucket['endDate'] = date_str
+
+    _combine(bucket, record)
+
+    if record['trades'] == 0:
+        return
+
+    bucket['tradingDays'] += 1
+    if record['net'] > 0:
+        bucket['profitDays'] += 1
+    elif record['net'] < 0:
+        bucket['lossDays'] += 1
+
+    if bucket['bestDay'] is None or record['net'] > bucket['bestDay'][1]:
+        bucket['bestDay'] = (date_str, record['net'])
+    if bucket['worstDay'] is None or record['net'] < bucket['worstDay'][1]:
+        bucket['worstDay'] = (date_str, record['net'])
+
+def _average(cents, count):
+    """Promedio en dólares de un total en centavos"""
+    return round(cents / count / 100, 2) if count else 0
+
+def _day_extreme(extreme):
+    if extreme is None:
+        return None
+    return {'date': extreme[0], 'pnl': from_cents(extreme[1])}
+
+def _extreme(pick):
+    """Combinación de máximos/mínimos que ignora los valores vacíos"""
+    return lambda a, b: b if a is None else a if b is None else pick(a, b)
+
+def _profit_factor(bucket):
+    if bucket['grossLoss'] > 0:
+        return round(bucket['grossProfit'] / bucket['grossLoss'], 2)
+    return 999.99 if bucket['grossProfit'] > 0 else 0
+
+register_accumulator('maxNet', None, lambda value, trade, net: net if value is None or net > value else value, _extreme(max))
+register_accumulator('minNet', None, lambda value, trade, net: net if value is None or net < value else value, _extreme(min))
+
+register_metric('tradingDays', lambda b: b['tradingDays'])
+register_metric('trades', lambda b: b['trades'])
+register_metric('wins', lambda b: b['wins'])
+register_metric('losses', lambda b: b['losses'])
+register_metric('winRate', lambda b: round(b['wins'] / b['trades'], 4) if b['trades'] else 0)
+register_metric('netPnL', lambda b: from_cents(b['net']))
+register_metric('grossPnL', lambda b: from_cents(b['gross']))
+register_metric('commissions', lambda b: from_cents(b['commissions']))
+register_metric('grossProfit', lambda b: from_cents(b['grossProfit']))
+register_metric('grossLoss', lambda b: from_cents(b['grossLoss']))
+register_metric('profitFactor', _profit_factor)
+register_metric('avgWin', lambda b: _average(b['grossProfit'], b['wins']))
+register_metric('avgLoss', lambda b: _average(-b['grossLoss'], b['losses']))
+register_metric('expectancy', lambda b: _average(b['net'], b['trades']))
+register_metric('avgDailyPnL', lambda b: _average(b['net'], b['tradingDays']))
+register_metric('largestWin', lambda b: from_cents(max(b['maxNet'] or 0, 0)), requires=('maxNet',))
+register_metric('largestLoss', lambda b: from_cents(min(b['minNet'] or 0, 0)), requires=('minNet',))
+register_metric('profitDays', lambda b: b['profitDays'])
+register_metric('lossDays', lambda b: b['lossDays'])
+register_metric('bestDay', lambda b: _day_extreme(b['bestDay']), requires=('bestDay',))
+register_metric('worstDay', lambda b: _day_extreme(b['worstDay']), requires=('worstDay',))
+
+# Métricas integradas, en el orden de las filas de aggregate()
+METRICS = available_metrics()
+
+def _check_metrics(metrics):
+    unknown = [m for m in metrics if m not in _METRIC_FUNCS]
+    if unknown:
+        raise ValueError(f"Métricas no registradas: {', '.join(unknown)}")
+
+def _finalize(bucket, metrics=None):
+    """Calcula las métricas pedidas de un bucket (convierte centavos a dólares)"""
+    if metrics is None:
+        metrics = _METRIC_FUNCS
+    return {metric: _METRIC_FUNCS[metric](bucket) for metric in metrics}
+
+def compute_metrics(record, metrics=None):
+    """
+    Métricas registradas a partir de un record de summarize_trades() o summarize_by()
+
+    Por defecto calcula las métricas cuyos datos trae el record; sin
+    contadores de días (tradingDays, profitDays...) esas métricas dan 0.
+    """
+    if metrics is None:
+        metrics = [m for m in _METRIC_FUNCS if all(key in record for key in _METRIC_REQUIRES[m])]
+    _check_metrics(metrics)
+    bucket = _new_bucket()
+    bucket.update(record)
+    return _finalize(bucket, metrics)
+
+def totals_metrics(totals):
+    """
+    Métricas de aggregate() a partir de totales ya sumados
+
+    totals trae las claves de summarize_trades() (centavos) más
+    tradingDays, profitDays y lossDays; las métricas que dependen de
+    acumuladores o extremos ausentes no se incluyen.
+    """
+    return compute_metrics(totals)
+
+def day_record(date_str):
+    """Totales de un día con las definiciones comunes (None si no hay archivo)"""
+    data = load_day(date_str)
+    if data is None:
+        return None
+    return summarize_trades(data.get('trades', []))
+
+def summarize_records(day_records, metrics=None):
+    """
+    Métricas de aggregate() a partir de records diarios ya calculados
+
+    Args:
+        day_records: Iterable de (fecha, record de summarize_trades())
+    """
+    bucket = _new_bucket()
+    for date_str, record in sorted(day_records, key=lambda item: item[0] or ''):
+        _add_day(bucket, date_str, record)
+    return _finalize(bucket, metrics)
+
+def summarize_days(days, metrics=None):
+    """
+    Totales de días ya cargados en memoria con las mismas métricas de aggregate()
+
+    Útil cuando los datos llegan precargados (por ejemplo a un proceso
+    hijo del reprocesamiento) y no conviene volver a leer el disco.
+    """
+    return summarize_records(((data.get('date'), summarize_trades(data.get('trades', []))) for data in days), metrics)
+
+def get_summaries_file():
+    """Ruta del índice de resúmenes diarios"""
+    base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
+    return os.path.join(base_dir, "index", "daily-summaries.json")
+
+class LazyDay(Mapping):
+    """
+    Día con la cabecera y los totales en memoria y los trades bajo demanda
+
+    Se comporta como el dict del archivo diario: las claves de la cabecera
+    (date, account, summary...) se responden desde el índice y el archivo
+    completo solo se decodifica al pedir 'trades' u otra clave ausente.
+    """
+
+    def __init__(self, date_str, header, totals, keys):
+        self.date = date_str
+        self.header = header
+        self.totals = totals
+        self._keys = keys
+        self._data = None
+
+    def _load(self):
+        if self._data is None:
+            self._data = load_day(self.date) or {}
+        return self._data
+
+    @property
+    def loaded(self):
+        """Indica si ya se leyó el archivo completo"""
+        return self._data is not None
+
+    def __getitem__(self, key):
+        if key in self.header:
+            return self.header[key]
+        return self._load()[key]
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+def _summary_entry(file_path, stat, signature):
+    """Cabecera y totales de un archivo diario (None si no se puede leer)"""
+    data = load_json(file_path)
+    if data is None:
+        return None
+    return {
+        'stat': [stat.st_mtime_ns, stat.st_size],
+        'signature': signature,
+        'keys': list(data),
+        'header': {key: value for key, value in data.items() if key != 'trades'},
+        'totals': summarize_trades(data.get('trades', []))
+    }
+
+def update_day_summaries(summaries_file=None, refresh=False):
+    """
+    Actualiza el índice de resúmenes diarios y devuelve los días como LazyDay
+
+    Un día se reutiliza si su archivo conserva mtime y tamaño, o si cambió
+    el mtime pero no el contenido (mismo file_signature, p. ej. tras un
+    checkout). Solo los días nuevos o modificados se decodifican completos.
+    El índice se invalida si cambian los acumuladores registrados.
+
+    El índice se revisa una vez por proceso: las llamadas siguientes
+    devuelven el mismo resultado hasta un clear_cache() (lo llaman los
+    exportadores al reescribir un día) o refresh=True.
+
+    Returns:
+        Dict fecha -> LazyDay, en orden de fecha
+    """
+    if summaries_file is None:
+        summaries_file = get_summaries_file()
+    if not refresh and summaries_file in _DAY_SUMMARIES:
+        return _DAY_SUMMARIES[summaries_file]
+    daily_dir = get_daily_dir()
+    accumulators = list(_ACCUMULATORS)
+
+    stored_days = {}
+    stored = load_json(summaries_file) if os.path.exists(summaries_file) else None
+    if stored and stored.get('version') == SUMMARIES_VERSION and stored.get('accumulators') == accumulators:
+        stored_days = stored['days']
+
+    days = {}
+    rebuilt = 0
+    touched = 0
+
+    for date_str in list_daily_dates():
+        file_path = os.path.join(daily_dir, f"{date_str}.json")
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+
+        previous = stored_days.get(date_str)
+        if previous and previous['stat'] == [stat.st_mtime_ns, stat.st_size]:
+            _remember_signature(file_path, stat, previous['signature'])
+            days[date_str] = previous
+            continue
+
+        signature = file_signature(file_path)
+        if previous and previous['signature'] == signature:
+            days[date_str] = dict(previous, stat=[stat.st_mtime_ns, stat.st_size])
+            touched += 1
+            continue
+
+        entry = _summary_entry(file_path, stat, signature)
+        if entry is None:
+            continue
+        days[date_str] = entry
+        rebuilt += 1
+
+    count_cache('daySummaries', len(days) - rebuilt, rebuilt)
+    removed = len(set(stored_days) - set(days))
+    if rebuilt or touched or removed or not stored_days:
+        os.makedirs(os.path.dirname(summaries_file), exist_ok=True)
+        write_json(summaries_file, {'version': SUMMARIES_VERSION, 'accumulators': accumulators,
+                                    'days': days}, compact=True)
+        if rebuilt or removed:
+            print(f"🗂️  Resúmenes diarios actualizados: {rebuilt} días recalculados de {len(days)}")
+
+    summaries = {
+        date_str: LazyDay(date_str, entry['header'], entry['totals'], entry['keys'])
+        for date_str, entry in days.items()
+    }
+    _DAY_SUMMARIES[summaries_file] = summaries
+    return summaries
+
+def iter_day_summaries(start=None, end=None):
+    """Genera (fecha, LazyDay) de los días del rango sin decodificar sus trades"""
+    summaries = update_day_summaries()
+    for date_str in list_daily_dates(start, end):
+        day = summaries.get(date_str)
+        if day is not None:
+            yield date_str, day
+
+def aggregate(start=None, end=None, granularity='all', metrics=None):
+    """
+    Agrega los exports diarios por período
+
+    Args:
+        start, end: Rango de fechas inclusive (datetime, date o 'YYYY-MM-DD'; None = sin límite)
+        granularity: 'day', 'week' (ISO), 'month', 'year' o 'all'
+        metrics: Métricas a devolver (por defecto todas las registradas)
+
+    Returns:
+        Lista de filas en orden cronológico con 'period', 'startDate',
+        'endDate' y las métricas pedidas. Solo aparecen los períodos con
+        algún archivo diario; con 'all' siempre hay exactamente una fila.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Granularidad no soportada: {granularity}")
+    metrics = metrics or available_metrics()
+    _check_metrics(metrics)
+
+    # Los totales por día salen del índice de resúmenes, sin leer los trades
+    buckets = {}
+    for date_str, day in iter_day_summaries(start, end):
+        key = period_key(date_str, granularity)
+        if key not in buckets:
+            buckets[key] = _new_bucket()
+        _add_day(buckets[key], date_str, day.totals)
+
+    if granularity == 'all' and not buckets:
+        buckets['all'] = _new_bucket()
+
+    rows = []
+    for key in sorted(buckets):
+        bucket = buckets[key]
+        row = {'period': key, 'startDate': bucket['startDate'], 'endDate': bucket['endDate']}
+        row.update(_finalize(bucket, metrics))
+        rows.append(row)
+
+    return rows
+
+def aggregate_total(start=None, end=None, metrics=None):
+    """Atajo para una sola fila con el total del rango"""
+    return aggregate(start, end, 'all', metrics)[0]
@@ -5,10 +5,12 @@ Consolida los datos diarios en un resumen semanal
 """
 
 import os
-import json
 import glob
 from datetime import datetime, timedelta
-from collections import defaultdict
+from trading_data import (load_days, summarize_records, summarize_trades, summarize_by, compute_metrics,
+                          trade_net, from_cents, parse_hold_seconds)
+from json_codec import write_json
+from pipeline_metrics import start_run
 
 def get_week_dates(date=None):
     """Obtiene las fechas de inicio y fin de la semana"""
@@ -26,82 +28,68 @@ def get_week_dates(date=None):
 
 def load_daily_files(week_start, week_end):
     """Carga todos los archivos diarios de la semana"""
-    base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
-    daily_dir = os.path.join(base_dir, "daily")
-    daily_data = []
-    
-    # Iterar por cada día de la semana
-    current_date = week_start
-    while current_date <= week_end:
-        date_str = current_date.strftime('%Y-%m-%d')
-        file_path = os.path.join(daily_dir, f"{date_str}.json")
-        
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                daily_data.append(data)
-        
-        current_date += timedelta(days=1)
-    
-    return daily_data
+    return load_days(week_start, week_end)
+
+def _trade_hour(trade):
+    """Hora de apertura del trade ('HH'), o None si no se puede leer"""
+    opened = trade.get('opened')
+    if not opened:
+        return None
+    # Manejar diferentes formatos de fecha/hora
+    time_part = opened.split(' ')[1] if ' ' in opened else opened
+    return time_part.split(':')[0] if ':' in time_part else None
+
+def _duration_category(trade):
+    """Rango de duración del trade, o None si no hay holding válido"""
+    if not trade.get('held'):
+        return None
+    try:
+        minutes = parse_hold_seconds(trade['held']) / 60
+    except ValueError:
+        return None
+    if minutes < 5:
+        return '<5min'
+    if minutes < 15:
+        return '5-15min'
+    if minutes < 60:
+        return '15-60min'
+    return '>60min'
 
 def analyze_trading_patterns(trades):
     """Analiza patrones de trading"""
+    # Hora, símbolo y duración en una sola pasada sobre los trades
+    groups = summarize_by(trades, {
+        'by_hour': _trade_hour,
+        'by_symbol': lambda trade: trade.get('symbol', 'UNKNOWN'),
+        'by_duration': _duration_category
+    })
+
     patterns = {
-        'by_hour': defaultdict(lambda: {'count': 0, 'pnl': 0}),
-        'by_symbol': defaultdict(lambda: {'count': 0, 'pnl': 0, 'win_rate': 0}),
-        'by_duration': defaultdict(lambda: {'count': 0, 'pnl': 0}),
+        'by_hour': {hour: {'count': record['trades'], 'pnl': from_cents(record['net'])}
+                    for hour, record in groups['by_hour'].items()},
+        'by_symbol': {},
+        'by_duration': {category: {'count': record['trades'], 'pnl': from_cents(record['net'])}
+                        for category, record in groups['by_duration'].items()},
         'consecutive_wins': 0,
         'consecutive_losses': 0,
         'max_consecutive_wins': 0,
         'max_consecutive_losses': 0
     }
-    
+
+    for symbol, record in groups['by_symbol'].items():
+        metrics = compute_metrics(record, ('trades', 'netPnL', 'winRate'))
+        patterns['by_symbol'][symbol] = {
+            'count': metrics['trades'],
+            'pnl': metrics['netPnL'],
+            'win_rate': metrics['winRate']
+        }
+
     current_streak = 0
     streak_type = None
-    
+
     for trade in trades:
-        # Por hora del día
-        if trade.get('opened'):
-            try:
-                # Manejar diferentes formatos de fecha/hora
-                opened = trade['opened']
-                if ' ' in opened:
-                    time_part = opened.split(' ')[1]
-                else:
-                    time_part = opened
-                
-                if ':' in time_part:
-                    hour = time_part.split(':')[0]
-                    patterns['by_hour'][hour]['count'] += 1
-                    patterns['by_hour'][hour]['pnl'] += trade.get('pnl', 0)
-            except:
-                pass  # Ignorar si no se puede parsear
-        
-        # Por símbolo
-        symbol = trade.get('symbol', 'UNKNOWN')
-        patterns['by_symbol'][symbol]['count'] += 1
-        patterns['by_symbol'][symbol]['pnl'] += trade.get('pnl', 0)
-        
-        # Por duración de trade
-        if trade.get('held'):
-            duration_parts = trade['held'].split(':')
-            if len(duration_parts) >= 2:
-                minutes = int(duration_parts[0]) * 60 + int(duration_parts[1])
-                if minutes < 5:
-                    duration_category = '<5min'
-                elif minutes < 15:
-                    duration_category = '5-15min'
-                elif minutes < 60:
-                    duration_category = '15-60min'
-                else:
-                    duration_category = '>60min'
-                
-                patterns['by_duration'][duration_category]['count'] += 1
-                patterns['by_duration'][duration_category]['pnl'] += trade.get('pnl', 0)
-        
         # Rachas de wins/losses
-        pnl = trade.get('pnl', 0)
+        pnl = trade_net(trade)
         if pnl > 0:
             if streak_type == 'win':
                 current_streak += 1
@@ -116,17 +104,17 @@ def analyze_trading_patterns(trades):
                 current_streak = 1
                 streak_type = 'loss'
             patterns['max_consecutive_losses'] = max(patterns['max_consecutive_losses'], current_streak)
-    
-    # Calcular win rates por símbolo
-    for symbol, data in patterns['by_symbol'].items():
-        symbol_trades = [t for t in trades if t.get('symbol') == symbol]
-        wins = len([t for t in symbol_trades if t.get('pnl', 0) > 0])
-        data['win_rate'] = round(wins / len(symbol_trades), 4) if symbol_trades else 0
-    
+
     return patterns
 
-def generate_weekly_summary(week_date=None):
-    """Genera resumen semanal consolidando datos diarios"""
+def generate_weekly_summary(week_date=None, daily_data=None):
+    """
+    Genera resumen semanal consolidando datos diarios
+    
+    Args:
+        week_date: Cualquier fecha de la semana (datetime o string YYYY-MM-DD)
+        daily_data: Días ya cargados de la semana, en orden; si es None se leen de disco
+    """
     # Obtener fechas de la semana
     week_start, week_end = get_week_dates(week_date)
     week_str = f"{week_start.strftime('%Y-%m-%d')} to {week_end.strftime('%Y-%m-%d')}"
@@ -134,7 +122,8 @@ def generate_weekly_summary(week_date=None):
     print(f"📅 Generando resumen semanal: {week_str}")
     
     # Cargar archivos diarios
-    daily_data = load_daily_files(week_start, week_end)
+    if daily_data is None:
+        daily_data = load_daily_files(week_start, week_end)
     
     if not daily_data:
         print("⚠️  No hay datos para esta semana")
@@ -143,25 +132,28 @@ def generate_weekly_summary(week_date=None):
     # Consolidar todos los trades
     all_trades = []
     daily_summaries = []
+    day_records = []
     
     for day_data in daily_data:
-        all_trades.extend(day_data.get('trades', []))
+        trades = day_data.get('trades', [])
+        record = summarize_trades(trades)
+        day_records.append((day_data.get('date'), record))
+        if not trades:
+            continue
+        all_trades.extend(trades)
         daily_summaries.append({
             'date': day_data.get('date'),
-            'trades': day_data.get('summary', {}).get('totalTrades', 0),
-            'pnl': day_data.get('summary', {}).get('netPnL', 0),
+            'trades': len(trades),
+            'pnl': from_cents(record['net']),
             'symbols': day_data.get('summary', {}).get('symbols', [])
         })
     
-    # Calcular estadísticas semanales
-    total_pnl = sum(t.get('pnl', 0) for t in all_trades)
-    total_commissions = sum(t.get('commission', 0) for t in all_trades)
-    winning_trades = [t for t in all_trades if t.get('pnl', 0) > 0]
-    losing_trades = [t for t in all_trades if t.get('pnl', 0) < 0]
+    # Calcular estadísticas semanales (con los totales diarios ya calculados)
+    totals = summarize_records(day_records)
     
     # Mejores y peores trades
-    best_trade = max(all_trades, key=lambda x: x.get('pnl', 0)) if all_trades else None
-    worst_trade = min(all_trades, key=lambda x: x.get('pnl', 0)) if all_trades else None
+    best_trade = max(all_trades, key=trade_net) if all_trades else None
+    worst_trade = min(all_trades, key=trade_net) if all_trades else None
     
     # Días más rentables
     best_day = max(daily_summaries, key=lambda x: x['pnl']) if daily_summaries else None
@@ -178,30 +170,30 @@ def generate_weekly_summary(week_date=None):
         'year': week_start.year,
         'account': daily_data[0].get('account') if daily_data else 'UNKNOWN',
         'summary': {
-            'totalTradingDays': len(daily_data),
-            'totalTrades': len(all_trades),
-            'grossPnL': round(total_pnl, 2),
-            'totalCommissions': round(total_commissions, 2),
-            'netPnL': round(total_pnl - total_commissions, 2),
-            'avgDailyPnL': round((total_pnl - total_commissions) / len(daily_data), 2) if daily_data else 0,
-            'avgTradePerDay': round(len(all_trades) / len(daily_data), 2) if daily_data else 0,
-            'winningTrades': len(winning_trades),
-            'losingTrades': len(losing_trades),
-            'winRate': round(len(winning_trades) / len(all_trades), 4) if all_trades else 0,
-            'avgWin': round(sum(t['pnl'] for t in winning_trades) / len(winning_trades), 2) if winning_trades else 0,
-            'avgLoss': round(sum(t['pnl'] for t in losing_trades) / len(losing_trades), 2) if losing_trades else 0,
-            'profitFactor': round(abs(sum(t['pnl'] for t in winning_trades) / sum(t['pnl'] for t in losing_trades)), 2) if losing_trades and sum(t['pnl'] for t in losing_trades) != 0 else 0
+            'totalTradingDays': totals['tradingDays'],
+            'totalTrades': totals['trades'],
+            'grossPnL': totals['grossPnL'],
+            'totalCommissions': totals['commissions'],
+            'netPnL': totals['netPnL'],
+            'avgDailyPnL': totals['avgDailyPnL'],
+            'avgTradePerDay': round(totals['trades'] / totals['tradingDays'], 2) if totals['tradingDays'] else 0,
+            'winningTrades': totals['wins'],
+            'losingTrades': totals['losses'],
+            'winRate': totals['winRate'],
+            'avgWin': totals['avgWin'],
+            'avgLoss': totals['avgLoss'],
+            'profitFactor': totals['profitFactor']
         },
         'extremes': {
             'bestTrade': {
                 'date': best_trade.get('date', ''),
                 'symbol': best_trade.get('symbol', ''),
-                'pnl': best_trade.get('pnl', 0)
+                'pnl': trade_net(best_trade)
             } if best_trade else None,
             'worstTrade': {
                 'date': worst_trade.get('date', ''),
                 'symbol': worst_trade.get('symbol', ''),
-                'pnl': worst_trade.get('pnl', 0)
+                'pnl': trade_net(worst_trade)
             } if worst_trade else None,
             'bestDay': best_day,
             'worstDay': worst_day
@@ -230,8 +222,7 @@ def generate_weekly_summary(week_date=None):
     week_num = week_start.isocalendar()[1]
     filename = os.path.join(weekly_dir, f"{year}-W{week_num:02d}.json")
     
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(weekly_summary, f, indent=2, ensure_ascii=False)
+    write_json(filename, weekly_summary, ensure_ascii=False)
     
     print(f"✅ Resumen semanal generado: {filename}")
     print(f"📊 Resumen: {weekly_summary['summary']['totalTrades']} trades, "
@@ -243,6 +234,8 @@ def generate_weekly_summary(week_date=None):
 if __name__ == "__main__":
     import sys
     
+    start_run('weekly_summary')
+    
     if len(sys.argv) > 1:
         # Si se pasa una fecha, generar para esa semana
         date_str = sys.argv[1]
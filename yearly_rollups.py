@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Rollups anuales cacheados para vistas históricas y comparaciones año contra año
+Los años cerrados se calculan una sola vez; solo el año en curso se recalcula.
+Cada rollup guarda un hash de las firmas de sus archivos diarios, así que
+reescribir un día de un año cerrado (desde cualquier exportador) lo invalida
+"""
+
+import os
+import hashlib
+from datetime import datetime
+from trading_data import (list_daily_dates, aggregate, aggregate_total, to_cents, from_cents,
+                          get_daily_dir, file_signature, update_day_summaries)
+from json_codec import read_json, write_json
+
+ROLLUP_VERSION = 2
+
+def get_rollups_dir():
+    """Directorio donde se guardan los rollups anuales"""
+    base_dir = os.getenv('EXPORT_OUTPUT_DIR', 'exports')
+    return os.path.join(base_dir, "rollups")
+
+def discover_years():
+    """Años con archivos diarios, detectados solo por nombre de archivo"""
+    return sorted({int(date_str[:4]) for date_str in list_daily_dates() if date_str[:4].isdigit()})
+
+def year_sources_hash(year):
+    """Hash de las fechas y firmas de contenido de los archivos diarios de un año"""
+    # El índice de resúmenes deja las firmas memoizadas: no se re-hashea cada archivo
+    update_day_summaries()
+    daily_dir = get_daily_dir()
+    parts = [f"{date_str}:{file_signature(os.path.join(daily_dir, f'{date_str}.json'))}"
+             for date_str in list_daily_dates(f"{year}-01-01", f"{year}-12-31")]
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+def _empty_bucket():
+    return {
+        'tradingDays': 0,
+        'totalTrades': 0,
+        'netPnL': 0,
+        'winningTrades': 0,
+        'losingTrades': 0,
+        'grossProfit': 0,
+        'grossLoss': 0,
+        'profitDays': 0,
+        'lossDays': 0
+    }
+
+def _bucket_from_row(row):
+    """Convierte una fila de trading_data.aggregate() al formato del rollup"""
+    return {
+        'tradingDays': row['tradingDays'],
+        'totalTrades': row['trades'],
+        'netPnL': row['netPnL'],
+        'winningTrades': row['wins'],
+        'losingTrades': row['losses'],
+        'grossProfit': row['grossProfit'],
+        'grossLoss': row['grossLoss'],
+        'profitDays': row['profitDays'],
+        'lossDays': row['lossDays']
+    }
+
+MONEY_KEYS = ('netPnL', 'grossProfit', 'grossLoss')
+
+def _round_bucket(bucket):
+    for key in MONEY_KEYS:
+        bucket[key] = round(bucket[key], 2)
+    return bucket
+
+def build_year_rollup(year):
+    """Calcula el rollup de un año a partir de la capa de datos compartida"""
+    start = f"{year}-01-01"
+    end = f"{year}-12-31"
+    totals = aggregate_total(start, end)
+
+    months = {}
+    for row in aggregate(start, end, 'month'):
+        if row['tradingDays'] > 0:
+            months[row['period'][5:7]] = _bucket_from_row(row)
+
+    return {
+        'version': ROLLUP_VERSION,
+        'year': year,
+        'closed': year < datetime.now().year,
+        'generatedAt': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'sources': year_sources_hash(year),
+        'totals': _bucket_from_row(totals),
+        'bestDay': totals['bestDay'],
+        'worstDay': totals['worstDay'],
+        'months': months
+    }
+
+def get_year_rollup(year, force=False):
+    """
+    Obtiene el rollup de un año
+
+    Los años cerrados se leen del caché si existe y sus archivos diarios
+    no cambiaron (mismo hash de firmas); el año en curso siempre se
+    recalcula y se guarda como rollup "vivo".
+    """
+    rollup_file = os.path.join(get_rollups_dir(), f"{year}.json")
+    is_closed = year < datetime.now().year
+
+    if is_closed and not force and os.path.exists(rollup_file):
+        try:
+            cached = read_json(rollup_file)
+            if (cached.get('closed') and cached.get('version') == ROLLUP_VERSION
+                    and cached.get('sources') == year_sources_hash(year)):
+                return cached
+        except Exception:
+            pass
+
+    rollup = build_year_rollup(year)
+
+    os.makedirs(get_rollups_dir(), exist_ok=True)
+    write_json(rollup_file, rollup, ensure_ascii=False)
+
+    return rollup
+
+def invalidate_rollup(year):
+    """Elimina el rollup cacheado de un año (por ejemplo tras reprocesar días cerrados)"""
+    rollup_file = os.path.join(get_rollups_dir(), f"{year}.json")
+    if os.path.exists(rollup_file):
+        os.remove(rollup_file)
+        return True
+    return False
+
+def get_all_rollups(force=False):
+    """Rollups de todos los años con datos, del más antiguo al más reciente"""
+    years = discover_years()
+    current_year = datetime.now().year
+    if current_year not in years:
+        years.append(current_year)
+    return [get_year_rollup(year, force=force) for year in years]
+
+def _derived_stats(bucket):
+    """Métricas derivadas comunes a todas las vistas"""
+    trades = bucket['totalTrades']
+    days = bucket['tradingDays']
+    gross_loss = bucket['grossLoss']
+    gross_profit = bucket['grossProfit']
+
+    if gross_loss > 0:
+        profit_factor = round(gross_profit / gross_loss, 2)
+    else:
+        profit_factor = 999.99 if gross_profit > 0 else 0
+
+    return {
+        'winRate': round(bucket['winningTrades'] / trades, 4) if trades > 0 else 0,
+        'profitDaysPct': round(bucket['profitDays'] / days * 100, 1) if days > 0 else 0,
+        'dailyAvg': round(bucket['netPnL'] / days, 2) if days > 0 else 0,
+        'profitFactor': profit_factor
+    }
+
+def calculate_all_time_stats(rollups):
+    """Combina los rollups anuales en estadísticas de toda la historia"""
+    totals = _empty_bucket()
+    best_day = None
+    worst_day = None
+
+    # Los montos se suman en centavos y se convierten al final
+    for rollup in rollups:
+        for key in totals:
+            value = rollup['totals'][key]
+            totals[key] += to_cents(value) if key in MONEY_KEYS else value
+        if rollup['bestDay'] and (best_day is None or rollup['bestDay']['pnl'] > best_day['pnl']):
+            best_day = rollup['bestDay']
+        if rollup['worstDay'] and (worst_day is None or rollup['worstDay']['pnl'] < worst_day['pnl']):
+            worst_day = rollup['worstDay']
+
+    for key in MONEY_KEYS:
+        totals[key] = from_cents(totals[key])
+
+    stats = _round_bucket(totals)
+    stats.update(_derived_stats(stats))
+    stats['bestDay'] = best_day
+    stats['worstDay'] = worst_day
+    stats['years'] = [r['year'] for r in rollups if r['totals']['tradingDays'] > 0]
+    return stats
+
+def calculate_year_over_year(rollups):
+    """Tabla año contra año con deltas respecto al año anterior"""
+    rows = []
+    previous = None
+
+    for rollup in rollups:
+        totals = rollup['totals']
+        row = {
+            'year': rollup['year'],
+            'closed': rollup['closed'],
+            'tradingDays': totals['tradingDays'],
+            'trades': totals['totalTrades'],
+            'pnl': totals['netPnL']
+        }
+        row.update(_derived_stats(totals))
+
+        if previous is not None:
+            row['pnlChange'] = round(row['pnl'] - previous['pnl'], 2)
+            row['tradesChange'] = row['trades'] - previous['trades']
+            row['winRateChange'] = round(row['winRate'] - previous['winRate'], 4)
+
+        rows.append(row)
+        previous = row
+
+    return rows
+
+if __name__ == "__main__":
+    import sys
+
+    force = len(sys.argv) > 1 and sys.argv[1] == "force"
+    rollups = get_all_rollups(force=force)
+
+    for row in calculate_year_over_year(rollups):
+        status = "cerrado" if row['closed'] else "en curso"
+        print(f"📅 {row['year']} ({status}): {row['trades']} trades, P&L: ${row['pnl']}, "
+              f"Win rate: {row['winRate']*100:.1f}%")
+
+    all_time = calculate_all_time_stats(rollups)
+    print(f"📊 Histórico: {all_time['totalTrades']} trades, P&L: ${all_time['netPnL']}")